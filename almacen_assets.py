@@ -0,0 +1,455 @@
+# almacen_assets.py - Almacén de imágenes direccionado por contenido
+#
+# Cada ventana copiaba las imágenes subidas a su propia carpeta y, si el
+# nombre ya existía, agregaba _1, _2...: la misma foto terminaba varias veces
+# en el repo, en el deploy y en el CDN. Acá cada imagen se guarda una sola
+# vez, con su SHA-256 como nombre:
+#
+#     public/assets/imagenes/contenido/<sha256>.<ext>
+#
+# y la BD guarda esa ruta. Subir dos veces el mismo archivo (aunque tenga
+# otro nombre o venga de otra carpeta) no crea otra copia.
+#
+# indice.json (en la misma carpeta) guarda ruta lógica -> hash: el nombre
+# original de cada subida y las rutas viejas que reemplazó la deduplicación,
+# para poder seguir resolviéndolas.
+#
+# Una subida lee el origen una sola vez: el hash se calcula mientras se copia
+# a un temporal dentro del almacén, que después se renombra a <hash>.<ext> (o
+# se borra si ese contenido ya estaba). cache_digestos.json recuerda
+# (ruta, tamaño, mtime) -> hash: volver a subir el mismo archivo sin cambios
+# (p. ej. el hero desde una unidad de red) no lo vuelve a leer.
+#
+# Deduplicar el árbol existente:
+#     python almacen_assets.py                 (solo informa)
+#     python almacen_assets.py --aplicar       (mueve, actualiza la BD y borra copias)
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from imagenes_variantes import es_imagen
+
+# Misma raíz que usan las ventanas (ruta_absoluta_desde_relativa) y el deploy
+# (dirname(backend_path)/public): la raíz del proyecto, dos niveles arriba del backend
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CARPETA_PUBLIC = os.path.join(PROJECT_ROOT, "public")
+RELATIVA_ALMACEN = "assets/imagenes/contenido"
+NOMBRE_INDICE = "indice.json"
+ARCHIVO_CACHE_DIGESTOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_digestos.json")
+MAX_CACHE_DIGESTOS = 5000
+TAMANIO_BLOQUE = 1024 * 1024
+LOTE_REEMPLAZOS = 500  # rutas por UPDATE en la deduplicación
+
+# Columnas de la BD que guardan rutas de imágenes
+COLUMNAS_IMAGENES = {
+    'configuracion_app': [
+        'logo_app', 'logo_app_ruta_relativa', 'icono_hamburguesa', 'icono_hamburguesa_ruta_relativa',
+        'icono_cerrar', 'icono_cerrar_ruta_relativa', 'hero_imagen', 'hero_imagen_ruta_relativa',
+    ],
+    'regiones_zonas': ['imagen_region_zona_ruta_relativa'],
+    'secciones': ['icono_seccion'],
+    'sub_secciones': [
+        'imagen', 'imagen_ruta_relativa', 'icono', 'icono_ruta_relativa',
+        'foto1_ruta_absoluta', 'foto1_ruta_relativa', 'foto2_ruta_absoluta', 'foto2_ruta_relativa',
+        'foto3_ruta_absoluta', 'foto3_ruta_relativa', 'foto4_ruta_absoluta', 'foto4_ruta_relativa',
+    ],
+    'usuarios': ['foto_usuario'],
+}
+
+_lock_indice = threading.Lock()
+_oyentes_indice = []  # funcion(indice, carpeta del almacén) después de cada escritura
+_lock_digestos = threading.Lock()
+_digestos = None  # ruta absoluta -> [tamaño, mtime_ns, hash]; se carga al primer uso
+
+
+def carpeta_almacen(raiz_public=None):
+    return os.path.join(raiz_public or CARPETA_PUBLIC, *RELATIVA_ALMACEN.split("/"))
+
+
+def hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANIO_BLOQUE), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+# ---------------- Caché de digestos (ruta, tamaño, mtime) -> hash ----------------
+def _cache_digestos():
+    """Diccionario de la caché (lock tomado)"""
+    global _digestos
+    if _digestos is None:
+        try:
+            with open(ARCHIVO_CACHE_DIGESTOS, 'r', encoding='utf-8') as f:
+                _digestos = json.load(f)
+        except (OSError, ValueError):
+            _digestos = {}
+    return _digestos
+
+
+def digesto_en_cache(ruta, info):
+    """Hash registrado para 'ruta' si el archivo no cambió desde entonces, o None"""
+    with _lock_digestos:
+        entrada = _cache_digestos().get(os.path.abspath(ruta))
+    if entrada and entrada[0] == info.st_size and entrada[1] == info.st_mtime_ns:
+        return entrada[2]
+    return None
+
+
+def recordar_digesto(ruta, info, hash_contenido, guardar=True):
+    with _lock_digestos:
+        cache = _cache_digestos()
+        clave = os.path.abspath(ruta)
+        cache.pop(clave, None)  # al final: las más viejas se descartan primero
+        cache[clave] = [info.st_size, info.st_mtime_ns, hash_contenido]
+        for vieja in list(cache)[:max(0, len(cache) - MAX_CACHE_DIGESTOS)]:
+            del cache[vieja]
+    if guardar:
+        guardar_cache_digestos()
+
+
+def guardar_cache_digestos():
+    with _lock_digestos:
+        if _digestos is None:
+            return
+        try:
+            temporal = f"{ARCHIVO_CACHE_DIGESTOS}.{threading.get_ident()}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(_digestos, f)
+            os.replace(temporal, ARCHIVO_CACHE_DIGESTOS)
+        except OSError as e:
+            print(f"[WARN] No se pudo guardar la caché de digestos: {e}")
+
+
+def digesto(ruta, guardar=True):
+    """hash_archivo() usando la caché: solo lee el archivo si cambió"""
+    info = os.stat(ruta)
+    hash_contenido = digesto_en_cache(ruta, info)
+    if hash_contenido is None:
+        hash_contenido = hash_archivo(ruta)
+        recordar_digesto(ruta, info, hash_contenido, guardar)
+    return hash_contenido
+
+
+def copiar_con_hash(ruta_origen, carpeta):
+    """
+    Copia 'ruta_origen' a un temporal dentro de 'carpeta' calculando el hash
+    en la misma lectura. Devuelve (ruta del temporal, hash).
+    """
+    sha = hashlib.sha256()
+    temporal = os.path.join(carpeta, f".subida.{threading.get_ident()}.tmp")
+    try:
+        with open(ruta_origen, 'rb') as origen, open(temporal, 'wb') as destino:
+            for bloque in iter(lambda: origen.read(TAMANIO_BLOQUE), b''):
+                sha.update(bloque)
+                destino.write(bloque)
+        shutil.copystat(ruta_origen, temporal)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return temporal, sha.hexdigest()
+
+
+def nombre_en_almacen(hash_contenido, ruta_original):
+    extension = os.path.splitext(ruta_original)[1].lower()
+    return f"{hash_contenido}{extension}"
+
+
+def ruta_logica(relativa):
+    """'/assets/x.png', 'public\\assets\\x.png' -> 'assets/x.png'"""
+    r = relativa.replace("\\", "/").strip().lstrip("/")
+    return r[len("public/"):] if r.startswith("public/") else r
+
+
+def relativa_en_almacen(ruta):
+    """'assets/imagenes/contenido/<nombre>' si 'ruta' es un archivo del almacén; si no, None"""
+    if not ruta:
+        return None
+    carpeta, nombre = os.path.split(ruta.replace("\\", "/"))
+    if carpeta.endswith(RELATIVA_ALMACEN) and nombre != NOMBRE_INDICE:
+        return f"{RELATIVA_ALMACEN}/{nombre}"
+    return None
+
+
+# ---------------- Índice ruta lógica -> hash ----------------
+def cargar_indice(raiz_public=None):
+    try:
+        with open(os.path.join(carpeta_almacen(raiz_public), NOMBRE_INDICE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def al_registrar_en_indice(funcion):
+    """Registra funcion(indice, carpeta) para que se llame cada vez que se escribe indice.json"""
+    _oyentes_indice.append(funcion)
+
+
+def registrar_en_indice(rutas_hash, raiz_public=None):
+    """Agrega {ruta lógica: nombre en el almacén} al índice (escritura atómica)"""
+    carpeta = carpeta_almacen(raiz_public)
+    with _lock_indice:
+        indice = cargar_indice(raiz_public)
+        indice.update({ruta_logica(r): n for r, n in rutas_hash.items()})
+        os.makedirs(carpeta, exist_ok=True)
+        temporal = os.path.join(carpeta, NOMBRE_INDICE + ".tmp")
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporal, os.path.join(carpeta, NOMBRE_INDICE))
+    for funcion in _oyentes_indice:
+        funcion(indice, carpeta)
+
+
+def buscar_en_indice(relativa, raiz_public=None):
+    """Ruta absoluta en el almacén de una ruta lógica vieja, o None"""
+    if not relativa:
+        return None
+    nombre = cargar_indice(raiz_public).get(ruta_logica(relativa))
+    if not nombre:
+        return None
+    ruta = os.path.join(carpeta_almacen(raiz_public), nombre)
+    return ruta if os.path.exists(ruta) else None
+
+
+class IndiceAlmacen:
+    """
+    indice.json para el servidor: lo recarga cuando cambia en disco (se
+    revisa como máximo cada 'intervalo' segundos), igual que ManifiestoDerivados.
+    """
+
+    def __init__(self, ruta, intervalo=30):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.indice = {}
+        self.firma = None
+        self.revisado = 0.0
+        self.lock = threading.Lock()
+
+    def actualizar(self):
+        ahora = time.monotonic()
+        if ahora - self.revisado < self.intervalo:
+            return
+        with self.lock:
+            self.revisado = ahora
+            try:
+                firma = os.stat(self.ruta).st_mtime_ns
+            except OSError:
+                self.indice, self.firma = {}, None
+                return
+            if firma == self.firma:
+                return
+            try:
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    self.indice = json.load(f)
+                self.firma = firma
+            except (OSError, ValueError) as e:
+                print(f"[WARN] No se pudo leer {self.ruta}: {e}")
+
+    def buscar(self, relativa):
+        """Nombre en el almacén de una ruta lógica 'assets/...', o None"""
+        self.actualizar()
+        return self.indice.get(ruta_logica(relativa)) if relativa else None
+
+
+def hash_de_nombre(nombre):
+    """El hash de un archivo del almacén está en su nombre: '<sha256>.<ext>'"""
+    base = os.path.splitext(nombre)[0].lower()
+    if len(base) == 64 and all(c in "0123456789abcdef" for c in base):
+        return base
+    return None
+
+
+def relativa_en_assets(ruta, raiz_public=None):
+    """'assets/...' si 'ruta' es un archivo bajo public/assets (fuera del almacén); si no, None"""
+    raiz = os.path.abspath(raiz_public or CARPETA_PUBLIC)
+    ruta = os.path.abspath(ruta)
+    if not ruta.startswith(os.path.join(raiz, "assets") + os.sep):
+        return None
+    return os.path.relpath(ruta, raiz).replace(os.sep, "/")
+
+
+# ---------------- Subidas ----------------
+def guardar_en_almacen(ruta_origen, ruta_original=None, raiz_public=None):
+    """
+    Guarda 'ruta_origen' en el almacén (si ese contenido no estaba ya) y
+    devuelve (ruta absoluta, ruta relativa 'assets/imagenes/contenido/<hash>.<ext>').
+    'ruta_original' es la ruta lógica con la que se registra en el índice
+    (por defecto, el nombre del archivo subido).
+
+    Un archivo que ya está bajo public/assets no se copia: se usa el del
+    almacén si ese contenido ya está ahí, o el mismo archivo si no.
+    """
+    carpeta = carpeta_almacen(raiz_public)
+    en_assets = relativa_en_assets(ruta_origen, raiz_public)
+    if os.path.dirname(os.path.abspath(ruta_origen)) == os.path.abspath(carpeta):
+        nombre = os.path.basename(ruta_origen)  # ya es un archivo del almacén
+    elif en_assets:
+        nombre = nombre_en_almacen(digesto(ruta_origen), ruta_origen)
+        if not os.path.exists(os.path.join(carpeta, nombre)):
+            return os.path.abspath(ruta_origen), en_assets
+        registrar_en_indice({en_assets: nombre}, raiz_public)
+    else:
+        info = os.stat(ruta_origen)
+        hash_contenido = digesto_en_cache(ruta_origen, info)
+        nombre = hash_contenido and nombre_en_almacen(hash_contenido, ruta_origen)
+        if not nombre or not os.path.exists(os.path.join(carpeta, nombre)):
+            # Una sola lectura del origen: copia y hash a la vez
+            os.makedirs(carpeta, exist_ok=True)
+            temporal, hash_contenido = copiar_con_hash(ruta_origen, carpeta)
+            nombre = nombre_en_almacen(hash_contenido, ruta_origen)
+            destino = os.path.join(carpeta, nombre)
+            if os.path.exists(destino):
+                os.remove(temporal)  # ese contenido ya estaba en el almacén
+            else:
+                os.replace(temporal, destino)
+            recordar_digesto(ruta_origen, info, hash_contenido)
+        registrar_en_indice(
+            {ruta_original or f"{RELATIVA_ALMACEN}/subidas/{os.path.basename(ruta_origen)}": nombre}, raiz_public
+        )
+    return os.path.join(carpeta, nombre), f"{RELATIVA_ALMACEN}/{nombre}"
+
+
+# ---------------- Deduplicación del árbol existente ----------------
+def buscar_duplicados(raiz_public):
+    """
+    {hash: (rutas relativas 'assets/...' fuera del almacén, nombre en el almacén o None)}
+    de las imágenes repetidas. Una sola copia fuera del almacén cuenta como
+    repetida si ese contenido ya está en el almacén.
+    """
+    carpeta_assets = os.path.join(raiz_public, "assets")
+    almacen = os.path.abspath(carpeta_almacen(raiz_public))
+    por_hash, en_almacen = {}, {}
+    for raiz, carpetas, archivos in os.walk(carpeta_assets):
+        if os.path.abspath(raiz) == almacen:
+            carpetas[:] = []
+            for archivo in archivos:
+                hash_contenido = hash_de_nombre(archivo)
+                if hash_contenido:
+                    en_almacen.setdefault(hash_contenido, archivo)
+            continue
+        for archivo in archivos:
+            ruta = os.path.join(raiz, archivo)
+            if es_imagen(ruta):
+                relativa = os.path.relpath(ruta, raiz_public).replace(os.sep, "/")
+                por_hash.setdefault(digesto(ruta, guardar=False), []).append(relativa)
+    guardar_cache_digestos()
+    return {
+        h: (sorted(rutas), en_almacen.get(h))
+        for h, rutas in por_hash.items() if len(rutas) + (h in en_almacen) > 1
+    }
+
+
+def reemplazos_bd(cursor, reemplazos):
+    """
+    Cambia en la BD cada ruta vieja por la del almacén, en los tres formatos
+    que se guardan: 'assets/...', '/assets/...' y ruta absoluta local. Un
+    UPDATE ... CASE por columna (y por lote de LOTE_REEMPLAZOS rutas); el
+    commit queda a cargo de quien llama. Devuelve la cantidad de filas actualizadas.
+    """
+    filas = 0
+    for inicio in range(0, len(reemplazos), LOTE_REEMPLAZOS):
+        lote = reemplazos[inicio:inicio + LOTE_REEMPLAZOS]
+        casos = " ".join(["WHEN %s THEN %s"] * len(lote))
+        marcadores = ", ".join(["%s"] * len(lote))
+        valores = [valor for par in lote for valor in par] + [vieja for vieja, _ in lote]
+        for tabla, columnas in COLUMNAS_IMAGENES.items():
+            for columna in columnas:
+                cursor.execute(
+                    f"UPDATE {tabla} SET {columna} = CASE {columna} {casos} END "
+                    f"WHERE {columna} IN ({marcadores})",
+                    valores,
+                )
+                filas += cursor.rowcount
+    return filas
+
+
+def deduplicar(raiz_public=None, aplicar=False, conexion=None):
+    """
+    Mueve al almacén las imágenes repetidas, actualiza las rutas en la BD
+    (si se pasa 'conexion') y borra las copias. Sin 'aplicar' solo informa.
+    """
+    raiz_public = os.path.abspath(raiz_public or CARPETA_PUBLIC)
+    grupos = buscar_duplicados(raiz_public)
+    ahorro = sum(
+        os.path.getsize(os.path.join(raiz_public, rutas[0])) * (len(rutas) - (almacenado is None))
+        for rutas, almacenado in grupos.values()
+    )
+    print(f"[INFO] {len(grupos)} imagen(es) repetida(s), {sum(len(r) for r, _ in grupos.values())} archivo(s) "
+          f"fuera del almacén, {ahorro / 1024 / 1024:.1f} MB recuperables")
+    for rutas, almacenado in grupos.values():
+        print("   = " + " | ".join(rutas + ([f"{RELATIVA_ALMACEN}/{almacenado}"] if almacenado else [])))
+    if not aplicar or not grupos:
+        return True
+
+    carpeta = carpeta_almacen(raiz_public)
+    os.makedirs(carpeta, exist_ok=True)
+    reemplazos, indice = [], {}
+    for hash_contenido, (rutas, almacenado) in grupos.items():
+        nombre = almacenado or nombre_en_almacen(hash_contenido, rutas[0])
+        destino = os.path.join(carpeta, nombre)
+        if not os.path.exists(destino):
+            shutil.copy2(os.path.join(raiz_public, rutas[0]), destino)
+        nueva = f"{RELATIVA_ALMACEN}/{nombre}"
+        for relativa in rutas:
+            indice[relativa] = nombre
+            absoluta = os.path.join(raiz_public, *relativa.split("/"))
+            reemplazos += [(relativa, nueva), ("/" + relativa, "/" + nueva), (absoluta, destino)]
+    registrar_en_indice(indice, raiz_public)
+
+    if conexion is not None:
+        from database_hosting import incrementar_version_catalogo, notificar_cambio_catalogo
+        cursor = conexion.cursor()
+        try:
+            filas = reemplazos_bd(cursor, reemplazos)
+            incrementar_version_catalogo(conexion)
+            conexion.commit()
+            notificar_cambio_catalogo()
+            print(f"[OK] {filas} referencia(s) actualizada(s) en la BD")
+        except Exception as e:
+            conexion.rollback()
+            print(f"[ERROR] No se pudo actualizar la BD, no se borra ninguna copia: {e}")
+            return False
+        finally:
+            cursor.close()
+    else:
+        print("[WARN] Sin conexión a la BD: las rutas guardadas no se actualizaron")
+
+    # Lo que todavía apunte a una copia borrada (el frontend, rutas fuera de
+    # COLUMNAS_IMAGENES) se resuelve por indice.json: IndiceAssets en las
+    # ventanas y /static-assets en la API
+    for rutas, _ in grupos.values():
+        for relativa in rutas:
+            os.remove(os.path.join(raiz_public, *relativa.split("/")))
+    print(f"[SUCCESS] Copias reemplazadas por {len(grupos)} archivo(s) en {RELATIVA_ALMACEN}/")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplica las imágenes de assets en el almacén por contenido")
+    parser.add_argument('--carpeta', default=CARPETA_PUBLIC,
+                        help="Carpeta que contiene assets/ (por defecto el public/ del proyecto)")
+    parser.add_argument('--aplicar', action='store_true', help="Mover, actualizar la BD y borrar las copias")
+    parser.add_argument('--sin-bd', action='store_true', help="No actualizar las rutas en la BD del hosting")
+    args = parser.parse_args()
+
+    conexion = None
+    if args.aplicar and not args.sin_bd:
+        from PyQt5.QtWidgets import QApplication
+        from database_hosting import conectar_hosting, cerrar_conexion
+        app = QApplication([])
+        conexion = conectar_hosting()
+        if not conexion:
+            print("[ERROR] No se pudo conectar al hosting (usar --sin-bd para deduplicar igual)")
+            sys.exit(1)
+    try:
+        ok = deduplicar(args.carpeta, args.aplicar, conexion)
+    finally:
+        if conexion is not None:
+            cerrar_conexion(conexion)
+    sys.exit(0 if ok else 1)
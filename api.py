@@ -1,9 +1,21 @@
 # api.py - VERSIÓN COMPLETA Y CORREGIDA
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_file, send_from_directory
 from flask_cors import CORS
-import mysql.connector
-from mysql.connector import Error
+from werkzeug.security import safe_join
+from imagenes_variantes import (
+    FORMATOS, LADO_MAXIMO, PIL_DISPONIBLE, GeneradorVariantes, ManifiestoDerivados,
+    ajustar_calidad, ajustar_lado, es_imagen, normalizar_formato
+)
+from almacen_assets import NOMBRE_INDICE, RELATIVA_ALMACEN, IndiceAlmacen
+from imagenes_bd import TABLAS_IMAGENES, decodificar_data_uri
+from mysql.connector import Error, pooling
+from collections import OrderedDict
+from contextlib import contextmanager
+import gzip
+import hashlib
 import os
+import threading
+import time
 
 app = Flask(__name__, static_folder='react-build', static_url_path='')
 CORS(app)
@@ -12,22 +24,491 @@ CORS(app)
 # CONFIGURACIÓN BÁSICA
 # =========================
 REACT_BUILD_PATH = os.path.join(os.path.dirname(__file__), 'react-build')
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), 'assets')
+
+# Identificador del build desplegado: lo escribe el deploy (build_id.txt) y
+# lo informa /api/info-servidor para saber cuándo el hosting ya sirve el nuevo
+BUILD_ID_PATH = os.path.join(os.path.dirname(__file__), 'build_id.txt')
+
+def leer_build_id():
+    try:
+        with open(BUILD_ID_PATH, 'r', encoding='utf-8') as f:
+            build_id = f.read().strip()
+    except OSError:
+        build_id = None
+    return build_id or os.environ.get('RAILWAY_GIT_COMMIT_SHA')
+
+BUILD_ID = leer_build_id()
+
+# Variantes redimensionadas de /static-assets (ver imagenes_variantes.py)
+VARIANTES_PATH = os.environ.get('ASSETS_VARIANTES_PATH', os.path.join(os.path.dirname(__file__), 'cache_variantes'))
+VARIANTES_WORKERS = int(os.environ.get('ASSETS_VARIANTES_WORKERS', 2))
+VARIANTES_MAX_AGE = int(os.environ.get('ASSETS_VARIANTES_MAX_AGE', 604800))
+VARIANTES_MAX_MB = int(os.environ.get('ASSETS_VARIANTES_MAX_MB', 512))
+VARIANTES_MAX_DIAS = int(os.environ.get('ASSETS_VARIANTES_MAX_DIAS', 30))
+generador_variantes = GeneradorVariantes(
+    VARIANTES_PATH, max_workers=VARIANTES_WORKERS,
+    max_bytes=VARIANTES_MAX_MB * 1024 * 1024, max_edad=VARIANTES_MAX_DIAS * 24 * 3600
+)
+manifiesto_derivados = ManifiestoDerivados(os.path.join(ASSETS_PATH, 'derivados', 'manifest.json'))
+
+# Almacén por contenido (ver almacen_assets.py): las rutas viejas que reemplazó
+# la deduplicación se siguen sirviendo a través de indice.json
+ALMACEN_EN_ASSETS = RELATIVA_ALMACEN.split('/', 1)[1]  # 'imagenes/contenido'
+indice_almacen = IndiceAlmacen(os.path.join(ASSETS_PATH, *ALMACEN_EN_ASSETS.split('/'), NOMBRE_INDICE))
+
+def resolver_en_almacen(filename):
+    """'filename' si existe en assets/; si no, su copia en el almacén según indice.json"""
+    ruta = safe_join(ASSETS_PATH, filename)
+    if ruta and os.path.isfile(ruta):
+        return filename
+    nombre = indice_almacen.buscar(f"assets/{filename}")
+    return f"{ALMACEN_EN_ASSETS}/{nombre}" if nombre else filename
+
+def es_entero(valor):
+    """Solo dígitos ASCII: str.isdigit() también acepta '²', que int() rechaza"""
+    return valor.isascii() and valor.isdigit()
+
+def leer_entero(valor, minimo, maximo):
+    """Convierte un parámetro de query opcional a int validando el rango"""
+    if valor is None or valor == '':
+        return None
+    if not es_entero(valor) or not minimo <= int(valor) <= maximo:
+        raise ValueError(f"Valor fuera de rango ({minimo}-{maximo}): {valor}")
+    return int(valor)
+
+# =========================
+# POOL DE CONEXIONES MYSQL
+# =========================
+# Cada worker de gunicorn mantiene su propio pool (se crea en el primer uso,
+# después del fork). El tamaño se ajusta con MYSQL_POOL_SIZE.
+MYSQL_POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE', 5))
+MYSQL_POOL_NAME = os.environ.get('MYSQL_POOL_NAME', 'turismo_api')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def obtener_pool():
+    """Crea (una sola vez por proceso) y devuelve el pool de conexiones"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = {
+                    'host': os.environ.get('MYSQLHOST'),
+                    'user': os.environ.get('MYSQLUSER'),
+                    'password': os.environ.get('MYSQLPASSWORD'),
+                    'database': os.environ.get('MYSQLDATABASE'),
+                    'port': int(os.environ.get('MYSQLPORT', 3306)),
+                    'connect_timeout': 10,
+                }
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=f"{MYSQL_POOL_NAME}_{os.getpid()}",
+                    pool_size=MYSQL_POOL_SIZE,
+                    pool_reset_session=True,
+                    **config
+                )
+                print(f"✅ Pool BD creado ({MYSQL_POOL_SIZE} conexiones, pid {os.getpid()})")
+    return _pool
 
 def conectar_bd():
-    """Conexión simple a la base de datos"""
+    """
+    Obtiene una conexión del pool. get_connection() ya verifica que siga
+    viva y reconecta si Railway cerró la conexión inactiva.
+    """
     try:
-        config = {
-            'host': os.environ.get('MYSQLHOST'),
-            'user': os.environ.get('MYSQLUSER'),
-            'password': os.environ.get('MYSQLPASSWORD'),
-            'database': os.environ.get('MYSQLDATABASE'),
-            'port': int(os.environ.get('MYSQLPORT', 3306)),
-        }
-        return mysql.connector.connect(**config)
+        return obtener_pool().get_connection()
     except Exception as e:
         print(f"❌ Error BD: {e}")
         return None
 
+@contextmanager
+def conexion_bd():
+    """
+    Context manager que entrega una conexión del pool (o None) y garantiza
+    su devolución al pool aunque la consulta lance una excepción.
+    """
+    conn = conectar_bd()
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            try:
+                conn.close()  # en una conexión del pool, close() la devuelve al pool
+            except Exception as e:
+                print(f"⚠️ Error devolviendo conexión al pool: {e}")
+
+# =========================
+# CONSULTAS DEL CATÁLOGO
+# =========================
+def consultar_configuracion(cursor):
+    cursor.execute("""
+        SELECT 
+            id_config,
+            titulo_app,
+            logo_app,
+            logo_app_ruta_relativa,
+            icono_hamburguesa,
+            icono_hamburguesa_ruta_relativa,
+            icono_cerrar, 
+            icono_cerrar_ruta_relativa,
+            hero_titulo,
+            hero_imagen,
+            hero_imagen_ruta_relativa,
+            footer_texto,
+            direccion_facebook,
+            direccion_instagram,
+            direccion_twitter,
+            direccion_youtube,
+            correo_electronico,
+            habilitar
+        FROM configuracion_app WHERE habilitar = 1 LIMIT 1
+    """)
+    config = cursor.fetchone()
+    return config if config else {}
+
+def consultar_regiones(cursor):
+    cursor.execute("""
+        SELECT 
+            id_region_zona,
+            nombre_region_zona,
+            imagen_region_zona_ruta_relativa,
+            habilitar,
+            orden
+        FROM regiones_zonas WHERE habilitar = 1 ORDER BY orden ASC
+    """)
+    return cursor.fetchall()
+
+def consultar_secciones(cursor):
+    cursor.execute("""
+        SELECT 
+            id_seccion,
+            nombre_seccion,
+            icono_seccion,
+            orden,
+            habilitar
+        FROM secciones WHERE habilitar = 1 ORDER BY orden
+    """)
+    return cursor.fetchall()
+
+CAMPOS_SUB_SECCIONES = (
+    'id_sub_seccion',
+    'id_seccion',
+    'id_region_zona',
+    'nombre_sub_seccion',
+    'domicilio',
+    'latitud',
+    'longitud',
+    'distancia',
+    'numero_telefono',
+    'imagen_ruta_relativa',
+    'icono_ruta_relativa',
+    'itinerario_maps',
+    'habilitar',
+    'orden',
+    'destacado',
+)
+LIMITE_MAXIMO_SUB_SECCIONES = 200
+
+def consultar_sub_secciones(cursor, filtros=None):
+    """
+    Sub-secciones habilitadas ordenadas por (orden, id_sub_seccion). Si se
+    pide imagen_ruta_relativa se agrega imagen_srcset (manifiesto de
+    generar_derivados.py, o None si la imagen no tiene derivados).
+    filtros admite: id_seccion, id_region_zona, destacado, campos (lista
+    de columnas de CAMPOS_SUB_SECCIONES), limite y despues_de (tupla
+    orden, id_sub_seccion del último registro de la página anterior).
+    """
+    filtros = filtros or {}
+    campos = filtros.get('campos') or CAMPOS_SUB_SECCIONES
+    condiciones = ["habilitar = 1"]
+    parametros = []
+
+    for columna in ('id_seccion', 'id_region_zona', 'destacado'):
+        if filtros.get(columna) is not None:
+            condiciones.append(f"{columna} = %s")
+            parametros.append(filtros[columna])
+
+    if filtros.get('despues_de'):
+        orden, id_sub_seccion = filtros['despues_de']
+        condiciones.append("(orden > %s OR (orden = %s AND id_sub_seccion > %s))")
+        parametros.extend([orden, orden, id_sub_seccion])
+
+    consulta = (
+        f"SELECT {', '.join(campos)} FROM sub_secciones "
+        f"WHERE {' AND '.join(condiciones)} ORDER BY orden, id_sub_seccion"
+    )
+    if filtros.get('limite'):
+        consulta += " LIMIT %s"
+        parametros.append(filtros['limite'])
+
+    cursor.execute(consulta, parametros)
+    filas = cursor.fetchall()
+    if 'imagen_ruta_relativa' in campos:
+        for fila in filas:
+            fila['imagen_srcset'] = manifiesto_derivados.srcset(fila['imagen_ruta_relativa'])
+    return filas
+
+def consultar_pagina_sub_secciones(cursor, filtros):
+    """
+    Una página de sub-secciones (paginación por keyset) y el cursor para
+    pedir la siguiente, o None si no hay más.
+    """
+    # Se pide un registro extra para saber si existe otra página, y siempre
+    # se traen orden e id para poder armar el cursor aunque no se proyecten
+    campos_pedidos = list(filtros.get('campos') or CAMPOS_SUB_SECCIONES)
+    campos = list(campos_pedidos)
+    if 'imagen_ruta_relativa' in campos_pedidos:
+        campos_pedidos.append('imagen_srcset')
+    for columna in ('orden', 'id_sub_seccion'):
+        if columna not in campos:
+            campos.append(columna)
+
+    filas = consultar_sub_secciones(cursor, dict(filtros, campos=campos, limite=filtros['limite'] + 1))
+    hay_mas = len(filas) > filtros['limite']
+    filas = filas[:filtros['limite']]
+
+    siguiente = None
+    if hay_mas and filas:
+        siguiente = f"{filas[-1]['orden']}:{filas[-1]['id_sub_seccion']}"
+
+    return {
+        'sub_secciones': [{c: fila[c] for c in campos_pedidos} for fila in filas],
+        'siguiente_cursor': siguiente,
+    }
+
+def leer_filtros_sub_secciones(args):
+    """
+    Valida los parámetros de /api/sub-secciones.
+    Devuelve (filtros, None) o (None, mensaje_de_error).
+    """
+    filtros = {}
+    for parametro, columna in (('seccion', 'id_seccion'), ('region', 'id_region_zona')):
+        valor = args.get(parametro)
+        if valor is not None:
+            if not es_entero(valor):
+                return None, f"El parámetro '{parametro}' debe ser numérico"
+            filtros[columna] = int(valor)
+
+    destacado = args.get('destacado')
+    if destacado is not None:
+        if destacado not in ('0', '1'):
+            return None, "El parámetro 'destacado' debe ser 0 o 1"
+        filtros['destacado'] = int(destacado)
+
+    campos = args.get('fields')
+    if campos:
+        campos = [c.strip() for c in campos.split(',') if c.strip()]
+        invalidos = [c for c in campos if c not in CAMPOS_SUB_SECCIONES]
+        if invalidos:
+            return None, f"Campos no válidos: {', '.join(invalidos)}"
+        filtros['campos'] = campos
+
+    limite = args.get('limite')
+    if limite is not None:
+        if not es_entero(limite) or not 1 <= int(limite) <= LIMITE_MAXIMO_SUB_SECCIONES:
+            return None, f"El parámetro 'limite' debe estar entre 1 y {LIMITE_MAXIMO_SUB_SECCIONES}"
+        filtros['limite'] = int(limite)
+
+    cursor = args.get('cursor')
+    if cursor:
+        if 'limite' not in filtros:
+            return None, "El parámetro 'cursor' requiere 'limite'"
+        try:
+            orden, id_sub_seccion = (int(v) for v in cursor.split(':'))
+        except ValueError:
+            return None, "Cursor inválido"
+        filtros['despues_de'] = (orden, id_sub_seccion)
+
+    return filtros, None
+
+def consultar_bootstrap(cursor, id_region=None):
+    """
+    Todo lo que la SPA necesita para el primer render, en una sola sesión
+    de BD. Si se indica región, solo se incluyen sus sub-secciones.
+    """
+    return {
+        'configuracion': consultar_configuracion(cursor),
+        'regiones': consultar_regiones(cursor),
+        'secciones': consultar_secciones(cursor),
+        'sub_secciones': consultar_sub_secciones(cursor, {'id_region_zona': id_region}),
+    }
+
+# =========================
+# CACHÉ DE RESPUESTAS DEL CATÁLOGO
+# =========================
+# Guarda el JSON ya serializado de cada endpoint junto con la versión del
+# catálogo (tabla catalogo_version, incrementada por las ventanas de
+# administración). La versión se relee de la BD como máximo cada
+# CATALOGO_VERSION_TTL segundos; las entradas expiran a los CACHE_TTL segundos.
+CACHE_TTL = int(os.environ.get('API_CACHE_TTL', 300))
+CATALOGO_VERSION_TTL = int(os.environ.get('API_CATALOGO_VERSION_TTL', 5))
+CACHE_MAX_ENTRADAS = 256
+GZIP_MIN_BYTES = 1024
+
+_cache_respuestas = {}
+_cache_lock = threading.Lock()
+_version_catalogo = {'valor': None, 'actualizado': None, 'leida': 0.0}
+
+def leer_version_catalogo(conn):
+    """
+    Lee la versión actual del catálogo y su fecha de modificación y las deja
+    en _version_catalogo. Devuelve la versión (None si la tabla no existe).
+    """
+    version, actualizado = None, None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version, actualizado FROM catalogo_version WHERE id = 1")
+        fila = cursor.fetchone()
+        cursor.close()
+        if fila:
+            version, actualizado = fila
+    except Exception as e:
+        print(f"⚠️ No se pudo leer catalogo_version: {e}")
+
+    _version_catalogo['valor'] = version
+    _version_catalogo['actualizado'] = actualizado
+    _version_catalogo['leida'] = time.monotonic()
+    return version
+
+def obtener_version_catalogo():
+    """
+    Versión del catálogo cacheada por CATALOGO_VERSION_TTL segundos.
+    Si hace falta releerla se toma una conexión del pool.
+    """
+    if time.monotonic() - _version_catalogo['leida'] < CATALOGO_VERSION_TTL:
+        return _version_catalogo['valor']
+
+    with conexion_bd() as conn:
+        if conn is None:
+            return _version_catalogo['valor']
+        return leer_version_catalogo(conn)
+
+def cache_obtener(clave, version):
+    with _cache_lock:
+        entrada = _cache_respuestas.get(clave)
+    if not entrada:
+        return None
+    if entrada['version'] != version or entrada['expira'] < time.monotonic():
+        return None
+    return entrada
+
+def cache_guardar(clave, version, cuerpo):
+    entrada = {
+        'version': version,
+        'expira': time.monotonic() + CACHE_TTL,
+        'cuerpo': cuerpo,
+        'etag': calcular_etag(cuerpo),
+        'modificado': _version_catalogo['actualizado'],
+    }
+    with _cache_lock:
+        if clave not in _cache_respuestas and len(_cache_respuestas) >= CACHE_MAX_ENTRADAS:
+            # Descartar la entrada más próxima a expirar
+            mas_vieja = min(_cache_respuestas, key=lambda c: _cache_respuestas[c]['expira'])
+            del _cache_respuestas[mas_vieja]
+        _cache_respuestas[clave] = entrada
+    return entrada
+
+def serializar_json(datos):
+    """Serializa igual que jsonify (Decimal, fechas) pero devuelve bytes"""
+    return app.json.dumps(datos, separators=(",", ":")).encode('utf-8')
+
+def respuesta_json(cuerpo, status=200):
+    return Response(cuerpo, status=status, mimetype='application/json')
+
+def acepta_gzip():
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+def respuesta_desde_cache(entrada):
+    """Arma la respuesta de una entrada de caché con sus validadores HTTP"""
+    if len(entrada['cuerpo']) >= GZIP_MIN_BYTES and acepta_gzip():
+        # Se comprime una sola vez por entrada y se reutiliza
+        if 'cuerpo_gzip' not in entrada:
+            entrada['cuerpo_gzip'] = gzip.compress(entrada['cuerpo'], compresslevel=6)
+        respuesta = respuesta_json(entrada['cuerpo_gzip'])
+        respuesta.headers['Content-Encoding'] = 'gzip'
+        respuesta.set_etag(entrada['etag'] + '-gz')
+    else:
+        respuesta = respuesta_json(entrada['cuerpo'])
+        respuesta.set_etag(entrada['etag'])
+    respuesta.vary.add('Accept-Encoding')
+    if entrada['modificado']:
+        respuesta.last_modified = entrada['modificado']
+    respuesta.headers['Cache-Control'] = CACHE_CONTROL_CATALOGO
+    return respuesta
+
+def responder_catalogo(clave, consulta, etiqueta):
+    """
+    Responde un endpoint de solo lectura del catálogo desde la caché en
+    memoria, consultando la BD únicamente si la versión cambió o expiró.
+    """
+    # El manifiesto de derivados también forma parte de la versión: las
+    # sub-secciones incluyen su srcset
+    manifiesto_derivados.actualizar()
+    version = obtener_version_catalogo()
+    entrada = cache_obtener(clave, (version, manifiesto_derivados.firma))
+    if entrada:
+        return respuesta_desde_cache(entrada)
+
+    with conexion_bd() as conn:
+        if not conn:
+            return jsonify({"error": "No hay conexión a BD"}), 500
+
+        try:
+            # La versión se lee en la misma transacción y antes que los
+            # datos, así nunca se cachean datos viejos bajo una versión nueva
+            version = leer_version_catalogo(conn)
+            cursor = conn.cursor(dictionary=True)
+            datos = consulta(cursor)
+            cursor.close()
+        except Exception as e:
+            print(f"❌ {etiqueta} - Error: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    if isinstance(datos, list):
+        print(f"✅ {etiqueta} - {len(datos)} registro(s) (versión catálogo {version})")
+    else:
+        print(f"✅ {etiqueta} - cargado (versión catálogo {version})")
+    entrada = cache_guardar(clave, (version, manifiesto_derivados.firma), serializar_json(datos))
+    return respuesta_desde_cache(entrada)
+
+# =========================
+# CACHÉ HTTP (ETag / Last-Modified)
+# =========================
+# Los endpoints del catálogo pueden reutilizarse API_CACHE_MAX_AGE segundos
+# sin consultar; después el navegador revalida con If-None-Match y recibe
+# un 304 sin cuerpo si nada cambió.
+CACHE_MAX_AGE = int(os.environ.get('API_CACHE_MAX_AGE', 60))
+CACHE_CONTROL_CATALOGO = f"public, max-age={CACHE_MAX_AGE}, must-revalidate"
+CACHE_CONTROL_SIN_CACHE = {
+    '/api/health': "no-store",
+    '/api/info-servidor': "no-store",
+    '/api/usuarios': "private, no-cache",
+}
+
+def calcular_etag(cuerpo):
+    """ETag fuerte: hash del contenido serializado"""
+    return hashlib.sha256(cuerpo).hexdigest()[:32]
+
+@app.after_request
+def aplicar_cache_http(respuesta):
+    if not request.path.startswith('/api/') or request.method not in ('GET', 'HEAD'):
+        return respuesta
+    if respuesta.status_code != 200 or respuesta.mimetype != 'application/json':
+        return respuesta
+
+    if request.path in CACHE_CONTROL_SIN_CACHE:
+        respuesta.headers['Cache-Control'] = CACHE_CONTROL_SIN_CACHE[request.path]
+        if respuesta.headers['Cache-Control'] == "no-store":
+            return respuesta
+    elif 'Cache-Control' not in respuesta.headers:
+        respuesta.headers['Cache-Control'] = "no-cache"
+
+    if not respuesta.get_etag()[0]:
+        respuesta.set_etag(calcular_etag(respuesta.get_data()))
+    # Devuelve 304 sin cuerpo si coincide If-None-Match / If-Modified-Since
+    return respuesta.make_conditional(request)
+
 # =========================
 # RUTAS PARA FRONTEND REACT
 # =========================
@@ -38,8 +519,44 @@ def servir_frontend():
 # ✅ CORREGIDO: Cambiar de "/assets/" a "/static-assets/" para evitar conflicto con React Router
 @app.route("/static-assets/<path:filename>")
 def servir_assets(filename):
-    assets_path = os.path.join(os.path.dirname(__file__), 'assets')
-    return send_from_directory(assets_path, filename)
+    """
+    Sirve archivos de assets/. Para imágenes admite ?w=, ?h=, ?fmt=webp|jpeg|png
+    y ?q= (calidad): devuelve una variante redimensionada, cacheada en disco.
+    w/h se redondean hacia arriba a LADOS_PERMITIDOS y q al nivel más cercano.
+    Las rutas que deduplicó almacen_assets.py se resuelven por indice.json.
+    """
+    filename = resolver_en_almacen(filename)
+    if not any(p in request.args for p in ('w', 'h', 'fmt', 'q')):
+        return send_from_directory(ASSETS_PATH, filename)
+
+    origen = safe_join(ASSETS_PATH, filename)
+    if not origen or not os.path.isfile(origen):
+        return jsonify({"error": "Archivo no encontrado"}), 404
+    if not PIL_DISPONIBLE or not es_imagen(origen):
+        return send_from_directory(ASSETS_PATH, filename)
+
+    try:
+        ancho = ajustar_lado(leer_entero(request.args.get('w'), 1, LADO_MAXIMO))
+        alto = ajustar_lado(leer_entero(request.args.get('h'), 1, LADO_MAXIMO))
+        calidad = ajustar_calidad(leer_entero(request.args.get('q'), 1, 100))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    extension = os.path.splitext(origen)[1].lower().lstrip('.')
+    formato = request.args.get('fmt', extension if extension in FORMATOS else 'jpeg').lower()
+    if formato not in FORMATOS:
+        return jsonify({"error": f"Formato no soportado: {formato}"}), 400
+    formato = normalizar_formato(formato)
+
+    try:
+        variante = generador_variantes.obtener(origen, ancho, alto, formato, calidad)
+    except Exception as e:
+        print(f"❌ Variante de {filename} - Error: {e}")
+        return send_from_directory(ASSETS_PATH, filename)
+
+    respuesta = send_file(variante, mimetype=FORMATOS[formato][1], conditional=True)
+    respuesta.headers['Cache-Control'] = f"public, max-age={VARIANTES_MAX_AGE}"
+    return respuesta
 
 @app.route("/<path:path>")
 def servir_react(path):
@@ -61,183 +578,209 @@ def health():
 
 @app.route("/api/info-servidor")
 def info_servidor():
-    conn = conectar_bd()
-    bd_conectada = conn is not None
-    if conn:
-        conn.close()
+    with conexion_bd() as conn:
+        bd_conectada = conn is not None
     
     return jsonify({
         "status": "servidor_activo",
         "mensaje": "API funcionando correctamente", 
         "conexion_bd": bd_conectada,
-        "frontend_react": os.path.exists(os.path.join(REACT_BUILD_PATH, 'index.html'))
+        "frontend_react": os.path.exists(os.path.join(REACT_BUILD_PATH, 'index.html')),
+        "build": BUILD_ID
     })
 
+@app.route("/api/bootstrap")
+def get_bootstrap():
+    id_region = request.args.get('region')
+    if id_region is not None:
+        if not es_entero(id_region):
+            return jsonify({"error": "El parámetro 'region' debe ser numérico"}), 400
+        id_region = int(id_region)
+
+    return responder_catalogo(
+        f'bootstrap:{id_region}' if id_region is not None else 'bootstrap',
+        lambda cursor: consultar_bootstrap(cursor, id_region),
+        "API Bootstrap"
+    )
+
 @app.route("/api/configuracion")
 def get_configuracion():
-    conn = conectar_bd()
-    if not conn:
-        return jsonify({"error": "No hay conexión a BD"}), 500
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                id_config,
-                titulo_app,
-                logo_app,
-                logo_app_ruta_relativa,
-                icono_hamburguesa,
-                icono_hamburguesa_ruta_relativa,
-                icono_cerrar, 
-                icono_cerrar_ruta_relativa,
-                hero_titulo,
-                hero_imagen,
-                hero_imagen_ruta_relativa,
-                footer_texto,
-                direccion_facebook,
-                direccion_instagram,
-                direccion_twitter,
-                direccion_youtube,
-                correo_electronico,
-                habilitar
-            FROM configuracion_app WHERE habilitar = 1 LIMIT 1
-        """)
-        config = cursor.fetchone()
-        conn.close()
-        
-        if config:
-            print("✅ API Config - Configuración cargada")
-        else:
-            print("⚠️ API Config - No hay configuración activa")
-            
-        return jsonify(config if config else {})
-    except Exception as e:
-        print(f"❌ API Config - Error: {e}")
-        return jsonify({"error": str(e)}), 500
+    return responder_catalogo('configuracion', consultar_configuracion, "API Config")
 
 @app.route("/api/usuarios")
 def get_usuarios():
-    conn = conectar_bd()
-    if not conn:
-        return jsonify({"error": "No hay conexión a BD"}), 500
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                id_usuario,
-                apellido_nombres_usuario,
-                dni_usuario,
-                domicilio_usuario,
-                localidad_usuario,
-                provincia_usuario,
-                telefono_usuario,
-                email_usuario,
-                nombre_usuario_acceso,
-                foto_usuario,
-                rol_usuario,
-                activo
-            FROM usuarios WHERE activo = 1 ORDER BY apellido_nombres_usuario
-        """)
-        usuarios = cursor.fetchall()
-        conn.close()
+    with conexion_bd() as conn:
+        if not conn:
+            return jsonify({"error": "No hay conexión a BD"}), 500
+
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT 
+                    id_usuario,
+                    apellido_nombres_usuario,
+                    dni_usuario,
+                    domicilio_usuario,
+                    localidad_usuario,
+                    provincia_usuario,
+                    telefono_usuario,
+                    email_usuario,
+                    nombre_usuario_acceso,
+                    foto_usuario,
+                    rol_usuario,
+                    activo
+                FROM usuarios WHERE activo = 1 ORDER BY apellido_nombres_usuario
+            """)
+            usuarios = cursor.fetchall()
+            cursor.close()
         
-        print(f"✅ API Usuarios - {len(usuarios)} usuarios activos")
-        return jsonify(usuarios)
-    except Exception as e:
-        print(f"❌ API Usuarios - Error: {e}")
-        return jsonify({"error": str(e)}), 500
+            print(f"✅ API Usuarios - {len(usuarios)} usuarios activos")
+            return jsonify(usuarios)
+        except Exception as e:
+            print(f"❌ API Usuarios - Error: {e}")
+            return jsonify({"error": str(e)}), 500
 
 @app.route("/api/regiones")
 @app.route("/api/regiones_zonas")
 def get_regiones():
-    conn = conectar_bd()
-    if not conn:
-        return jsonify({"error": "No hay conexión a BD"}), 500
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                id_region_zona,
-                nombre_region_zona,
-                imagen_region_zona_ruta_relativa,
-                habilitar,
-                orden
-            FROM regiones_zonas WHERE habilitar = 1 ORDER BY orden ASC
-        """)
-        regiones = cursor.fetchall()
-        conn.close()
-        
-        print(f"✅ API Regiones - {len(regiones)} regiones")
-        return jsonify(regiones)
-    except Exception as e:
-        print(f"❌ API Regiones - Error: {e}")
-        return jsonify({"error": str(e)}), 500
+    return responder_catalogo('regiones', consultar_regiones, "API Regiones")
 
 @app.route("/api/secciones")
 def get_secciones():
-    conn = conectar_bd()
-    if not conn:
-        return jsonify({"error": "No hay conexión a BD"}), 500
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                id_seccion,
-                nombre_seccion,
-                icono_seccion,
-                orden,
-                habilitar
-            FROM secciones WHERE habilitar = 1 ORDER BY orden
-        """)
-        secciones = cursor.fetchall()
-        conn.close()
-        
-        print(f"✅ API Secciones - {len(secciones)} secciones")
-        return jsonify(secciones)
-    except Exception as e:
-        print(f"❌ API Secciones - Error: {e}")
-        return jsonify({"error": str(e)}), 500
+    return responder_catalogo('secciones', consultar_secciones, "API Secciones")
 
 @app.route("/api/sub-secciones")
 def get_sub_secciones():
-    conn = conectar_bd()
-    if not conn:
-        return jsonify({"error": "No hay conexión a BD"}), 500
+    """
+    Sin parámetros devuelve todas las sub-secciones habilitadas. Admite
+    ?seccion=, ?region=, ?destacado=0|1 y ?fields=campo1,campo2. Con
+    ?limite=N la respuesta se pagina: {"sub_secciones": [...],
+    "siguiente_cursor": "..."} y la página siguiente se pide con ?cursor=.
+    """
+    filtros, error = leer_filtros_sub_secciones(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    if not filtros:
+        return responder_catalogo('sub_secciones', consultar_sub_secciones, "API Sub-Secciones")
+
+    clave = 'sub_secciones?' + '&'.join(f"{k}={filtros[k]}" for k in sorted(filtros))
+    if 'limite' in filtros:
+        consulta = lambda cursor: consultar_pagina_sub_secciones(cursor, filtros)
+    else:
+        consulta = lambda cursor: consultar_sub_secciones(cursor, filtros)
+    return responder_catalogo(clave, consulta, "API Sub-Secciones")
     
+# =========================
+# IMÁGENES ALMACENADAS EN LA BD
+# =========================
+# Tablas y campos de imagen: TABLAS_IMAGENES de imagenes_bd.py
+IMAGENES_CACHE_BYTES = int(os.environ.get('API_IMAGENES_CACHE_MB', 64)) * 1024 * 1024
+IMAGENES_MAX_AGE = int(os.environ.get('API_IMAGENES_MAX_AGE', 86400))
+
+class CacheImagenes:
+    """LRU acotada por tamaño total en bytes de las imágenes ya decodificadas"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self.lock:
+            entrada = self.entradas.get(clave)
+            if entrada is not None:
+                self.entradas.move_to_end(clave)
+            return entrada
+
+    def guardar(self, clave, entrada):
+        tamanio = len(entrada['datos'])
+        if tamanio > self.max_bytes:
+            return
+        with self.lock:
+            anterior = self.entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior['datos'])
+            self.entradas[clave] = entrada
+            self.bytes += tamanio
+            while self.bytes > self.max_bytes:
+                _, descartada = self.entradas.popitem(last=False)
+                self.bytes -= len(descartada['datos'])
+
+_cache_imagenes = CacheImagenes(IMAGENES_CACHE_BYTES)
+
+def consultar_imagen(conn, tabla, id_registro, campo):
+    """
+    Busca la imagen en la tabla 'imagenes'; si el registro todavía no fue
+    migrado, la decodifica desde la columna *_base64 heredada.
+    """
+    cursor = conn.cursor()
     try:
-        cursor = conn.cursor(dictionary=True)
         cursor.execute("""
-            SELECT 
-                id_sub_seccion,
-                id_seccion,
-                id_region_zona,
-                nombre_sub_seccion,
-                domicilio,
-                latitud,
-                longitud,
-                distancia,
-                numero_telefono,
-                imagen_ruta_relativa,
-                icono_ruta_relativa,
-                itinerario_maps,
-                habilitar,
-                orden,
-                destacado
-            FROM sub_secciones WHERE habilitar = 1 ORDER BY orden
-        """)
-        sub_secciones = cursor.fetchall()
-        conn.close()
-        
-        print(f"✅ API Sub-Secciones - {len(sub_secciones)} sub-secciones")
-        return jsonify(sub_secciones)
-    except Exception as e:
-        print(f"❌ API Sub-Secciones - Error: {e}")
-        return jsonify({"error": str(e)}), 500
-    
+            SELECT i.hash, i.mime, i.datos
+            FROM imagenes_registros r JOIN imagenes i ON i.hash = r.hash
+            WHERE r.tabla = %s AND r.id_registro = %s AND r.campo = %s
+        """, (tabla, id_registro, campo))
+        fila = cursor.fetchone()
+    except Error as e:
+        print(f"⚠️ Tabla de imágenes no disponible: {e}")
+        fila = None
+
+    if fila:
+        cursor.close()
+        hash_imagen, mime, datos = fila
+        return {'hash': hash_imagen, 'mime': mime, 'datos': bytes(datos)}
+
+    clave, campos = TABLAS_IMAGENES[tabla]
+    try:
+        cursor.execute(f"SELECT {campos[campo]} FROM {tabla} WHERE {clave} = %s", (id_registro,))
+        fila = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not fila or not fila[0]:
+        return None
+
+    imagen = decodificar_data_uri(fila[0])
+    if imagen is None:
+        return None
+    mime, datos = imagen
+    return {'hash': hashlib.sha256(datos).hexdigest(), 'mime': mime, 'datos': datos}
+
+@app.route("/api/imagenes/<tabla>/<int:id_registro>/<campo>")
+def get_imagen(tabla, id_registro, campo):
+    """
+    Sirve una imagen almacenada en la BD como binario. Con ?v=<hash> la URL
+    queda atada al contenido y se puede cachear como inmutable.
+    """
+    if tabla not in TABLAS_IMAGENES or campo not in TABLAS_IMAGENES[tabla][1]:
+        return jsonify({"error": "Imagen no encontrada"}), 404
+
+    # La versión del catálogo forma parte de la clave: al modificar una
+    # imagen desde la administración la entrada vieja deja de usarse
+    clave = (obtener_version_catalogo(), tabla, id_registro, campo)
+    imagen = _cache_imagenes.obtener(clave)
+    if imagen is None:
+        with conexion_bd() as conn:
+            if not conn:
+                return jsonify({"error": "No hay conexión a BD"}), 500
+            try:
+                imagen = consultar_imagen(conn, tabla, id_registro, campo)
+            except Exception as e:
+                print(f"❌ API Imágenes - Error: {e}")
+                return jsonify({"error": str(e)}), 500
+        if imagen is None:
+            return jsonify({"error": "Imagen no encontrada"}), 404
+        _cache_imagenes.guardar(clave, imagen)
+
+    respuesta = Response(imagen['datos'], mimetype=imagen['mime'])
+    respuesta.set_etag(imagen['hash'])
+    if request.args.get('v') == imagen['hash']:
+        respuesta.headers['Cache-Control'] = "public, max-age=31536000, immutable"
+    else:
+        respuesta.headers['Cache-Control'] = f"public, max-age={IMAGENES_MAX_AGE}"
+    return respuesta.make_conditional(request)
+
 # =========================
 # MANEJO DE ERRORES
 # =========================
@@ -1,23 +1,40 @@
 # -*- coding: utf-8 -*-
-import base64
 import os
 from PyQt5 import uic
-from database_hosting import conectar_hosting as conectar_base_datos
+from database_hosting import conectar_hosting as conectar_base_datos, incrementar_version_catalogo, notificar_cambio_catalogo, guardar_imagen_desde_archivo
+from consultas_async import ConsultorAsync
+from almacen_assets import guardar_en_almacen, relativa_en_almacen
 from PyQt5.QtWidgets import QFileDialog, QTableWidgetItem, QApplication, QWidget, QMessageBox, QLabel
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QBrush, QPen, QColor, QPainterPath
 from PyQt5.QtCore import Qt
 import os
 
-def imagen_a_base64(ruta_imagen):
-    """Convierte imagen a Base64 para guardar en BD"""
-    try:
-        with open(ruta_imagen, "rb") as file:
-            image_data = file.read()
-            base64_encoded = base64.b64encode(image_data).decode('utf-8')
-            return f"data:image/jpeg;base64,{base64_encoded}"
-    except Exception as e:
-        print(f"Error procesando imagen: {e}")
-        return None
+def guardar_imagenes_configuracion(conexion, id_config, rutas):
+    """Guarda en la tabla de imágenes del hosting los archivos indicados (campo -> ruta)"""
+    for campo, ruta in rutas.items():
+        if ruta and os.path.exists(ruta):
+            guardar_imagen_desde_archivo(conexion, 'configuracion_app', id_config, campo, ruta)
+
+COLUMNAS_TABLA_CONFIG = ["ID", "Título", "Logo", "Logo Ruta Rel", "Icono Abrir", "Icono Abrir Ruta Rel", 
+                         "Icono Cerrar", "Icono Cerrar Ruta Rel", "Hero Título", "Hero Imagen", "Hero Imagen Ruta Rel",
+                         "Footer", "Facebook", "Instagram", "Twitter", "Youtube", "Correo"]
+
+def consultar_configuraciones(conexion, habilitar):
+    """Configuraciones activas o inactivas (se ejecuta fuera del hilo de la interfaz)"""
+    cursor = conexion.cursor()
+    cursor.execute("""
+        SELECT id_config, titulo_app, 
+            logo_app, logo_app_ruta_relativa,
+            icono_hamburguesa, icono_hamburguesa_ruta_relativa,
+            icono_cerrar, icono_cerrar_ruta_relativa,
+            hero_titulo, hero_imagen, hero_imagen_ruta_relativa,
+            footer_texto, direccion_facebook, direccion_instagram, 
+            direccion_twitter, direccion_youtube, correo_electronico
+        FROM configuracion_app WHERE habilitar = %s
+    """, (habilitar,))
+    resultados = cursor.fetchall()
+    cursor.close()
+    return resultados
 
 def convertir_ruta_produccion(ruta_absoluta):
     """Convierte rutas absolutas a rutas relativas para producción React"""
@@ -26,6 +43,10 @@ def convertir_ruta_produccion(ruta_absoluta):
     
     nombre_archivo = os.path.basename(ruta_absoluta)
     
+    # Archivo del almacén por contenido
+    if relativa_en_almacen(ruta_absoluta):
+        return relativa_en_almacen(ruta_absoluta)
+    
     # Determinar tipo de archivo por extensión y contexto
     if nombre_archivo.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
         if any(keyword in nombre_archivo.lower() for keyword in ['icono', 'menu', 'hamburguesa']):
@@ -63,7 +84,8 @@ class VentanaConfiguracion(QWidget):
         self.setWindowTitle("Configuración de la App")
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowMinMaxButtonsHint)
 
-        # Cargar configuraciones
+        # Cargar configuraciones (en segundo plano)
+        self.consultas = ConsultorAsync(self)
         self.cargar_configuracion_activa()
         self.cargar_configuracion_inactiva()
 
@@ -89,6 +111,7 @@ class VentanaConfiguracion(QWidget):
         self.move(ventana.topLeft())
 
     def closeEvent(self, event):
+        self.consultas.cancelar_todas()
         if self.parent():
             self.parent().mostrar_menu_lateral()
         super().closeEvent(event)
@@ -96,27 +119,11 @@ class VentanaConfiguracion(QWidget):
     # ------------------ CRUD -------------------
 
     def cargar_configuracion_activa(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("""
-            SELECT id_config, titulo_app, 
-                logo_app, logo_app_ruta_relativa,
-                icono_hamburguesa, icono_hamburguesa_ruta_relativa,
-                icono_cerrar, icono_cerrar_ruta_relativa,
-                hero_titulo, hero_imagen, hero_imagen_ruta_relativa,
-                footer_texto, direccion_facebook, direccion_instagram, 
-                direccion_twitter, direccion_youtube, correo_electronico
-            FROM configuracion_app WHERE habilitar = 1
-        """)
-        resultados = cursor.fetchall()
-        conexion.close()
-
-        columnas = ["ID", "Título", "Logo", "Logo Ruta Rel", "Icono Abrir", "Icono Abrir Ruta Rel", 
-                    "Icono Cerrar", "Icono Cerrar Ruta Rel", "Hero Título", "Hero Imagen", "Hero Imagen Ruta Rel",
-                    "Footer", "Facebook", "Instagram", "Twitter", "Youtube", "Correo"]
-        
-        self.Tabla_configuracion_activa.setColumnCount(len(columnas))
-        self.Tabla_configuracion_activa.setHorizontalHeaderLabels(columnas)
+        self.consultas.ejecutar("config_activa", consultar_configuraciones, self.mostrar_configuracion_activa, habilitar=1)
+
+    def mostrar_configuracion_activa(self, resultados):
+        self.Tabla_configuracion_activa.setColumnCount(len(COLUMNAS_TABLA_CONFIG))
+        self.Tabla_configuracion_activa.setHorizontalHeaderLabels(COLUMNAS_TABLA_CONFIG)
         self.Tabla_configuracion_activa.setRowCount(0)
 
         for row_number, row_data in enumerate(resultados):
@@ -126,27 +133,11 @@ class VentanaConfiguracion(QWidget):
                 self.Tabla_configuracion_activa.setItem(row_number, column_number, item)
 
     def cargar_configuracion_inactiva(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("""
-            SELECT id_config, titulo_app, 
-                logo_app, logo_app_ruta_relativa,
-                icono_hamburguesa, icono_hamburguesa_ruta_relativa,
-                icono_cerrar, icono_cerrar_ruta_relativa,
-                hero_titulo, hero_imagen, hero_imagen_ruta_relativa,
-                footer_texto, direccion_facebook, direccion_instagram, 
-                direccion_twitter, direccion_youtube, correo_electronico
-            FROM configuracion_app WHERE habilitar = 0
-        """)
-        resultados = cursor.fetchall()
-        conexion.close()
-
-        columnas = ["ID", "Título", "Logo", "Logo Ruta Rel", "Icono Abrir", "Icono Abrir Ruta Rel", 
-                    "Icono Cerrar", "Icono Cerrar Ruta Rel", "Hero Título", "Hero Imagen", "Hero Imagen Ruta Rel",
-                    "Footer", "Facebook", "Instagram", "Twitter", "Youtube", "Correo"]
-        
-        self.Tabla_configuraciones_inactiva.setColumnCount(len(columnas))
-        self.Tabla_configuraciones_inactiva.setHorizontalHeaderLabels(columnas)
+        self.consultas.ejecutar("config_inactiva", consultar_configuraciones, self.mostrar_configuracion_inactiva, habilitar=0)
+
+    def mostrar_configuracion_inactiva(self, resultados):
+        self.Tabla_configuraciones_inactiva.setColumnCount(len(COLUMNAS_TABLA_CONFIG))
+        self.Tabla_configuraciones_inactiva.setHorizontalHeaderLabels(COLUMNAS_TABLA_CONFIG)
         self.Tabla_configuraciones_inactiva.setRowCount(0)
 
         for row_number, row_data in enumerate(resultados):
@@ -321,11 +312,13 @@ class VentanaConfiguracion(QWidget):
         hero_img_abs = hero_img  # Ruta absoluta
         hero_img_rel = convertir_ruta_produccion(hero_img)  # Ruta relativa
 
-        # --- CONVERTIR IMÁGENES A BASE64 ---
-        logo_base64 = imagen_a_base64(logo) if logo and os.path.exists(logo) else None
-        icono_abrir_base64 = imagen_a_base64(icono_abrir) if icono_abrir and os.path.exists(icono_abrir) else None
-        icono_cerrar_base64 = imagen_a_base64(icono_cerrar) if icono_cerrar and os.path.exists(icono_cerrar) else None
-        hero_img_base64 = imagen_a_base64(hero_img) if hero_img and os.path.exists(hero_img) else None
+        # --- IMÁGENES: se guardan aparte, en la tabla de imágenes del hosting ---
+        imagenes = {
+            'logo': logo,
+            'icono_hamburguesa': icono_abrir,
+            'icono_cerrar': icono_cerrar,
+            'hero_imagen': hero_img,
+        }
 
         try:
             conexion = conectar_base_datos()
@@ -333,22 +326,25 @@ class VentanaConfiguracion(QWidget):
             cursor.execute("""
                 INSERT INTO configuracion_app 
                 (titulo_app, 
-                logo_app, logo_app_ruta_relativa, logo_base64,           # ✅ ABSOLUTA y RELATIVA separadas
-                icono_hamburguesa, icono_hamburguesa_ruta_relativa, icono_hamburguesa_base64,
-                icono_cerrar, icono_cerrar_ruta_relativa, icono_cerrar_base64,
-                hero_titulo, hero_imagen, hero_imagen_ruta_relativa, hero_imagen_base64,
+                logo_app, logo_app_ruta_relativa,           # ✅ ABSOLUTA y RELATIVA separadas
+                icono_hamburguesa, icono_hamburguesa_ruta_relativa,
+                icono_cerrar, icono_cerrar_ruta_relativa,
+                hero_titulo, hero_imagen, hero_imagen_ruta_relativa,
                 footer_texto, direccion_facebook, direccion_instagram,
                 direccion_twitter, direccion_youtube, correo_electronico, habilitar)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1)
             """, (
                 titulo, 
-                logo_abs, logo_rel, logo_base64,                        # ✅ Absoluta + Relativa
-                icono_abrir_abs, icono_abrir_rel, icono_abrir_base64,   # ✅ Absoluta + Relativa
-                icono_cerrar_abs, icono_cerrar_rel, icono_cerrar_base64, # ✅ Absoluta + Relativa
-                hero_titulo, hero_img_abs, hero_img_rel, hero_img_base64, # ✅ Absoluta + Relativa
+                logo_abs, logo_rel,                        # ✅ Absoluta + Relativa
+                icono_abrir_abs, icono_abrir_rel,          # ✅ Absoluta + Relativa
+                icono_cerrar_abs, icono_cerrar_rel,        # ✅ Absoluta + Relativa
+                hero_titulo, hero_img_abs, hero_img_rel,   # ✅ Absoluta + Relativa
                 footer, facebook, instagram, twitter, youtube, correo
             ))
+            guardar_imagenes_configuracion(conexion, cursor.lastrowid, imagenes)
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
             QMessageBox.information(self, "Configuración", "Configuración agregada correctamente.")
@@ -381,11 +377,13 @@ class VentanaConfiguracion(QWidget):
         hero_img_abs = hero_img  # Ruta absoluta
         hero_img_rel = convertir_ruta_produccion(hero_img)  # Ruta relativa
 
-        # --- CONVERTIR IMÁGENES A BASE64 ---
-        logo_base64 = imagen_a_base64(logo) if logo and os.path.exists(logo) else None
-        icono_abrir_base64 = imagen_a_base64(icono_abrir) if icono_abrir and os.path.exists(icono_abrir) else None
-        icono_cerrar_base64 = imagen_a_base64(icono_cerrar) if icono_cerrar and os.path.exists(icono_cerrar) else None
-        hero_img_base64 = imagen_a_base64(hero_img) if hero_img and os.path.exists(hero_img) else None
+        # --- IMÁGENES: se guardan aparte, en la tabla de imágenes del hosting ---
+        imagenes = {
+            'logo': logo,
+            'icono_hamburguesa': icono_abrir,
+            'icono_cerrar': icono_cerrar,
+            'hero_imagen': hero_img,
+        }
 
         try:
             conexion = conectar_base_datos()
@@ -393,10 +391,10 @@ class VentanaConfiguracion(QWidget):
             cursor.execute("""
                 UPDATE configuracion_app
                 SET titulo_app=%s,
-                    logo_app=%s, logo_app_ruta_relativa=%s, logo_base64=%s,           # ✅ ABSOLUTA y RELATIVA separadas
-                    icono_hamburguesa=%s, icono_hamburguesa_ruta_relativa=%s, icono_hamburguesa_base64=%s,
-                    icono_cerrar=%s, icono_cerrar_ruta_relativa=%s, icono_cerrar_base64=%s,
-                    hero_titulo=%s, hero_imagen=%s, hero_imagen_ruta_relativa=%s, hero_imagen_base64=%s,
+                    logo_app=%s, logo_app_ruta_relativa=%s,           # ✅ ABSOLUTA y RELATIVA separadas
+                    icono_hamburguesa=%s, icono_hamburguesa_ruta_relativa=%s,
+                    icono_cerrar=%s, icono_cerrar_ruta_relativa=%s,
+                    hero_titulo=%s, hero_imagen=%s, hero_imagen_ruta_relativa=%s,
                     footer_texto=%s,
                     direccion_facebook=%s,
                     direccion_instagram=%s,
@@ -406,11 +404,11 @@ class VentanaConfiguracion(QWidget):
                 WHERE id_config=%s
             """, (
                 self.lineEdit_titulo_app.text(),
-                logo_abs, logo_rel, logo_base64,                                # ✅ Absoluta + Relativa
-                icono_abrir_abs, icono_abrir_rel, icono_abrir_base64,           # ✅ Absoluta + Relativa
-                icono_cerrar_abs, icono_cerrar_rel, icono_cerrar_base64,        # ✅ Absoluta + Relativa
+                logo_abs, logo_rel,                                # ✅ Absoluta + Relativa
+                icono_abrir_abs, icono_abrir_rel,                  # ✅ Absoluta + Relativa
+                icono_cerrar_abs, icono_cerrar_rel,                # ✅ Absoluta + Relativa
                 self.lineEdit_hero_titulo.text(),
-                hero_img_abs, hero_img_rel, hero_img_base64,                    # ✅ Absoluta + Relativa
+                hero_img_abs, hero_img_rel,                        # ✅ Absoluta + Relativa
                 self.lineEdit_footer_texto.text(),
                 self.lineEdit_direccion_facebook.text(),
                 self.lineEdit_direccion_instagram.text(),
@@ -419,7 +417,10 @@ class VentanaConfiguracion(QWidget):
                 self.lineEdit_direccion_correo.text(),
                 self.config_seleccionada_id
             ))
+            guardar_imagenes_configuracion(conexion, self.config_seleccionada_id, imagenes)
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
             QMessageBox.information(self, "Configuración", "Configuración modificada correctamente.")
@@ -437,7 +438,9 @@ class VentanaConfiguracion(QWidget):
             conexion = conectar_base_datos()
             cursor = conexion.cursor()
             cursor.execute("UPDATE configuracion_app SET habilitar=0 WHERE id_config=%s", (self.config_seleccionada_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
             QMessageBox.information(self, "Configuración", "Configuración desactivada correctamente.")
@@ -457,7 +460,9 @@ class VentanaConfiguracion(QWidget):
             conexion = conectar_base_datos()
             cursor = conexion.cursor()
             cursor.execute("UPDATE configuracion_app SET habilitar=1 WHERE id_config=%s", (self.config_inactiva_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
             QMessageBox.information(self, "Configuración", "Configuración reactivada correctamente.")
@@ -510,7 +515,14 @@ class VentanaConfiguracion(QWidget):
             return
 
         # ✅ CORREGIDO: Guardar ruta ABSOLUTA en campo absoluto y RELATIVA en campo relativo
-        ruta_relativa = convertir_ruta_produccion(ruta_absoluta)
+        # (el archivo se guarda en el almacén por contenido: no se duplica)
+        try:
+            ruta_absoluta, ruta_relativa = guardar_en_almacen(
+                ruta_absoluta, ruta_original=convertir_ruta_produccion(ruta_absoluta)
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"No se pudo copiar la imagen:\n{e}")
+            return
 
         # Mostrar ruta absoluta en QLineEdit (solo para visualización)
         self.lineEdit_logo_app.setText(ruta_absoluta)
@@ -527,10 +539,13 @@ class VentanaConfiguracion(QWidget):
             cursor = conexion.cursor()
             cursor.execute("""
                 UPDATE configuracion_app
-                SET logo_app=%s, logo_app_ruta_relativa=%s, logo_base64=%s
+                SET logo_app=%s, logo_app_ruta_relativa=%s
                 WHERE id_config=%s
-            """, (ruta_absoluta, ruta_relativa, imagen_a_base64(ruta_absoluta), self.config_seleccionada_id))
+            """, (ruta_absoluta, ruta_relativa, self.config_seleccionada_id))
+            guardar_imagenes_configuracion(conexion, self.config_seleccionada_id, {'logo': ruta_absoluta})
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
     def seleccionar_icono_abrir(self):
@@ -541,7 +556,14 @@ class VentanaConfiguracion(QWidget):
             return
 
         # ✅ CORREGIDO: Guardar ruta ABSOLUTA en campo absoluto y RELATIVA en campo relativo
-        ruta_relativa = convertir_ruta_produccion(ruta_absoluta)
+        # (el archivo se guarda en el almacén por contenido: no se duplica)
+        try:
+            ruta_absoluta, ruta_relativa = guardar_en_almacen(
+                ruta_absoluta, ruta_original=convertir_ruta_produccion(ruta_absoluta)
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"No se pudo copiar la imagen:\n{e}")
+            return
 
         self.lineEdit_icono_abrir.setText(ruta_absoluta)
 
@@ -555,10 +577,13 @@ class VentanaConfiguracion(QWidget):
             cursor = conexion.cursor()
             cursor.execute("""
                 UPDATE configuracion_app
-                SET icono_hamburguesa=%s, icono_hamburguesa_ruta_relativa=%s, icono_hamburguesa_base64=%s
+                SET icono_hamburguesa=%s, icono_hamburguesa_ruta_relativa=%s
                 WHERE id_config=%s
-            """, (ruta_absoluta, ruta_relativa, imagen_a_base64(ruta_absoluta), self.config_seleccionada_id))
+            """, (ruta_absoluta, ruta_relativa, self.config_seleccionada_id))
+            guardar_imagenes_configuracion(conexion, self.config_seleccionada_id, {'icono_hamburguesa': ruta_absoluta})
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
     def seleccionar_icono_cerrar(self):
@@ -569,7 +594,14 @@ class VentanaConfiguracion(QWidget):
             return
 
         # ✅ CORREGIDO: Guardar ruta ABSOLUTA en campo absoluto y RELATIVA en campo relativo
-        ruta_relativa = convertir_ruta_produccion(ruta_absoluta)
+        # (el archivo se guarda en el almacén por contenido: no se duplica)
+        try:
+            ruta_absoluta, ruta_relativa = guardar_en_almacen(
+                ruta_absoluta, ruta_original=convertir_ruta_produccion(ruta_absoluta)
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"No se pudo copiar la imagen:\n{e}")
+            return
 
         self.lineEdit_icono_cerrar.setText(ruta_absoluta)
 
@@ -583,10 +615,13 @@ class VentanaConfiguracion(QWidget):
             cursor = conexion.cursor()
             cursor.execute("""
                 UPDATE configuracion_app
-                SET icono_cerrar=%s, icono_cerrar_ruta_relativa=%s, icono_cerrar_base64=%s
+                SET icono_cerrar=%s, icono_cerrar_ruta_relativa=%s
                 WHERE id_config=%s
-            """, (ruta_absoluta, ruta_relativa, imagen_a_base64(ruta_absoluta), self.config_seleccionada_id))
+            """, (ruta_absoluta, ruta_relativa, self.config_seleccionada_id))
+            guardar_imagenes_configuracion(conexion, self.config_seleccionada_id, {'icono_cerrar': ruta_absoluta})
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
     def seleccionar_hero_imagen(self):
@@ -597,7 +632,14 @@ class VentanaConfiguracion(QWidget):
             return
 
         # ✅ CORREGIDO: Guardar ruta ABSOLUTA en campo absoluto y RELATIVA en campo relativo
-        ruta_relativa = convertir_ruta_produccion(ruta_absoluta)
+        # (el archivo se guarda en el almacén por contenido: no se duplica)
+        try:
+            ruta_absoluta, ruta_relativa = guardar_en_almacen(
+                ruta_absoluta, ruta_original=convertir_ruta_produccion(ruta_absoluta)
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"No se pudo copiar la imagen:\n{e}")
+            return
 
         # Mostrar la ruta absoluta en el lineEdit
         self.lineEdit_hero_imagen.setText(ruta_absoluta)
@@ -614,10 +656,13 @@ class VentanaConfiguracion(QWidget):
             cursor = conexion.cursor()
             cursor.execute("""
                 UPDATE configuracion_app
-                SET hero_imagen=%s, hero_imagen_ruta_relativa=%s, hero_imagen_base64=%s
+                SET hero_imagen=%s, hero_imagen_ruta_relativa=%s
                 WHERE id_config=%s
-            """, (ruta_absoluta, ruta_relativa, imagen_a_base64(ruta_absoluta), self.config_seleccionada_id))
+            """, (ruta_absoluta, ruta_relativa, self.config_seleccionada_id))
+            guardar_imagenes_configuracion(conexion, self.config_seleccionada_id, {'hero_imagen': ruta_absoluta})
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
     def redondear_imagen(self, ruta_imagen, label: QLabel = None, size: int = None, circular: bool = True):
         """
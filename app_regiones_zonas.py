@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 from PyQt5 import uic
-from database_hosting import conectar_hosting as conectar_base_datos
+from database_hosting import conectar_hosting as conectar_base_datos, incrementar_version_catalogo, notificar_cambio_catalogo
+from imagenes_bd import borrar_imagenes_registro
+from consultas_async import ConsultorAsync
+from indice_assets import indice_assets
+from almacen_assets import guardar_en_almacen, relativa_en_almacen
 from PyQt5.QtWidgets import QFileDialog, QTableWidgetItem, QApplication, QWidget, QMessageBox
 from PyQt5.QtGui import QPixmap, QPainter, QPainterPath
 from PyQt5.QtCore import Qt, QRectF
 import os
-import shutil
-import hashlib
 
 
 def ruta_absoluta_desde_relativa(relativa):
@@ -17,7 +19,9 @@ def ruta_absoluta_desde_relativa(relativa):
         return ""
     base_dir = os.path.dirname(os.path.dirname(__file__))  # subimos 2 niveles hasta la raíz
     base_assets = os.path.join(base_dir, "public")         # la carpeta real es "public"
-    return os.path.join(base_assets, relativa.lstrip("/"))
+    ruta = os.path.join(base_assets, relativa.lstrip("/"))
+    # Si no está ahí, el índice de assets la busca por nombre (sin recorrer el disco)
+    return indice_assets().resolver(relativa, preferida=ruta) or ruta
 
 def convertir_ruta_produccion(ruta_absoluta):
     """Convierte rutas absolutas a rutas relativas para producción React"""
@@ -30,6 +34,10 @@ def convertir_ruta_produccion(ruta_absoluta):
     if ruta_absoluta.startswith('assets/') or ruta_absoluta.startswith('/assets/'):
         return ruta_absoluta.lstrip('/')
     
+    # Archivo del almacén por contenido
+    if relativa_en_almacen(ruta_absoluta):
+        return relativa_en_almacen(ruta_absoluta)
+    
     # ✅ MEJORADO: Detectar si está en la carpeta correcta
     if 'public/assets/imagenes/regiones_zonas' in ruta_absoluta:
         # Extraer la parte relativa desde public/
@@ -40,6 +48,20 @@ def convertir_ruta_produccion(ruta_absoluta):
     # Para regiones/zonas, usar estructura específica
     return f"assets/imagenes/regiones_zonas/{nombre_archivo}"
 
+def consultar_regiones_zonas(conexion, habilitar, prefijo=""):
+    """
+    Regiones/zonas activas o inactivas (se ejecuta fuera del hilo de la
+    interfaz). 'prefijo' es 'espejo_' cuando se lee la copia local.
+    """
+    cursor = conexion.cursor()
+    cursor.execute(f"""
+        SELECT id_region_zona, nombre_region_zona, imagen_region_zona_ruta_relativa, orden 
+        FROM {prefijo}regiones_zonas WHERE habilitar = %s ORDER BY orden ASC
+    """, (habilitar,))
+    resultados = cursor.fetchall()
+    cursor.close()
+    return resultados
+
 class VentanaRegionesZonas(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -62,7 +84,8 @@ class VentanaRegionesZonas(QWidget):
         self.setWindowTitle("Gestión de Regiones/Zonas")
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowMinMaxButtonsHint)
 
-        # Cargar datos
+        # Cargar datos (en segundo plano)
+        self.consultas = ConsultorAsync(self)
         self.cargar_regiones_zonas_activas()
         self.cargar_regiones_zonas_inactivas()
 
@@ -87,6 +110,7 @@ class VentanaRegionesZonas(QWidget):
         self.move(ventana.topLeft())
 
     def closeEvent(self, event):
+        self.consultas.cancelar_todas()
         if self.parent():
             self.parent().mostrar_menu_lateral()
         super().closeEvent(event)
@@ -94,15 +118,9 @@ class VentanaRegionesZonas(QWidget):
     # ------------------ CRUD -------------------
 
     def cargar_regiones_zonas_activas(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("""
-            SELECT id_region_zona, nombre_region_zona, imagen_region_zona_ruta_relativa, orden 
-            FROM regiones_zonas WHERE habilitar = 1 ORDER BY orden ASC
-        """)
-        resultados = cursor.fetchall()
-        conexion.close()
+        self.consultas.ejecutar("regiones_activas", consultar_regiones_zonas, self.mostrar_regiones_zonas_activas, habilitar=1, espejo=True)
 
+    def mostrar_regiones_zonas_activas(self, resultados):
         columnas = ["ID", "Nombre Región/Zona", "Ruta Imagen", "Orden"]
         self.Tabla_RegionZona_activas.setColumnCount(len(columnas))
         self.Tabla_RegionZona_activas.setHorizontalHeaderLabels(columnas)
@@ -115,15 +133,9 @@ class VentanaRegionesZonas(QWidget):
                 self.Tabla_RegionZona_activas.setItem(row_number, column_number, item)
 
     def cargar_regiones_zonas_inactivas(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("""
-            SELECT id_region_zona, nombre_region_zona, imagen_region_zona_ruta_relativa, orden 
-            FROM regiones_zonas WHERE habilitar = 0 ORDER BY orden ASC
-        """)
-        resultados = cursor.fetchall()
-        conexion.close()
+        self.consultas.ejecutar("regiones_inactivas", consultar_regiones_zonas, self.mostrar_regiones_zonas_inactivas, habilitar=0, espejo=True)
 
+    def mostrar_regiones_zonas_inactivas(self, resultados):
         columnas = ["ID", "Nombre Región/Zona", "Ruta Imagen", "Orden"]
         self.Tabla_RegionZona_inactivas.setColumnCount(len(columnas))
         self.Tabla_RegionZona_inactivas.setHorizontalHeaderLabels(columnas)
@@ -190,7 +202,9 @@ class VentanaRegionesZonas(QWidget):
                 INSERT INTO regiones_zonas (nombre_region_zona, imagen_region_zona_ruta_relativa, orden, habilitar)
                 VALUES (%s, %s, %s, 1)
             """, (nombre, ruta_relativa, orden))  # ✅ Usar SOLO ruta relativa
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Región/Zona", "Región/Zona agregada correctamente.")
             self.cargar_regiones_zonas_activas()
@@ -220,7 +234,9 @@ class VentanaRegionesZonas(QWidget):
                 self.spinBox_orden_region_zona.value(),
                 self.region_zona_seleccionada_id
             ))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Región/Zona", "Región/Zona modificada correctamente.")
             self.cargar_regiones_zonas_activas()
@@ -261,8 +277,11 @@ class VentanaRegionesZonas(QWidget):
             if confirmacion != QMessageBox.Yes:
                 return
 
+            borrar_imagenes_registro(cursor, 'regiones_zonas', self.region_zona_seleccionada_id)
             cursor.execute("DELETE FROM regiones_zonas WHERE id_region_zona=%s", (self.region_zona_seleccionada_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             QMessageBox.information(self, "Éxito", f"La región/zona '{nombre_region_zona}' fue eliminada.")
             self.cargar_regiones_zonas_activas()
             self.limpiar_formulario()
@@ -282,7 +301,9 @@ class VentanaRegionesZonas(QWidget):
             conexion = conectar_base_datos()
             cursor = conexion.cursor()
             cursor.execute("UPDATE regiones_zonas SET habilitar=0 WHERE id_region_zona=%s", (self.region_zona_seleccionada_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Región/Zona", "Región/Zona desactivada.")
             self.cargar_regiones_zonas_activas()
@@ -299,7 +320,9 @@ class VentanaRegionesZonas(QWidget):
             conexion = conectar_base_datos()
             cursor = conexion.cursor()
             cursor.execute("UPDATE regiones_zonas SET habilitar=1 WHERE id_region_zona=%s", (self.region_zona_inactiva_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Región/Zona", "Región/Zona reactivada.")
             self.cargar_regiones_zonas_activas()
@@ -333,50 +356,15 @@ class VentanaRegionesZonas(QWidget):
             self.label_imagen_region_zona.setText("Sin icono")
             return
 
-        # ✅ CORREGIDO: Carpeta destino para React production
-        carpeta_destino = os.path.join(os.getcwd(), "public", "assets", "imagenes", "regiones_zonas")
-        os.makedirs(carpeta_destino, exist_ok=True)
-
-        nombre_archivo = os.path.basename(ruta_origen)
-        ruta_destino = os.path.join(carpeta_destino, nombre_archivo)
-
+        # Guardar en el almacén por contenido (no duplica si la imagen ya estaba)
         try:
-            # ✅ Verificamos si el archivo ya está en la carpeta destino
-            if os.path.abspath(ruta_origen) == os.path.abspath(ruta_destino):
-                ruta_final = ruta_destino  # ya está en la carpeta correcta, no copiamos nada
-            else:
-                # Si existe y es distinto → renombrar
-                if os.path.exists(ruta_destino):
-                    def hash_archivo(path):
-                        hasher = hashlib.md5()
-                        with open(path, "rb") as f:
-                            while chunk := f.read(8192):
-                                hasher.update(chunk)
-                        return hasher.hexdigest()
-
-                    # Verificar si son archivos diferentes
-                    if hash_archivo(ruta_destino) != hash_archivo(ruta_origen):
-                        base, ext = os.path.splitext(nombre_archivo)
-                        contador = 1
-                        while True:
-                            nuevo_nombre = f"{base}_{contador}{ext}"
-                            nueva_ruta = os.path.join(carpeta_destino, nuevo_nombre)
-                            if not os.path.exists(nueva_ruta):
-                                ruta_destino = nueva_ruta
-                                break
-                            contador += 1
-                
-                # Copiar archivo
-                shutil.copy(ruta_origen, ruta_destino)
-                ruta_final = ruta_destino
-
+            ruta_final, ruta_relativa = guardar_en_almacen(
+                ruta_origen, ruta_original=f"assets/imagenes/regiones_zonas/{os.path.basename(ruta_origen)}"
+            )
         except Exception as e:
             QMessageBox.warning(self, "Error", f"No se pudo copiar la imagen:\n{e}")
             return
 
-        # ✅ CORREGIDO: Usar función helper para ruta de producción
-        ruta_relativa = convertir_ruta_produccion(ruta_final)
-        
         # Mostrar ruta absoluta en el lineEdit (para visualización local)
         self.lineEdit_ruta_imagen_region_zona.setText(ruta_final)
 
@@ -395,7 +383,9 @@ class VentanaRegionesZonas(QWidget):
                     SET imagen_region_zona_ruta_relativa=%s
                     WHERE id_region_zona=%s
                 """, (ruta_relativa, self.region_zona_seleccionada_id))
+                incrementar_version_catalogo(conexion)
                 conexion.commit()
+                notificar_cambio_catalogo()
                 conexion.close()
                 print(f"✅ Imagen actualizada en BD: {ruta_relativa}")
             except Exception as e:
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 from PyQt5 import uic
-from database_hosting import conectar_hosting as conectar_base_datos, cerrar_conexion
+from database_hosting import conectar_hosting as conectar_base_datos, cerrar_conexion, incrementar_version_catalogo, notificar_cambio_catalogo
+from imagenes_bd import borrar_imagenes_registro
+from consultas_async import ConsultorAsync
+from indice_assets import indice_assets
+from almacen_assets import guardar_en_almacen, relativa_en_almacen
 from PyQt5.QtWidgets import QFileDialog, QTableWidgetItem, QApplication, QWidget, QMessageBox
 from PyQt5.QtGui import QPixmap, QPainter, QPainterPath
 from PyQt5.QtCore import Qt, QRectF
 import os
-import shutil
-import hashlib
 
 def ruta_absoluta_desde_relativa(relativa):
     """
@@ -17,7 +19,9 @@ def ruta_absoluta_desde_relativa(relativa):
     # Subimos dos niveles desde src/backend a la raíz del proyecto
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  
     base_assets = os.path.join(base_dir, "frontend", "public")
-    return os.path.join(base_assets, relativa.lstrip("/"))
+    ruta = os.path.join(base_assets, relativa.lstrip("/"))
+    # Si no está ahí, el índice de assets la busca por nombre (sin recorrer el disco)
+    return indice_assets().resolver(relativa, preferida=ruta) or ruta
 
 def convertir_ruta_produccion(ruta_absoluta):
     """Convierte rutas absolutas a rutas relativas para producción React"""
@@ -30,6 +34,10 @@ def convertir_ruta_produccion(ruta_absoluta):
     if ruta_absoluta.startswith('assets/') or ruta_absoluta.startswith('/assets/'):
         return ruta_absoluta.lstrip('/')
     
+    # Archivo del almacén por contenido
+    if relativa_en_almacen(ruta_absoluta):
+        return relativa_en_almacen(ruta_absoluta)
+    
     # ✅ MEJORADO: Detectar si está en la carpeta correcta
     if 'public/assets/imagenes/iconos' in ruta_absoluta:
         # Extraer la parte relativa desde public/
@@ -40,6 +48,17 @@ def convertir_ruta_produccion(ruta_absoluta):
     # Para secciones, usar estructura específica de iconos
     return f"assets/imagenes/iconos/{nombre_archivo}"
 
+def consultar_secciones(conexion, habilitar, prefijo=""):
+    """Secciones activas o inactivas; 'prefijo' es 'espejo_' cuando se lee la copia local"""
+    cursor = conexion.cursor()
+    cursor.execute(
+        f"SELECT id_seccion, nombre_seccion, icono_seccion, orden FROM {prefijo}secciones WHERE habilitar = %s ORDER BY orden ASC",
+        (habilitar,)
+    )
+    resultados = cursor.fetchall()
+    cursor.close()
+    return resultados
+
 class VentanaSecciones(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -58,7 +77,8 @@ class VentanaSecciones(QWidget):
         self.setWindowTitle("Gestión de Secciones")
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowMinMaxButtonsHint)
 
-        # Cargar secciones
+        # Cargar secciones (en segundo plano, desde el espejo local del catálogo)
+        self.consultas = ConsultorAsync(self)
         self.cargar_secciones_activas()
         self.cargar_secciones_inactivas()
 
@@ -83,6 +103,7 @@ class VentanaSecciones(QWidget):
         self.move(ventana.topLeft())
 
     def closeEvent(self, event):
+        self.consultas.cancelar_todas()
         if self.parent():
             self.parent().mostrar_menu_lateral()
         super().closeEvent(event)
@@ -90,12 +111,9 @@ class VentanaSecciones(QWidget):
     # ------------------ CRUD -------------------
 
     def cargar_secciones_activas(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("SELECT id_seccion, nombre_seccion, icono_seccion, orden FROM secciones WHERE habilitar = 1 ORDER BY orden ASC")
-        resultados = cursor.fetchall()
-        conexion.close()
+        self.consultas.ejecutar("secciones_activas", consultar_secciones, self.mostrar_secciones_activas, 1, espejo=True)
 
+    def mostrar_secciones_activas(self, resultados):
         columnas = ["ID", "Nombre", "Icono", "Orden"]
         self.Tabla_secciones_activas.setColumnCount(len(columnas))
         self.Tabla_secciones_activas.setHorizontalHeaderLabels(columnas)
@@ -108,12 +126,9 @@ class VentanaSecciones(QWidget):
                 self.Tabla_secciones_activas.setItem(row_number, column_number, item)
 
     def cargar_secciones_inactivas(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("SELECT id_seccion, nombre_seccion, icono_seccion, orden FROM secciones WHERE habilitar = 0 ORDER BY orden ASC")
-        resultados = cursor.fetchall()
-        conexion.close()
+        self.consultas.ejecutar("secciones_inactivas", consultar_secciones, self.mostrar_secciones_inactivas, 0, espejo=True)
 
+    def mostrar_secciones_inactivas(self, resultados):
         columnas = ["ID", "Nombre", "Icono", "Orden"]
         self.Tabla_secciones_inactivas.setColumnCount(len(columnas))
         self.Tabla_secciones_inactivas.setHorizontalHeaderLabels(columnas)
@@ -182,7 +197,9 @@ class VentanaSecciones(QWidget):
                 INSERT INTO secciones (nombre_seccion, icono_seccion, orden, habilitar)
                 VALUES (%s, %s, %s, 1)
             """, (nombre, ruta_relativa_corregida, orden))  # ✅ Usar ruta corregida
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Sección", "Sección agregada correctamente.")
             self.cargar_secciones_activas()
@@ -212,7 +229,9 @@ class VentanaSecciones(QWidget):
                 self.spinBox_orden_seccion.value(),
                 self.seccion_seleccionada_id
             ))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Sección", "Sección modificada correctamente.")
             self.cargar_secciones_activas()
@@ -250,8 +269,11 @@ class VentanaSecciones(QWidget):
             )
             if confirmacion != QMessageBox.Yes:
                 return
+            borrar_imagenes_registro(cursor, 'secciones', id_seccion)
             cursor.execute("DELETE FROM secciones WHERE id_seccion=%s", (id_seccion,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             QMessageBox.information(self, "Éxito", f"La sección '{nombre_seccion}' fue eliminada correctamente.")
             self.cargar_secciones_activas()
             self.limpiar_formulario()
@@ -271,7 +293,9 @@ class VentanaSecciones(QWidget):
             conexion = conectar_base_datos()
             cursor = conexion.cursor()
             cursor.execute("UPDATE secciones SET habilitar=0 WHERE id_seccion=%s", (self.seccion_seleccionada_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Sección", "Sección desactivada correctamente.")
             self.cargar_secciones_activas()
@@ -288,7 +312,9 @@ class VentanaSecciones(QWidget):
             conexion = conectar_base_datos()
             cursor = conexion.cursor()
             cursor.execute("UPDATE secciones SET habilitar=1 WHERE id_seccion=%s", (self.seccion_inactiva_id,))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             QMessageBox.information(self, "Sección", "Sección reactivada correctamente.")
             self.cargar_secciones_activas()
@@ -326,49 +352,15 @@ class VentanaSecciones(QWidget):
             self.label_icono_seccion.setText("Sin icono")
             return
 
-        # ✅ CORREGIDO: Carpeta destino para React production
-        carpeta_destino = os.path.join(os.getcwd(), "public", "assets", "imagenes", "iconos")
-        os.makedirs(carpeta_destino, exist_ok=True)
-
-        nombre_archivo = os.path.basename(ruta_origen)
-        nombre_base, extension = os.path.splitext(nombre_archivo)
-        ruta_destino = os.path.join(carpeta_destino, nombre_archivo)
-
+        # Guardar en el almacén por contenido (no duplica si el icono ya estaba)
         try:
-            # ✅ Verificamos si el archivo ya está en la carpeta destino
-            if os.path.abspath(ruta_origen) == os.path.abspath(ruta_destino):
-                ruta_final = ruta_destino  # ya está en la carpeta correcta, no copiamos nada
-            else:
-                # Si existe y es distinto → renombrar
-                def hash_archivo(path):
-                    hasher = hashlib.md5()
-                    with open(path, "rb") as f:
-                        while chunk := f.read(8192):
-                            hasher.update(chunk)
-                    return hasher.hexdigest()
-
-                if os.path.exists(ruta_destino):
-                    if hash_archivo(ruta_destino) != hash_archivo(ruta_origen):
-                        contador = 1
-                        while True:
-                            nuevo_nombre = f"{nombre_base}_{contador}{extension}"
-                            nueva_ruta = os.path.join(carpeta_destino, nuevo_nombre)
-                            if not os.path.exists(nueva_ruta):
-                                ruta_destino = nueva_ruta
-                                break
-                            contador += 1
-
-                # Copiar archivo
-                shutil.copy(ruta_origen, ruta_destino)
-                ruta_final = ruta_destino
-
+            ruta_final, ruta_relativa = guardar_en_almacen(
+                ruta_origen, ruta_original=f"assets/imagenes/iconos/{os.path.basename(ruta_origen)}"
+            )
         except Exception as e:
             QMessageBox.warning(self, "Error", f"No se pudo copiar el icono:\n{e}")
             return
 
-        # ✅ CORREGIDO: Usar función helper para ruta de producción
-        ruta_relativa = convertir_ruta_produccion(ruta_final)
-        
         # Mostrar ruta absoluta en el lineEdit (para visualización local)
         self.lineEdit_icono_seccion.setText(ruta_final)
 
@@ -387,7 +379,9 @@ class VentanaSecciones(QWidget):
                     SET icono_seccion=%s
                     WHERE id_seccion=%s
                 """, (ruta_relativa, self.seccion_seleccionada_id))
+                incrementar_version_catalogo(conexion)
                 conexion.commit()
+                notificar_cambio_catalogo()
                 conexion.close()
                 print(f"✅ Icono actualizado en BD: {ruta_relativa}")
             except Exception as e:
@@ -3,16 +3,30 @@
 from PyQt5 import uic, QtWidgets
 from PyQt5.QtWidgets import (
     QFileDialog, QTableWidgetItem, QApplication,
-    QWidget, QMessageBox, QFrame, QVBoxLayout,
-    QLabel, QHBoxLayout, QPushButton
+    QWidget, QMessageBox, QHBoxLayout, QPushButton
 )
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QBrush, QPen, QColor, QPainterPath
 from PyQt5.QtCore import Qt, QDate
-from database_hosting import conectar_hosting as conectar_base_datos
+from database_hosting import conectar_hosting as conectar_base_datos, incrementar_version_catalogo, notificar_cambio_catalogo
+from imagenes_bd import borrar_imagenes_registro
+from consultas_async import ConsultorAsync
+from indice_assets import indice_assets
+from almacen_assets import guardar_en_almacen
+from miniaturas import servicio_miniaturas
+from modelo_sub_secciones import ModeloSubSecciones, RolFila, crear_vista_cards
 from datetime import date, datetime
 import os
-import shutil
-import hashlib
+
+# Columnas que usan las cards y el formulario. Se listan explícitamente para
+# no traer las imágenes (columnas *_base64) en los listados.
+COLUMNAS_SUB_SECCION = ", ".join("ss." + c for c in (
+    "id_sub_seccion", "id_seccion", "id_region_zona", "nombre_sub_seccion",
+    "domicilio", "latitud", "longitud", "distancia", "numero_telefono",
+    "imagen", "imagen_ruta_relativa", "icono", "icono_ruta_relativa",
+    "itinerario_maps", "habilitar", "fecha_desactivacion", "orden", "destacado",
+    "foto1_ruta_absoluta", "foto1_ruta_relativa", "foto2_ruta_absoluta", "foto2_ruta_relativa",
+    "foto3_ruta_absoluta", "foto3_ruta_relativa", "foto4_ruta_absoluta", "foto4_ruta_relativa",
+))
 
 # -------------------------
 # HELPERS GENERALES
@@ -28,7 +42,8 @@ def ruta_absoluta_desde_relativa(ruta_rel):
     base_dir = os.path.abspath("public")
     ruta_abs = os.path.abspath(os.path.join(base_dir, ruta_rel))
 
-    return ruta_abs
+    # Si no está ahí, el índice de assets la busca por nombre (sin recorrer el disco)
+    return indice_assets().resolver(ruta_rel, preferida=ruta_abs) or ruta_abs
 
 def convertir_ruta_produccion(ruta_absoluta, tipo_archivo):
     """Convierte rutas absolutas a rutas relativas para producción React"""
@@ -50,71 +65,85 @@ def convertir_ruta_produccion(ruta_absoluta, tipo_archivo):
         return f"assets/imagenes/{nombre_archivo}"
 
 def copiar_archivo_a_destino(ruta_origen, tipo_archivo):
-    """Copia un archivo a la carpeta destino correspondiente y devuelve ruta relativa"""
+    """
+    Guarda el archivo en el almacén por contenido y devuelve su ruta relativa.
+    Si ese contenido ya estaba (con cualquier nombre), no se copia de nuevo.
+    """
     if not ruta_origen or not os.path.exists(ruta_origen):
         return ""
     
-    nombre_archivo = os.path.basename(ruta_origen)
-    
-    # Determinar carpeta destino según tipo
-    if tipo_archivo == "icono":
-        carpeta_destino = os.path.join(os.getcwd(), "public", "assets", "imagenes", "iconos")
-    elif tipo_archivo == "imagen_region":
-        carpeta_destino = os.path.join(os.getcwd(), "public", "assets", "imagenes", "regiones_zonas")
-    elif tipo_archivo in ["imagen_subseccion", "foto_subseccion"]:
-        carpeta_destino = os.path.join(os.getcwd(), "public", "assets", "imagenes", "sub_secciones")
-    else:
-        carpeta_destino = os.path.join(os.getcwd(), "public", "assets", "imagenes")
-    
-    # Crear carpeta si no existe
-    os.makedirs(carpeta_destino, exist_ok=True)
-    
-    ruta_destino = os.path.join(carpeta_destino, nombre_archivo)
-    
     try:
-        # ✅ MEJORADO: Verificar si ya está en la carpeta destino
-        if os.path.abspath(ruta_origen) == os.path.abspath(ruta_destino):
-            # Ya está en la carpeta correcta, generar ruta relativa
-            return f"assets/imagenes/{os.path.basename(carpeta_destino)}/{nombre_archivo}"
-        
-        # ✅ MEJORADO: Si existe y es diferente, renombrar usando hash
-        if os.path.exists(ruta_destino):
-            def hash_archivo(path):
-                hasher = hashlib.md5()
-                with open(path, "rb") as f:
-                    while chunk := f.read(8192):
-                        hasher.update(chunk)
-                return hasher.hexdigest()
-            
-            # Solo renombrar si son archivos diferentes
-            if hash_archivo(ruta_destino) != hash_archivo(ruta_origen):
-                base, ext = os.path.splitext(nombre_archivo)
-                contador = 1
-                while True:
-                    nuevo_nombre = f"{base}_{contador}{ext}"
-                    nueva_ruta = os.path.join(carpeta_destino, nuevo_nombre)
-                    if not os.path.exists(nueva_ruta):
-                        ruta_destino = nueva_ruta
-                        nombre_archivo = nuevo_nombre
-                        break
-                    contador += 1
-        
-        # Copiar archivo
-        shutil.copy2(ruta_origen, ruta_destino)
-        
-        # ✅ MEJORADO: Generar ruta relativa consistente
-        if tipo_archivo == "icono":
-            return f"assets/imagenes/iconos/{nombre_archivo}"
-        elif tipo_archivo == "imagen_region":
-            return f"assets/imagenes/regiones_zonas/{nombre_archivo}"
-        elif tipo_archivo in ["imagen_subseccion", "foto_subseccion"]:
-            return f"assets/imagenes/sub_secciones/{nombre_archivo}"
-        else:
-            return f"assets/imagenes/{nombre_archivo}"
-            
+        # La ruta de siempre ('assets/imagenes/iconos/x.png') queda en el índice del almacén
+        _, ruta_relativa = guardar_en_almacen(
+            ruta_origen, ruta_original=convertir_ruta_produccion(ruta_origen, tipo_archivo)
+        )
+        return ruta_relativa
     except Exception as e:
         print(f"Error copiando archivo: {e}")
         return ""
+
+# -------------------------
+# CONSULTAS (fuera del hilo de la interfaz)
+# -------------------------
+def consultar_regiones_combo(conexion, prefijo=""):
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT id_region_zona, nombre_region_zona, imagen_region_zona_ruta_relativa 
+        FROM {prefijo}regiones_zonas 
+        WHERE habilitar=1 
+        ORDER BY orden ASC
+    """)
+    regiones_zonas = cursor.fetchall()
+    cursor.close()
+    return regiones_zonas
+
+def consultar_secciones_combo(conexion, prefijo=""):
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute(f"SELECT id_seccion, nombre_seccion, icono_seccion FROM {prefijo}secciones WHERE habilitar=1 ORDER BY orden ASC")
+    secciones = cursor.fetchall()
+    cursor.close()
+    return secciones
+
+def consultar_sub_secciones(conexion, id_seccion, id_region_zona, activas, prefijo=""):
+    """
+    Subsecciones activas o inactivas de una sección, opcionalmente de una
+    región/zona. 'prefijo' es 'espejo_' cuando se lee la copia local.
+    """
+    if activas:
+        condiciones = ["ss.habilitar = 1", "(ss.fecha_desactivacion IS NULL OR ss.fecha_desactivacion > %s)"]
+        parametros = [date.today().strftime("%Y-%m-%d")]
+    else:
+        condiciones = ["(ss.habilitar = 0 OR (ss.fecha_desactivacion IS NOT NULL AND ss.fecha_desactivacion <= CURDATE()))"]
+        parametros = []
+
+    condiciones.insert(0, "ss.id_seccion = %s")
+    parametros.insert(0, id_seccion)
+    if id_region_zona:
+        condiciones.insert(1, "ss.id_region_zona = %s")
+        parametros.insert(1, id_region_zona)
+
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT {COLUMNAS_SUB_SECCION}
+        FROM {prefijo}sub_secciones ss
+        WHERE {' AND '.join(condiciones)}
+        ORDER BY ss.orden ASC
+    """, parametros)
+    filas = cursor.fetchall()
+    cursor.close()
+    return filas
+
+def completar_rutas_finales(fila):
+    """Agrega a la fila las rutas absolutas a usar para imagen, icono y fotos"""
+    fila["imagen_final"] = ruta_absoluta_desde_relativa(fila.get("imagen_ruta_relativa")) or fila.get("imagen")
+    fila["icono_final"] = ruta_absoluta_desde_relativa(fila.get("icono_ruta_relativa")) or fila.get("icono")
+
+    for idx in range(1, 5):
+        fila[f"foto{idx}_final"] = (
+            ruta_absoluta_desde_relativa(fila.get(f"foto{idx}_ruta_relativa"))
+            or fila.get(f"foto{idx}_ruta_absoluta")
+        )
+
 # -------------------------
 # CLASE PRINCIPAL
 # -------------------------
@@ -131,6 +160,8 @@ class VentanaSubSecciones(QWidget):
         self.region_zona_seleccionada = None
         self.regiones_zonas_data = {}
         self.secciones_data = {}
+        self.subsecciones = []
+        self.subsecciones_inactivas = []
 
         # Cargar UI
         ruta_ui = os.path.join(os.path.dirname(__file__), "interfaz", "sub_secciones_app.ui")
@@ -143,13 +174,21 @@ class VentanaSubSecciones(QWidget):
         self.dateEdit_fecha_desactivacion.setSpecialValueText("")
         self.dateEdit_fecha_desactivacion.setDate(QDate.currentDate())
 
-        # Layouts para cards
-        self.layout_activos = QtWidgets.QGridLayout(self.contenedor_elementos_activos)
-        self.layout_inactivos = QtWidgets.QGridLayout(self.contenedor_elementos_inactivos)
-        self.layout_activos.setSpacing(10)
-        self.layout_inactivos.setSpacing(10)
+        # Grillas de cards (model/view: solo se dibujan las cards visibles)
+        self.modelo_activos = ModeloSubSecciones(inactivos=False, parent=self)
+        self.modelo_inactivos = ModeloSubSecciones(inactivos=True, parent=self)
+        self.vista_activos = crear_vista_cards(self.modelo_activos)
+        self.vista_inactivos = crear_vista_cards(self.modelo_inactivos)
+        for contenedor, vista in ((self.contenedor_elementos_activos, self.vista_activos),
+                                  (self.contenedor_elementos_inactivos, self.vista_inactivos)):
+            layout = QtWidgets.QVBoxLayout(contenedor)
+            layout.setContentsMargins(0, 0, 0, 0)
+            layout.addWidget(vista)
+        self.vista_activos.clicked.connect(self.on_card_clicked)
+        self.vista_inactivos.clicked.connect(lambda indice: self.on_card_clicked_inactiva(indice.data(RolFila)))
 
         # Cargar datos iniciales
+        self.consultas = ConsultorAsync(self)
         self.cargar_regiones_zonas()
         self.cargar_secciones_en_combo()
 
@@ -200,6 +239,7 @@ class VentanaSubSecciones(QWidget):
     # -------------------------
     def closeEvent(self, event):
         """Maneja el cierre de la ventana"""
+        self.consultas.cancelar_todas()
         if self.parent():
             self.parent().mostrar_menu_lateral()
         super().closeEvent(event)
@@ -216,17 +256,11 @@ class VentanaSubSecciones(QWidget):
     # -------------------------
     def cargar_regiones_zonas(self):
         """Carga las regiones/zonas habilitadas en el comboBox"""
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT id_region_zona, nombre_region_zona, imagen_region_zona_ruta_relativa 
-            FROM regiones_zonas 
-            WHERE habilitar=1 
-            ORDER BY orden ASC
-        """)
-        regiones_zonas = cursor.fetchall()
-        conexion.close()
-        
+        self.consultas.ejecutar("regiones_combo", consultar_regiones_combo, self.mostrar_regiones_zonas, espejo=True)
+
+    def mostrar_regiones_zonas(self, regiones_zonas):
+        # Sin señales mientras se rellena: el combo queda en "Seleccionar"
+        self.comboBox_region_zona.blockSignals(True)
         self.comboBox_region_zona.clear()
         self.comboBox_region_zona.addItem("— Seleccionar región/zona —", None)
         
@@ -238,6 +272,7 @@ class VentanaSubSecciones(QWidget):
                 'imagen': rz["imagen_region_zona_ruta_relativa"],
                 'nombre': rz["nombre_region_zona"]
             }
+        self.comboBox_region_zona.blockSignals(False)
 
     def on_region_zona_changed(self, index):
         """Maneja el cambio de selección en regiones/zonas"""
@@ -276,12 +311,11 @@ class VentanaSubSecciones(QWidget):
     # -------------------------
     def cargar_secciones_en_combo(self):
         """Carga las secciones en los combos y prepara datos de iconos"""
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor(dictionary=True)
-        cursor.execute("SELECT id_seccion, nombre_seccion, icono_seccion FROM secciones WHERE habilitar=1 ORDER BY orden ASC")
-        secciones = cursor.fetchall()
-        conexion.close()
-        
+        self.consultas.ejecutar("secciones_combo", consultar_secciones_combo, self.mostrar_secciones_en_combo, espejo=True)
+
+    def mostrar_secciones_en_combo(self, secciones):
+        self.comboBox_seccion.blockSignals(True)
+        self.comboBox_seccion1.blockSignals(True)
         self.comboBox_seccion.clear()
         self.comboBox_seccion.addItem("— Seleccionar sección —", None)
         
@@ -298,6 +332,8 @@ class VentanaSubSecciones(QWidget):
         self.comboBox_seccion1.addItem("— Seleccionar sección —", None)
         for s in secciones:
             self.comboBox_seccion1.addItem(s["nombre_seccion"], s["id_seccion"])
+        self.comboBox_seccion.blockSignals(False)
+        self.comboBox_seccion1.blockSignals(False)
 
     def on_combo_seccion_changed(self, index):
         """Maneja el cambio de selección en secciones"""
@@ -391,7 +427,9 @@ class VentanaSubSecciones(QWidget):
                 WHERE id_sub_seccion = %s
             """, (ruta_relativa, self.id_subseccion_seleccionada))
             
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
             
             print(f"✅ {campo} actualizado en BD: {ruta_relativa}")
@@ -404,173 +442,46 @@ class VentanaSubSecciones(QWidget):
     # -------------------------
     def cargar_sub_secciones(self):
         """Carga las subsecciones activas filtradas por región/zona y sección"""
-        for i in reversed(range(self.layout_activos.count())):
-            item = self.layout_activos.itemAt(i)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.setParent(None)
-
         id_seccion = self.comboBox_seccion.currentData()
-        id_region_zona = self.region_zona_seleccionada
-
         if not id_seccion:
+            self.consultas.cancelar("sub_secciones_activas")
+            self.mostrar_sub_secciones([])
             return
 
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor(dictionary=True)
-        hoy = date.today().strftime("%Y-%m-%d")
-        
-        if id_region_zona:
-            cursor.execute("""
-                SELECT ss.* 
-                FROM sub_secciones ss
-                WHERE ss.id_seccion = %s 
-                AND ss.id_region_zona = %s
-                AND ss.habilitar = 1
-                AND (ss.fecha_desactivacion IS NULL OR ss.fecha_desactivacion > %s)
-                ORDER BY ss.orden ASC
-            """, (id_seccion, id_region_zona, hoy))
-        else:
-            cursor.execute("""
-                SELECT ss.* 
-                FROM sub_secciones ss
-                WHERE ss.id_seccion = %s 
-                AND ss.habilitar = 1
-                AND (ss.fecha_desactivacion IS NULL OR ss.fecha_desactivacion > %s)
-                ORDER BY ss.orden ASC
-            """, (id_seccion, hoy))
-            
-        filas = cursor.fetchall()
-        conexion.close()
-
-        self.subsecciones = filas
+        # Si el filtro cambia antes de que llegue la respuesta, la anterior se descarta
+        self.consultas.ejecutar(
+            "sub_secciones_activas", consultar_sub_secciones, self.mostrar_sub_secciones,
+            id_seccion, self.region_zona_seleccionada, True, espejo=True
+        )
 
-        row, col = 0, 0
+    def mostrar_sub_secciones(self, filas):
         for fila in filas:
-            fila["imagen_final"] = ruta_absoluta_desde_relativa(fila.get("imagen_ruta_relativa")) or fila.get("imagen")
-            fila["icono_final"] = ruta_absoluta_desde_relativa(fila.get("icono_ruta_relativa")) or fila.get("icono")
-
-            for idx in range(1, 5):
-                fila[f"foto{idx}_final"] = (
-                    ruta_absoluta_desde_relativa(fila.get(f"foto{idx}_ruta_relativa"))
-                    or fila.get(f"foto{idx}_ruta_absoluta")
-                )
-
-            card = self.crear_card(fila)
-            card.subseccion_id = fila.get("id_sub_seccion")
-            card.mousePressEvent = lambda event, c=card: self.on_card_clicked(c)
-
-            self.layout_activos.addWidget(card, row, col)
-            col += 1
-            if col >= 3:
-                col = 0
-                row += 1
+            completar_rutas_finales(fila)
+        self.subsecciones = filas
+        self.modelo_activos.actualizar(filas)
 
     def cargar_sub_secciones_inactivas(self):
         """Carga las subsecciones inactivas filtradas por región/zona y sección"""
-        for i in reversed(range(self.layout_inactivos.count())):
-            item = self.layout_inactivos.itemAt(i)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.setParent(None)
-
         id_seccion = self.comboBox_seccion1.currentData()
-        id_region_zona = self.region_zona_seleccionada
-
         if not id_seccion:
+            self.consultas.cancelar("sub_secciones_inactivas")
+            self.mostrar_sub_secciones_inactivas([])
             return
 
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor(dictionary=True)
-        
-        if id_region_zona:
-            cursor.execute("""
-                SELECT ss.* 
-                FROM sub_secciones ss
-                WHERE ss.id_seccion = %s
-                AND ss.id_region_zona = %s
-                AND (ss.habilitar = 0 OR (ss.fecha_desactivacion IS NOT NULL AND ss.fecha_desactivacion <= CURDATE()))
-                ORDER BY ss.orden ASC
-            """, (id_seccion, id_region_zona))
-        else:
-            cursor.execute("""
-                SELECT ss.* 
-                FROM sub_secciones ss
-                WHERE ss.id_seccion = %s
-                AND (ss.habilitar = 0 OR (ss.fecha_desactivacion IS NOT NULL AND ss.fecha_desactivacion <= CURDATE()))
-                ORDER BY ss.orden ASC
-            """, (id_seccion,))
-            
-        filas = cursor.fetchall()
-        conexion.close()
-
-        self.subsecciones_inactivas = filas
+        self.consultas.ejecutar(
+            "sub_secciones_inactivas", consultar_sub_secciones, self.mostrar_sub_secciones_inactivas,
+            id_seccion, self.region_zona_seleccionada, False, espejo=True
+        )
 
-        row, col = 0, 0
+    def mostrar_sub_secciones_inactivas(self, filas):
         for fila in filas:
-            fila["imagen_final"] = ruta_absoluta_desde_relativa(fila.get("imagen_ruta_relativa")) or fila.get("imagen")
-            fila["icono_final"] = ruta_absoluta_desde_relativa(fila.get("icono_ruta_relativa")) or fila.get("icono")
-
-            for idx in range(1, 5):
-                fila[f"foto{idx}_final"] = (
-                    ruta_absoluta_desde_relativa(fila.get(f"foto{idx}_ruta_relativa"))
-                    or fila.get(f"foto{idx}_ruta_absoluta")
-                )
-
-            card = self.crear_card(fila, inactivo=True)
-            card.mousePressEvent = lambda event, f=fila: self.on_card_clicked_inactiva(f)
-
-            self.layout_inactivos.addWidget(card, row, col)
-            col += 1
-            if col >= 3:
-                col = 0
-                row += 1
+            completar_rutas_finales(fila)
+        self.subsecciones_inactivas = filas
+        self.modelo_inactivos.actualizar(filas)
 
     # -------------------------
-    # CREACIÓN DE CARDS
+    # IMÁGENES
     # -------------------------
-    def crear_card(self, elemento, inactivo=False):
-        """Crea una tarjeta visual para una subsección"""
-        card = QFrame()
-        card.setFrameShape(QFrame.Box)
-        card.setLineWidth(1)
-        card.setFixedSize(220, 300)
-        layout = QVBoxLayout(card)
-
-        # Icono
-        icono_label = QLabel()
-        icono_label.setFixedSize(48, 48)
-        icono_label.setAlignment(Qt.AlignCenter)
-        ruta_icono = elemento.get("icono_final")
-        self.cargar_imagen_icono(ruta=ruta_icono, label_widget=icono_label, size=(48, 48))
-        layout.addWidget(icono_label)
-
-        # Nombre
-        nombre_label = QLabel(elemento.get("nombre_sub_seccion", ""))
-        nombre_label.setAlignment(Qt.AlignCenter)
-        nombre_label.setWordWrap(True)
-        layout.addWidget(nombre_label)
-
-        # Imagen principal
-        imagen_label = QLabel()
-        imagen_label.setFixedSize(180, 120)
-        imagen_label.setAlignment(Qt.AlignCenter)
-        imagen_label.setScaledContents(True)
-        ruta_img = elemento.get("imagen_final")
-        self.cargar_imagen_icono(ruta=ruta_img, label_widget=imagen_label, size=(180, 120))
-        layout.addWidget(imagen_label)
-
-        # Estado
-        estado_label = QLabel("INACTIVO" if inactivo else "ACTIVO")
-        estado_label.setAlignment(Qt.AlignCenter)
-        estado_label.setStyleSheet("color: red;" if inactivo else "color: green;")
-        layout.addWidget(estado_label)
-
-        card.subseccion_id = elemento.get("id_sub_seccion")
-        return card
-
     def cargar_imagen_icono(self, ruta, label_widget, size=None, fallback_text="Sin imagen"):
         """Carga una imagen en un QLabel con manejo de errores"""
         if not ruta:
@@ -588,21 +499,15 @@ class VentanaSubSecciones(QWidget):
                 label_widget.setText(fallback_text)
                 return
 
-        pixmap = QPixmap(ruta_a_usar)
-        if size:
-            pixmap = pixmap.scaled(size[0], size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        label_widget.setPixmap(pixmap)
+        # Se decodifica en segundo plano y queda cacheada (memoria y disco)
+        servicio_miniaturas().cargar_en_label(ruta_a_usar, label_widget, size=size, fallback_text=fallback_text)
 
     # -------------------------
     # MANEJO DE CLICS EN CARDS
     # -------------------------
-    def on_card_clicked(self, card_widget):
+    def on_card_clicked(self, indice):
         """Maneja el clic en una card activa"""
-        subseccion_id = getattr(card_widget, "subseccion_id", None)
-        if not subseccion_id:
-            return
-
-        subseccion = next((s for s in self.subsecciones if s['id_sub_seccion'] == subseccion_id), None)
+        subseccion = indice.data(RolFila)
         if not subseccion:
             return
 
@@ -663,7 +568,9 @@ class VentanaSubSecciones(QWidget):
                     fecha_desactivacion = NULL
                 WHERE id_sub_seccion = %s
             """, (self.id_subseccion_seleccionada,))
+            incrementar_version_catalogo(conn)
             conn.commit()
+            notificar_cambio_catalogo()
             cursor.close()
             conn.close()
 
@@ -889,7 +796,9 @@ class VentanaSubSecciones(QWidget):
                 itinerario, habilitar, fecha, orden, destacado,
                 foto1_rel, foto2_rel, foto3_rel, foto4_rel
             ))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
             QMessageBox.information(self, "Éxito", "Subsección agregada correctamente")
@@ -988,7 +897,9 @@ class VentanaSubSecciones(QWidget):
                 foto1_rel, foto2_rel, foto3_rel, foto4_rel,
                 self.id_subseccion_seleccionada
             ))
+            incrementar_version_catalogo(conexion)
             conexion.commit()
+            notificar_cambio_catalogo()
             conexion.close()
 
             QMessageBox.information(self, "Éxito", "Subsección modificada correctamente")
@@ -1016,8 +927,11 @@ class VentanaSubSecciones(QWidget):
             try:
                 conexion = conectar_base_datos()
                 cursor = conexion.cursor()
+                borrar_imagenes_registro(cursor, 'sub_secciones', self.id_subseccion_seleccionada)
                 cursor.execute("DELETE FROM sub_secciones WHERE id_sub_seccion = %s", (self.id_subseccion_seleccionada,))
+                incrementar_version_catalogo(conexion)
                 conexion.commit()
+                notificar_cambio_catalogo()
                 conexion.close()
                 
                 QMessageBox.information(self, "Éxito", "Subsección eliminada correctamente")
@@ -1054,7 +968,9 @@ class VentanaSubSecciones(QWidget):
                         fecha_desactivacion = %s
                     WHERE id_sub_seccion = %s
                 """, (hoy, self.id_subseccion_seleccionada))
+                incrementar_version_catalogo(conexion)
                 conexion.commit()
+                notificar_cambio_catalogo()
                 conexion.close()
                 
                 QMessageBox.information(self, "Éxito", "Subsección desactivada correctamente")
@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 from PyQt5 import uic
 from database_hosting import conectar_hosting as conectar_base_datos 
+from consultas_async import ConsultorAsync
+from indice_assets import indice_assets
+from almacen_assets import guardar_en_almacen
 from PyQt5.QtWidgets import QFileDialog, QTableWidgetItem, QApplication, QMainWindow, QWidget, QMessageBox
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QBrush, QPen, QColor, QPainterPath
 from PyQt5.QtCore import Qt
 import os
-import shutil
-import hashlib
 
 def ruta_absoluta_desde_relativa(relativa: str) -> str:
     """
@@ -21,7 +22,35 @@ def ruta_absoluta_desde_relativa(relativa: str) -> str:
 
     # Quitamos el primer "/" o "\" si lo tiene
     ruta_limpia = relativa.lstrip("/\\")
-    return os.path.normpath(os.path.join(base_assets, ruta_limpia))
+    ruta = os.path.normpath(os.path.join(base_assets, ruta_limpia))
+    # Si no está ahí, el índice de assets la busca por nombre (sin recorrer el disco)
+    return indice_assets().resolver(relativa, preferida=ruta) or ruta
+
+
+# Consultas (se ejecutan fuera del hilo de la interfaz)
+def consultar_usuarios_activos(conexion):
+    cursor = conexion.cursor()
+    cursor.execute("""
+        SELECT id_usuario, apellido_nombres_usuario, dni_usuario, domicilio_usuario,
+               localidad_usuario, provincia_usuario, telefono_usuario, email_usuario,
+               nombre_usuario_acceso, password_usuario, foto_usuario, rol_usuario
+        FROM usuarios
+        WHERE activo = 1
+    """)
+    resultados = cursor.fetchall()
+    cursor.close()
+    return resultados
+
+def consultar_usuarios_inactivos(conexion):
+    cursor = conexion.cursor()
+    cursor.execute("""
+        SELECT id_usuario, apellido_nombres_usuario, dni_usuario, email_usuario
+        FROM usuarios
+        WHERE activo = 0
+    """)
+    resultados = cursor.fetchall()
+    cursor.close()
+    return resultados
 
 
 class VentanaUsuarios(QWidget):
@@ -48,7 +77,8 @@ class VentanaUsuarios(QWidget):
         self.setWindowTitle("Gestión de Usuarios")
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowMinMaxButtonsHint)
 
-        # Cargar usuarios
+        # Cargar usuarios (en segundo plano)
+        self.consultas = ConsultorAsync(self)
         self.cargar_usuarios()
         self.cargar_usuarios_inactivos()
 
@@ -72,6 +102,7 @@ class VentanaUsuarios(QWidget):
         self.move(ventana.topLeft())
 
     def closeEvent(self, event):
+        self.consultas.cancelar_todas()
         if self.parent():
             self.parent().mostrar_menu_lateral()
         super().closeEvent(event)
@@ -185,18 +216,9 @@ class VentanaUsuarios(QWidget):
             QMessageBox.critical(self, "Error", f"No se pudo reactivar el usuario:\n{e}")
 
     def cargar_usuarios(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("""
-            SELECT id_usuario, apellido_nombres_usuario, dni_usuario, domicilio_usuario,
-                   localidad_usuario, provincia_usuario, telefono_usuario, email_usuario,
-                   nombre_usuario_acceso, password_usuario, foto_usuario, rol_usuario
-            FROM usuarios
-            WHERE activo = 1
-        """)
-        resultados = cursor.fetchall()
-        conexion.close()
+        self.consultas.ejecutar("usuarios_activos", consultar_usuarios_activos, self.mostrar_usuarios)
 
+    def mostrar_usuarios(self, resultados):
         columnas = [
             "ID", "Nombre", "DNI", "Domicilio", "Localidad", "Provincia",
             "Teléfono", "Email", "Usuario", "Contraseña", "Foto", "Rol"
@@ -212,16 +234,9 @@ class VentanaUsuarios(QWidget):
                 self.tabla_usuarios_activos.setItem(row_number, column_number, item)
 
     def cargar_usuarios_inactivos(self):
-        conexion = conectar_base_datos()
-        cursor = conexion.cursor()
-        cursor.execute("""
-            SELECT id_usuario, apellido_nombres_usuario, dni_usuario, email_usuario
-            FROM usuarios
-            WHERE activo = 0
-        """)
-        resultados = cursor.fetchall()
-        conexion.close()
+        self.consultas.ejecutar("usuarios_inactivos", consultar_usuarios_inactivos, self.mostrar_usuarios_inactivos)
 
+    def mostrar_usuarios_inactivos(self, resultados):
         columnas = ["ID", "Nombre", "DNI", "Email"]
         self.tabla_usuarios_inactivos.setColumnCount(len(columnas))
         self.tabla_usuarios_inactivos.setHorizontalHeaderLabels(columnas)
@@ -348,49 +363,17 @@ class VentanaUsuarios(QWidget):
             self.label_foto_usuario.setText("Sin foto")
             return
 
-        # ✅ CORREGIDO: Carpeta destino usando ruta absoluta
-        carpeta_destino = ruta_absoluta_desde_relativa("/assets/imagenes/fotos_usuarios")
-        
-        # Asegurar que la carpeta existe
-        os.makedirs(carpeta_destino, exist_ok=True)
-
-        nombre_archivo = os.path.basename(ruta_origen)
-        nombre_base, extension = os.path.splitext(nombre_archivo)
-        ruta_destino = os.path.join(carpeta_destino, nombre_archivo)
-
+        # Guardar en el almacén por contenido (no duplica si la foto ya estaba)
         try:
-            if os.path.exists(ruta_destino) and os.path.samefile(ruta_origen, ruta_destino):
-                # Ya está en la carpeta destino → no copiamos
-                ruta_final = ruta_destino
-            else:
-                # Si ya existe pero es diferente, renombramos con sufijo _1, _2...
-                def hash_archivo(path):
-                    hasher = hashlib.md5()
-                    with open(path, "rb") as f:
-                        while chunk := f.read(8192):
-                            hasher.update(chunk)
-                    return hasher.hexdigest()
-
-                if os.path.exists(ruta_destino):
-                    if hash_archivo(ruta_destino) != hash_archivo(ruta_origen):
-                        contador = 1
-                        while True:
-                            nuevo_nombre = f"{nombre_base}_{contador}{extension}"
-                            nueva_ruta = os.path.join(carpeta_destino, nuevo_nombre)
-                            if not os.path.exists(nueva_ruta):
-                                ruta_destino = nueva_ruta
-                                break
-                            contador += 1
-
-                shutil.copy(ruta_origen, ruta_destino)
-                ruta_final = ruta_destino
-
+            ruta_final, ruta_almacen = guardar_en_almacen(
+                ruta_origen, ruta_original=f"assets/imagenes/fotos_usuarios/{os.path.basename(ruta_origen)}"
+            )
         except Exception as e:
             QMessageBox.warning(self, "Error", f"No se pudo copiar la foto:\n{e}")
             return
 
         # ✅ CORREGIDO: Guardamos SOLO la ruta relativa
-        ruta_relativa = f"/assets/imagenes/fotos_usuarios/{os.path.basename(ruta_destino)}"
+        ruta_relativa = f"/{ruta_almacen}"
 
         # ✅ CORREGIDO: Forzar que solo se guarde la ruta relativa
         self.lineEdit_ruta_foto.setText(ruta_relativa)
@@ -1,9 +1,9 @@
 import os
 import subprocess
 import sys
-import shutil
 import time
-import requests
+from sincronizar_assets import sincronizar_carpeta
+from verificacion_deploy import escribir_build_id, verificar_deploy
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTextEdit, QProgressBar, QMessageBox,
                              QGroupBox, QComboBox, QLineEdit, QScrollArea, QWidget)
@@ -20,6 +20,7 @@ class BackendDeployThread(QThread):
         self.backend_path = backend_path
         self.servidor_config = servidor_config or {}
         self.datos_hosting = servidor_config.get('datos_hosting', {})
+        self.build_id = None
         
     def run(self):
         try:
@@ -67,8 +68,11 @@ class BackendDeployThread(QThread):
             if resultado:
                 self.progress_signal.emit(80)
                 
-                # Paso 6: Verificar deploy
-                if self.verificar_deploy():
+                # Paso 6: Verificar deploy (en modo manual todavía no se subió nada)
+                if tipo == "manual":
+                    self.progress_signal.emit(100)
+                    self.finished_signal.emit(True, "✅ Backend preparado para deploy manual")
+                elif self.verificar_deploy():
                     self.progress_signal.emit(100)
                     self.finished_signal.emit(True, f"✅ ¡DEPLOY COMPLETADO EXITOSAMENTE! 🎉\n\nTu aplicación está funcionando en PRODUCCIÓN:\n{self.datos_hosting.get('base_url', 'N/A')}")
                 else:
@@ -131,7 +135,15 @@ type = "web"
             self.log_signal.emit(f"❌ Error creando railway.toml: {str(e)}")
             return False
         
-        # ✅ 4. VERIFICAR ARCHIVOS ESENCIALES
+        # ✅ 4. IDENTIFICADOR DEL BUILD (lo informa /api/info-servidor)
+        try:
+            self.build_id = escribir_build_id(self.backend_path)
+            self.log_signal.emit(f"✅ build_id.txt: {self.build_id}")
+        except Exception as e:
+            self.log_signal.emit(f"❌ Error escribiendo build_id.txt: {str(e)}")
+            return False
+        
+        # ✅ 5. VERIFICAR ARCHIVOS ESENCIALES
         archivos_esenciales = {
             "api.py": "Servidor Flask principal",
             "requirements.txt": "Dependencias Python", 
@@ -154,7 +166,7 @@ type = "web"
         return todos_encontrados
     
     def copiar_assets_al_repositorio(self):
-        """Copiar assets desde turismo-app/public/assets al repositorio"""
+        """Sincronizar assets desde turismo-app/public/assets al repositorio (copia incremental)"""
         try:
             base_dir = os.path.dirname(self.backend_path)
             assets_origen = os.path.join(base_dir, "public", "assets")
@@ -187,40 +199,12 @@ type = "web"
                 self.log_signal.emit(f"⚠️  Error listando assets: {str(e)}")
                 return True
             
-            self.log_signal.emit("🔄 Copiando assets al repositorio...")
-            
-            if not os.path.exists(assets_destino):
-                os.makedirs(assets_destino)
-                self.log_signal.emit("✅ Carpeta assets creada en repositorio")
-            
-            items_copiados = 0
-            for item in contenido:
-                origen_item = os.path.join(assets_origen, item)
-                destino_item = os.path.join(assets_destino, item)
-                
-                try:
-                    if os.path.isdir(origen_item):
-                        if os.path.exists(destino_item):
-                            shutil.rmtree(destino_item)
-                        shutil.copytree(origen_item, destino_item)
-                        self.log_signal.emit(f"   ✅ Carpeta: {item}")
-                    else:
-                        shutil.copy2(origen_item, destino_item)
-                        self.log_signal.emit(f"   ✅ Archivo: {item}")
-                    
-                    items_copiados += 1
-                except Exception as e:
-                    self.log_signal.emit(f"   ⚠️  Error copiando {item}: {str(e)}")
-                    continue
-            
-            self.log_signal.emit(f"✅ {items_copiados} assets copiados exitosamente")
-            
-            if os.path.exists(assets_destino):
-                try:
-                    assets_copiados = len(os.listdir(assets_destino))
-                    self.log_signal.emit(f"📊 Verificación: {assets_copiados} assets en repositorio")
-                except:
-                    self.log_signal.emit("✅ Assets copiados al repositorio")
+            self.log_signal.emit("🔄 Sincronizando assets con el repositorio (solo cambios)...")
+            inicio = time.time()
+            resumen = sincronizar_carpeta(assets_origen, assets_destino, log=self.log_signal.emit)
+            if resumen['errores']:
+                self.log_signal.emit(f"⚠️  {len(resumen['errores'])} asset(s) no se pudieron sincronizar")
+            self.log_signal.emit(f"✅ Assets sincronizados en {time.time() - inicio:.1f}s")
             
             return True
             
@@ -478,7 +462,7 @@ type = "web"
             self.log_signal.emit(f"⚠️  No se pudo verificar assets: {str(e)}")
     
     def verificar_deploy(self):
-        """Verificar que el deploy funcionó correctamente"""
+        """Esperar el build nuevo en el hosting, medir los endpoints y comparar con el deploy anterior"""
         try:
             base_url = self.datos_hosting.get('base_url')
             if not base_url or base_url == 'No configurada':
@@ -487,42 +471,13 @@ type = "web"
             self.log_signal.emit("🔍 Verificando estado del servidor en PRODUCCIÓN...")
             self.log_signal.emit(f"🌐 URL: {base_url}")
             
-            endpoints = [
-                "/api/info-servidor",
-                "/api/configuracion",
-                "/"
-            ]
-            
-            todos_funcionan = True
-            for endpoint in endpoints:
-                url = base_url + endpoint
-                try:
-                    response = requests.get(url, timeout=15)
-                    if response.status_code == 200:
-                        self.log_signal.emit(f"✅ {endpoint} - FUNCIONA")
-                        if endpoint == "/api/info-servidor":
-                            try:
-                                data = response.json()
-                                if 'mensaje' in data:
-                                    self.log_signal.emit(f"   💬 {data['mensaje']}")
-                                if 'entorno' in data:
-                                    self.log_signal.emit(f"   🏭 Entorno: {data['entorno']}")
-                            except:
-                                pass
-                    else:
-                        self.log_signal.emit(f"⚠️  {endpoint} - Error {response.status_code}")
-                        todos_funcionan = False
-                except requests.exceptions.RequestException as e:
-                    self.log_signal.emit(f"❌ {endpoint} - No responde: {str(e)}")
-                    todos_funcionan = False
-            
-            if todos_funcionan:
+            if verificar_deploy(base_url, self.build_id, self.log_signal.emit):
                 self.log_signal.emit("🎊 ¡TODOS LOS ENDPOINTS FUNCIONAN EN PRODUCCIÓN!")
                 self.log_signal.emit("✅ Servidor configurado con Gunicorn para producción")
-            else:
-                self.log_signal.emit("⚠️  Algunos endpoints tienen problemas")
+                return True
             
-            return True
+            self.log_signal.emit("⚠️  Algunos endpoints tienen problemas")
+            return False
             
         except Exception as e:
             self.log_signal.emit(f"⚠️  Error en verificación: {str(e)}")
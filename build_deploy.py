@@ -4,6 +4,7 @@ import subprocess
 import sys
 import shutil
 import time
+from publicar_build import publicar_build
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTextEdit, QProgressBar, QMessageBox,
                              QGroupBox, QComboBox, QScrollArea, QWidget)
@@ -243,13 +244,9 @@ class BuildDeployThread(QThread):
                 self.log_signal.emit("❌ No se encontró la carpeta dist del build")
                 return False
             
-            # Limpiar destino anterior
-            if os.path.exists(self.react_build_dest):
-                shutil.rmtree(self.react_build_dest)
-                self.log_signal.emit("🗑️ Build anterior eliminado")
-            
-            # Copiar nuevo build
-            shutil.copytree(self.dist_path, self.react_build_dest)
+            # Armar el build en una carpeta hermana y reemplazar el publicado
+            # de una vez: Flask nunca ve react-build/ vacío o a medias
+            publicar_build(self.dist_path, self.react_build_dest, log=self.log_signal.emit)
             self.log_signal.emit(f"✅ Build copiado a Flask")
             
             # Mostrar información del build copiado
@@ -0,0 +1,191 @@
+# consultas_async.py - Consultas al hosting fuera del hilo de la interfaz
+#
+# Las ventanas ejecutaban el SQL remoto en el hilo de Qt y la interfaz se
+# congelaba mientras duraba la consulta. Acá cada consulta corre en un
+# QThreadPool y el resultado vuelve por señales al hilo de la interfaz.
+#
+# Uso desde una ventana:
+#     self.consultas = ConsultorAsync(self)
+#     self.consultas.ejecutar("usuarios_activos", consultar_usuarios, self.mostrar_usuarios, activo=1)
+#
+# 'funcion' recibe una conexión del pool (y los argumentos extra) y devuelve
+# el resultado; nunca debe tocar widgets. Si se pide otra consulta por el
+# mismo canal antes de que termine la anterior, la anterior se descarta.
+import itertools
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QLabel, QMessageBox
+
+from database_hosting import TAMANIO_POOL_HOSTING, obtener_conexion_hosting
+from database_local import obtener_configuracion_hosting
+from espejo_catalogo import conexion_lectura
+
+# Un hilo por conexión del pool: más hilos solo esperarían conexión
+_pool_hilos = QThreadPool()
+_pool_hilos.setMaxThreadCount(TAMANIO_POOL_HOSTING)
+_ids_tarea = itertools.count(1)
+
+
+class SenalesConsulta(QObject):
+    resultado = pyqtSignal(int, object)
+    error = pyqtSignal(int, str)
+
+
+class TareaConsulta(QRunnable):
+    """Ejecuta funcion(conexion, *args, **kwargs) en un hilo del pool"""
+
+    def __init__(self, id_tarea, config, funcion, args, kwargs, espejo=False):
+        super().__init__()
+        self.espejo = espejo
+        self.id_tarea = id_tarea
+        self.config = config
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelada = False
+        self.senales = SenalesConsulta()
+
+    def run(self):
+        # Siempre se emite una señal al final: la ventana mantiene viva la
+        # tarea hasta recibirla, aunque la haya cancelado.
+        if self.cancelada:
+            self.senales.resultado.emit(self.id_tarea, None)
+            return
+        try:
+            if self.espejo:
+                # Lectura del catálogo: espejo local si está al día, si no el hosting
+                conexion, prefijo = conexion_lectura(self.config)
+                kwargs = dict(self.kwargs, prefijo=prefijo)
+            else:
+                conexion, kwargs = obtener_conexion_hosting(self.config), self.kwargs
+            try:
+                resultado = self.funcion(conexion, *self.args, **kwargs)
+            finally:
+                conexion.close()
+        except Exception as e:
+            if not self.cancelada:
+                print(f"[ERROR] Consulta en segundo plano: {e}")
+            self.senales.error.emit(self.id_tarea, str(e))
+            return
+        self.senales.resultado.emit(self.id_tarea, resultado)
+
+
+class IndicadorCarga(QLabel):
+    """Etiqueta 'Cargando…' que se muestra arriba al centro de la ventana"""
+
+    def __init__(self, ventana):
+        super().__init__("Cargando…", ventana)
+        self.setAlignment(Qt.AlignCenter)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: white;"
+            "border-radius: 8px; padding: 6px 14px; font-weight: bold;"
+        )
+        self.hide()
+
+    def mostrar(self):
+        self.adjustSize()
+        ventana = self.parentWidget()
+        self.move((ventana.width() - self.width()) // 2, 8)
+        self.raise_()
+        self.show()
+
+
+class ConsultorAsync(QObject):
+    """
+    Lanza las consultas de una ventana y entrega al hilo de la interfaz solo
+    la respuesta más reciente de cada canal. Mientras haya consultas en curso
+    se muestra el indicador de carga y el cursor de espera.
+    """
+
+    def __init__(self, ventana):
+        super().__init__(ventana)
+        self.ventana = ventana
+        self.indicador = IndicadorCarga(ventana)
+        self.tareas = {}      # id_tarea -> (canal, tarea, al_terminar, al_fallar), hasta que termine
+        self.ultima = {}      # canal -> id_tarea vigente
+        self.cargando = False
+
+    def ejecutar(self, canal, funcion, al_terminar, *args, al_fallar=None, espejo=False, **kwargs):
+        """
+        Ejecuta 'funcion' en segundo plano; devuelve False si no hay configuración.
+        Con espejo=True la consulta puede leer la copia local del catálogo:
+        'funcion' recibe además prefijo='espejo_' o '' para armar los nombres de tabla.
+        """
+        config = obtener_configuracion_hosting(self.ventana)
+        if not config:
+            QMessageBox.warning(self.ventana, "Conexión Fallida",
+                                "No hay configuración del servidor hosting.")
+            return False
+
+        self.cancelar(canal)
+
+        id_tarea = next(_ids_tarea)
+        tarea = TareaConsulta(id_tarea, config, funcion, args, kwargs, espejo)
+        tarea.senales.resultado.connect(self._entregar_resultado)
+        tarea.senales.error.connect(self._entregar_error)
+        self.tareas[id_tarea] = (canal, tarea, al_terminar, al_fallar)
+        self.ultima[canal] = id_tarea
+        self._actualizar_indicador()
+        _pool_hilos.start(tarea)
+        return True
+
+    def cancelar(self, canal):
+        """Descarta la consulta vigente de un canal (si todavía no empezó, no se ejecuta)"""
+        id_tarea = self.ultima.pop(canal, None)
+        entrada = self.tareas.get(id_tarea)
+        if entrada:
+            tarea = entrada[1]
+            tarea.cancelada = True
+            try:
+                if _pool_hilos.tryTake(tarea):
+                    del self.tareas[id_tarea]
+            except RuntimeError:
+                pass  # ya terminó; su señal está en camino
+        self._actualizar_indicador()
+
+    def cancelar_todas(self):
+        for canal in list(self.ultima):
+            self.cancelar(canal)
+
+    def en_curso(self, canal=None):
+        if canal is None:
+            return bool(self.ultima)
+        return canal in self.ultima
+
+    def _terminar(self, id_tarea):
+        """Libera la tarea y devuelve su entrada solo si seguía vigente"""
+        entrada = self.tareas.pop(id_tarea, None)
+        if not entrada or self.ultima.get(entrada[0]) != id_tarea:
+            return None
+        del self.ultima[entrada[0]]
+        self._actualizar_indicador()
+        return entrada
+
+    @pyqtSlot(int, object)
+    def _entregar_resultado(self, id_tarea, resultado):
+        entrada = self._terminar(id_tarea)
+        if entrada:  # si no, fue cancelada o reemplazada
+            entrada[2](resultado)
+
+    @pyqtSlot(int, str)
+    def _entregar_error(self, id_tarea, mensaje):
+        entrada = self._terminar(id_tarea)
+        if not entrada:
+            return
+        if entrada[3]:
+            entrada[3](mensaje)
+        else:
+            QMessageBox.warning(self.ventana, "Error BD", f"No se pudieron cargar los datos:\n{mensaje}")
+
+    def _actualizar_indicador(self):
+        cargando = bool(self.ultima)
+        if cargando == self.cargando:
+            return
+        self.cargando = cargando
+        if cargando:
+            self.ventana.setCursor(Qt.BusyCursor)
+            self.indicador.mostrar()
+        else:
+            self.ventana.unsetCursor()
+            self.indicador.hide()
@@ -1,12 +1,146 @@
 # database_hosting.py - EXCLUSIVO para base de datos del HOSTING
+import hashlib
+import mimetypes
+import threading
+import time
+from contextlib import contextmanager
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, InterfaceError, OperationalError, pooling
+from mysql.connector.errors import PoolError
 from PyQt5.QtWidgets import QMessageBox
 from database_local import obtener_configuracion_hosting  # ← NUEVA IMPORTACIÓN
+from imagenes_bd import TABLAS_IMAGENES, decodificar_data_uri, limpiar_imagenes_huerfanas
+
+# ---------------- POOL DE CONEXIONES AL HOSTING ----------------
+# Abrir una conexión nueva a Railway por cada consulta cuesta varios cientos
+# de ms por el WAN. Se mantiene un pool chico de conexiones abiertas: las
+# ventanas siguen usando conectar_hosting() / conexion.close() como siempre,
+# y close() devuelve la conexión al pool en lugar de cerrarla.
+TAMANIO_POOL_HOSTING = 3
+INTERVALO_KEEPALIVE = 120  # segundos entre pings a las conexiones inactivas
+
+_pool_hosting = None
+_config_pool_hosting = None
+_lock_pool_hosting = threading.Lock()
+_hilo_keepalive = None
+_pools_creados = 0
+
+def _crear_pool_hosting(config):
+    global _pool_hosting, _config_pool_hosting, _pools_creados
+    _pools_creados += 1
+    parametros = {k: config[k] for k in ('host', 'user', 'password', 'database', 'port')}
+    _pool_hosting = pooling.MySQLConnectionPool(
+        pool_name=f"hosting_{_pools_creados}",
+        pool_size=TAMANIO_POOL_HOSTING,
+        pool_reset_session=True,  # descarta transacciones abiertas al devolver la conexión
+        connect_timeout=30,
+        **parametros
+    )
+    _config_pool_hosting = parametros
+    print(f"[SUCCESS] Pool HOSTING creado ({TAMANIO_POOL_HOSTING} conexiones)")
+    _iniciar_keepalive()
+
+def _descartar_pool(pool):
+    """
+    Cierra las conexiones inactivas de un pool que se deja de usar: se toman
+    con get_connection() hasta agotarlo y se desconectan en lugar de
+    devolverlas con close()
+    """
+    if pool is None:
+        return
+    while True:
+        try:
+            conexion = pool.get_connection()
+        except (PoolError, Error):
+            break  # no quedan inactivas (el resto está en uso)
+        try:
+            conexion.disconnect()
+        except Error:
+            pass
+
+def _obtener_conexion_pool(config):
+    """
+    Toma una conexión del pool (creándolo o recreándolo si cambió la
+    configuración). get_connection() ya verifica que la conexión siga viva
+    y reconecta si hace falta.
+    """
+    parametros = {k: config[k] for k in ('host', 'user', 'password', 'database', 'port')}
+    anterior = None
+    with _lock_pool_hosting:
+        if _pool_hosting is None or parametros != _config_pool_hosting:
+            anterior = _pool_hosting
+            _crear_pool_hosting(config)
+        pool = _pool_hosting
+    _descartar_pool(anterior)
+
+    try:
+        conexion = pool.get_connection()
+    except PoolError:
+        # Pool agotado (p. ej. un hilo de carga en curso): conexión directa
+        print("[DEBUG] Pool HOSTING agotado, usando conexión directa")
+        return mysql.connector.connect(connect_timeout=30, **parametros)
+    return conexion
+
+def _keepalive_hosting():
+    """Hace ping periódico a las conexiones inactivas para que no las corte el servidor"""
+    while True:
+        time.sleep(INTERVALO_KEEPALIVE)
+        pool = _pool_hosting
+        if pool is None:
+            continue
+        tomadas = []
+        try:
+            for _ in range(TAMANIO_POOL_HOSTING):
+                try:
+                    conexion = pool.get_connection()
+                except PoolError:
+                    break  # el resto está en uso
+                tomadas.append(conexion)
+                try:
+                    conexion.ping(reconnect=True, attempts=1, delay=0)
+                except Error as e:
+                    print(f"[DEBUG] Keep-alive HOSTING falló: {e}")
+        finally:
+            for conexion in tomadas:
+                try:
+                    conexion.close()
+                except Error:
+                    pass
+
+def _iniciar_keepalive():
+    global _hilo_keepalive
+    if _hilo_keepalive is None:
+        _hilo_keepalive = threading.Thread(target=_keepalive_hosting, name="keepalive_hosting", daemon=True)
+        _hilo_keepalive.start()
+
+def cerrar_pool_hosting():
+    """Cierra las conexiones inactivas del pool (al salir de la aplicación)"""
+    global _pool_hosting, _config_pool_hosting
+    with _lock_pool_hosting:
+        pool, _pool_hosting, _config_pool_hosting = _pool_hosting, None, None
+    _descartar_pool(pool)
+
+def obtener_conexion_hosting(config):
+    """
+    Conexión del pool para una configuración ya leída, sin diálogos: lanza
+    Error si falla. Se puede usar desde hilos de trabajo.
+    """
+    global _pool_hosting
+    try:
+        return _obtener_conexion_pool(config)
+    except (OperationalError, InterfaceError) as e:
+        # Conexión perdida: se descarta el pool y se reintenta una vez
+        # (sus conexiones se sueltan sin desconectarlas una por una: get_connection()
+        # intentaría reconectar cada una antes de poder cerrarla)
+        print(f"[DEBUG] Reconectando al hosting tras error: {e}")
+        with _lock_pool_hosting:
+            _pool_hosting = None
+        return _obtener_conexion_pool(config)
 
 def conectar_hosting(parent=None):
     """
-    Conectar a la base de datos del hosting usando configuración de la tabla local
+    Conectar a la base de datos del hosting usando configuración de la tabla local.
+    Devuelve una conexión del pool: al llamar close() vuelve al pool.
     """
     try:
         # Obtener configuración desde la DB local
@@ -15,20 +149,7 @@ def conectar_hosting(parent=None):
             print("[ERROR] No se pudo obtener configuración del hosting desde DB local")
             return None
         
-        print(f"[DEBUG] Conectando a hosting: {config['host']}:{config['port']}")
-        
-        conexion = mysql.connector.connect(
-            host=config['host'],
-            user=config['user'],
-            password=config['password'],
-            database=config['database'],
-            port=config['port'],
-            connect_timeout=30
-        )
-        
-        if conexion.is_connected():
-            print("[SUCCESS] Conexión a HOSTING exitosa")
-            return conexion
+        return obtener_conexion_hosting(config)
             
     except Error as e:
         print(f"[ERROR] No se pudo conectar al hosting: {e}")
@@ -46,16 +167,91 @@ def conectar_hosting(parent=None):
                            f"- El servidor hosting esté disponible")
         return None
 
-def inicializar_base_datos_hosting(parent=None):
+@contextmanager
+def sesion_hosting(parent=None):
     """
-    Inicializar todas las tablas de la aplicación en el hosting
+    Conexión del pool para usar con 'with': hace commit si el bloque termina
+    bien, rollback si lanza una excepción, y siempre la devuelve al pool.
     """
     conexion = conectar_hosting(parent)
+    if conexion is None:
+        raise Error("No se pudo conectar al hosting")
+    try:
+        yield conexion
+        conexion.commit()
+    except Exception:
+        try:
+            conexion.rollback()
+        except Error:
+            pass
+        raise
+    finally:
+        conexion.close()
+
+# ---------------- FIRMA DEL ESQUEMA ----------------
+# Al iniciar, si el hosting ya tiene la firma del esquema de esta versión de
+# la aplicación se saltea todo el DDL (una sola consulta en lugar de decenas).
+# Incrementar VERSION_ESQUEMA_BASE al cambiar las funciones crear_tabla_* o
+# los campos de verificar_y_agregar_campos_base64; las migraciones nuevas ya
+# cambian la firma por sí solas.
+VERSION_ESQUEMA_BASE = 1
+
+def firma_esquema():
+    contenido = f"{VERSION_ESQUEMA_BASE}|" + "|".join(f"{v}:{d}" for v, d, _ in MIGRACIONES)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def esquema_al_dia(conexion):
+    """True si el hosting ya tiene aplicado el esquema de esta versión"""
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("SELECT firma FROM esquema_app WHERE id = 1")
+        fila = cursor.fetchone()
+        return bool(fila) and fila[0] == firma_esquema()
+    except Error:
+        return False  # la tabla todavía no existe
+    finally:
+        cursor.close()
+
+def guardar_firma_esquema(conexion):
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS esquema_app (
+                id TINYINT PRIMARY KEY,
+                firma CHAR(64) NOT NULL,
+                actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB;
+        """)
+        cursor.execute("""
+            INSERT INTO esquema_app (id, firma) VALUES (1, %s)
+            ON DUPLICATE KEY UPDATE firma = VALUES(firma)
+        """, (firma_esquema(),))
+        conexion.commit()
+    finally:
+        cursor.close()
+
+def inicializar_base_datos_hosting(parent=None, config=None):
+    """
+    Inicializar todas las tablas de la aplicación en el hosting.
+    Con 'config' no muestra diálogos (para llamarla desde un hilo).
+    """
+    if config is not None:
+        try:
+            conexion = obtener_conexion_hosting(config)
+        except Error as e:
+            print(f"[ERROR] No se pudo conectar al hosting: {e}")
+            conexion = None
+    else:
+        conexion = conectar_hosting(parent)
     if not conexion:
         print("[ERROR] No se pudo conectar al hosting para inicialización")
         return False
 
     try:
+        if esquema_al_dia(conexion):
+            print("[OK] Esquema del hosting al día, se omite la verificación de tablas")
+            return True
+
         print("Inicializando base de datos del hosting...")
         
         # Lista de funciones para crear tablas
@@ -65,16 +261,24 @@ def inicializar_base_datos_hosting(parent=None):
             crear_tabla_secciones,
             crear_tabla_sub_secciones,
             crear_tabla_usuarios,
+            crear_tabla_catalogo_version,
             verificar_y_agregar_campos_base64,
+            aplicar_migraciones,
             insert_initial_users
         ]
         
+        errores = 0
         for funcion in funciones:
             try:
                 funcion(conexion)
                 print(f"[OK] {funcion.__name__} completada")
             except Exception as e:
+                errores += 1
                 print(f"[ERROR] en {funcion.__name__}: {e}")
+
+        # Solo se registra la firma si todo se aplicó: si no, se reintenta al próximo inicio
+        if errores == 0:
+            guardar_firma_esquema(conexion)
         
         return True
         
@@ -87,7 +291,12 @@ def inicializar_base_datos_hosting(parent=None):
 # ... (el resto de las funciones se mantienen igual)
 # -----------------Verificacion campos base64-------------------------
 def verificar_y_agregar_campos_base64(conexion):
-    """Verifica y agrega campos Base64 faltantes a todas las tablas en HOSTING"""
+    """
+    Verifica y agrega campos Base64 faltantes a todas las tablas en HOSTING.
+    Las columnas existentes se leen en una sola consulta a information_schema
+    y solo se hace un ALTER TABLE por tabla a la que realmente le falte algo
+    (cada ALTER toma un bloqueo de metadatos sobre la tabla en producción).
+    """
     try:
         cursor = conexion.cursor()
         
@@ -112,20 +321,291 @@ def verificar_y_agregar_campos_base64(conexion):
             ]
         }
         
+        marcadores = ", ".join(["%s"] * len(campos_por_tabla))
+        cursor.execute(f"""
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({marcadores})
+        """, tuple(campos_por_tabla))
+        # Algunas versiones del conector devuelven bytearray para information_schema
+        texto = lambda v: v.decode("utf-8") if isinstance(v, (bytes, bytearray)) else v
+        existentes = {(texto(tabla).lower(), texto(columna).lower()) for tabla, columna in cursor.fetchall()}
+        
+        errores = []
         for tabla, campos in campos_por_tabla.items():
-            for campo in campos:
-                try:
-                    cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {campo}")
-                    print(f"[OK] Campo {campo} agregado a {tabla}")
-                except Exception as e:
-                    print(f"[INFO] Campo {campo} ya existe en {tabla} o error: {e}")
+            faltantes = [c for c in campos if (tabla, c.split()[0].lower()) not in existentes]
+            if not faltantes:
+                continue
+            try:
+                cursor.execute(f"ALTER TABLE {tabla} " + ", ".join(f"ADD COLUMN {c}" for c in faltantes))
+                print(f"[OK] {len(faltantes)} campo(s) agregado(s) a {tabla}: {', '.join(c.split()[0] for c in faltantes)}")
+            except Exception as e:
+                errores.append(tabla)
+                print(f"[ERROR] No se pudieron agregar campos a {tabla}: {e}")
         
         conexion.commit()
+        if errores:
+            raise Error(f"Faltan campos Base64 en: {', '.join(errores)}")
         cursor.close()
         print("[SUCCESS] Verificación de campos Base64 completada en HOSTING")
         
     except Exception as e:
         print(f"[ERROR] En verificación de campos Base64: {e}")
+        raise  # así no se registra la firma del esquema y se reintenta al próximo inicio
+
+# ---------------- MIGRACIONES DE ESQUEMA ----------------
+# Cada migración se aplica una sola vez y queda registrada en schema_version.
+# Agregar las nuevas al final con el siguiente número; nunca modificar una
+# migración ya publicada.
+MIGRACIONES = [
+    (1, "Índices compuestos para los listados de sub_secciones, secciones y regiones", [
+        # API: WHERE habilitar = 1 ORDER BY orden, id_sub_seccion
+        "CREATE INDEX idx_ss_habilitar_orden ON sub_secciones (habilitar, orden)",
+        # API ?seccion= y ventana de sub-secciones sin región
+        "CREATE INDEX idx_ss_seccion_habilitar_orden ON sub_secciones (id_seccion, habilitar, orden)",
+        # Ventana de sub-secciones con región y API ?seccion=&region=
+        "CREATE INDEX idx_ss_seccion_region_habilitar_orden ON sub_secciones (id_seccion, id_region_zona, habilitar, orden)",
+        # API ?region= y /api/bootstrap?region=
+        "CREATE INDEX idx_ss_region_habilitar_orden ON sub_secciones (id_region_zona, habilitar, orden)",
+        "CREATE INDEX idx_secciones_habilitar_orden ON secciones (habilitar, orden)",
+        "CREATE INDEX idx_regiones_habilitar_orden ON regiones_zonas (habilitar, orden)",
+    ]),
+    (2, "Tablas imagenes e imagenes_registros (imágenes fuera de las filas del catálogo)", [
+        """
+        CREATE TABLE IF NOT EXISTS imagenes (
+            hash CHAR(64) PRIMARY KEY,
+            mime VARCHAR(50) NOT NULL,
+            tamanio INT NOT NULL,
+            datos LONGBLOB NOT NULL,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS imagenes_registros (
+            tabla VARCHAR(64) NOT NULL,
+            id_registro INT NOT NULL,
+            campo VARCHAR(64) NOT NULL,
+            hash CHAR(64) NOT NULL,
+            PRIMARY KEY (tabla, id_registro, campo),
+            INDEX idx_imagenes_registros_hash (hash)
+        ) ENGINE=InnoDB
+        """,
+    ]),
+    (3, "Mover las columnas *_base64 a la tabla imagenes", [
+        lambda conexion: migrar_base64_a_imagenes(conexion),
+    ]),
+    (4, "Columna updated_at en el catálogo (sincronización del espejo local)", [
+        "ALTER TABLE regiones_zonas ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+        "ALTER TABLE secciones ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+        "ALTER TABLE sub_secciones ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+        "CREATE INDEX idx_regiones_updated_at ON regiones_zonas (updated_at)",
+        "CREATE INDEX idx_secciones_updated_at ON secciones (updated_at)",
+        "CREATE INDEX idx_ss_updated_at ON sub_secciones (updated_at)",
+    ]),
+    (5, "Borrar las imágenes de registros ya eliminados", [
+        lambda conexion: _limpiar_imagenes_huerfanas(conexion),
+    ]),
+]
+
+# Errores de MySQL que indican que la sentencia ya estaba aplicada
+ERRORES_YA_APLICADO = (
+    1060,  # ER_DUP_FIELDNAME
+    1061,  # ER_DUP_KEYNAME
+)
+
+def crear_tabla_schema_version(conexion):
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                descripcion VARCHAR(255) NOT NULL,
+                fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB;
+        """)
+        conexion.commit()
+    finally:
+        cursor.close()
+
+def obtener_version_esquema(conexion):
+    """Última migración aplicada en el hosting (0 si no hay ninguna)"""
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+def aplicar_migraciones(conexion):
+    """
+    Aplica en orden las migraciones pendientes de MIGRACIONES. Cada paso es
+    una sentencia SQL o una función que recibe la conexión.
+    """
+    crear_tabla_schema_version(conexion)
+    version_actual = obtener_version_esquema(conexion)
+
+    pendientes = [m for m in sorted(MIGRACIONES, key=lambda m: m[0]) if m[0] > version_actual]
+    if not pendientes:
+        print(f"[OK] Esquema HOSTING al día (versión {version_actual})")
+        return
+
+    cursor = conexion.cursor()
+    try:
+        for version, descripcion, sentencias in pendientes:
+            print(f"[INFO] Aplicando migración {version}: {descripcion}")
+            for sentencia in sentencias:
+                if callable(sentencia):
+                    # Migración de datos escrita en Python
+                    sentencia(conexion)
+                    continue
+                try:
+                    cursor.execute(sentencia)
+                except Error as e:
+                    if e.errno not in ERRORES_YA_APLICADO:
+                        raise
+                    print(f"[INFO] Ya aplicado: {sentencia} ({e.msg})")
+            cursor.execute(
+                "INSERT INTO schema_version (version, descripcion) VALUES (%s, %s)",
+                (version, descripcion)
+            )
+            conexion.commit()
+            print(f"[OK] Migración {version} aplicada")
+    finally:
+        cursor.close()
+
+# ---------------- IMÁGENES ----------------
+# Tablas 'imagenes' e 'imagenes_registros': ver imagenes_bd.py (compartido con la API).
+# Así las consultas de listado no arrastran los bytes de las imágenes.
+def guardar_imagen(conexion, tabla, id_registro, campo, datos, mime):
+    """
+    Guarda los bytes de una imagen (sin duplicar contenido) y la asocia al
+    campo del registro indicado. No hace commit.
+    """
+    if tabla not in TABLAS_IMAGENES or campo not in TABLAS_IMAGENES[tabla][1]:
+        raise ValueError(f"Campo de imagen desconocido: {tabla}.{campo}")
+
+    hash_imagen = hashlib.sha256(datos).hexdigest()
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("""
+            INSERT IGNORE INTO imagenes (hash, mime, tamanio, datos)
+            VALUES (%s, %s, %s, %s)
+        """, (hash_imagen, mime, len(datos), datos))
+        cursor.execute("""
+            INSERT INTO imagenes_registros (tabla, id_registro, campo, hash)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE hash = VALUES(hash)
+        """, (tabla, id_registro, campo, hash_imagen))
+    finally:
+        cursor.close()
+    return hash_imagen
+
+def guardar_imagen_desde_archivo(conexion, tabla, id_registro, campo, ruta_archivo):
+    """Lee un archivo de imagen y lo guarda con guardar_imagen()"""
+    with open(ruta_archivo, "rb") as f:
+        datos = f.read()
+    mime = mimetypes.guess_type(ruta_archivo)[0] or 'application/octet-stream'
+    return guardar_imagen(conexion, tabla, id_registro, campo, datos, mime)
+
+def migrar_base64_a_imagenes(conexion, tamanio_lote=20):
+    """
+    Migración única: mueve el contenido de las columnas *_base64 a la tabla
+    imagenes y deja esas columnas en NULL. Procesa por lotes con commit por
+    lote para no mantener transacciones largas sobre el hosting.
+    """
+    cursor = conexion.cursor()
+    try:
+        for tabla, (clave, campos) in TABLAS_IMAGENES.items():
+            for campo, columna in campos.items():
+                ultimo_id, migradas = 0, 0
+                while True:
+                    try:
+                        cursor.execute(f"""
+                            SELECT {clave}, {columna} FROM {tabla}
+                            WHERE {columna} IS NOT NULL AND TRIM({columna}) <> '' AND {clave} > %s
+                            ORDER BY {clave} LIMIT %s
+                        """, (ultimo_id, tamanio_lote))
+                    except Error as e:
+                        print(f"[INFO] {tabla}.{columna} no disponible: {e.msg}")
+                        break
+                    filas = cursor.fetchall()
+                    if not filas:
+                        break
+
+                    for id_registro, contenido in filas:
+                        ultimo_id = id_registro
+                        try:
+                            imagen = decodificar_data_uri(contenido)
+                        except Exception as e:
+                            print(f"[WARN] {tabla}.{columna} id={id_registro} no es base64 válido: {e}")
+                            continue
+                        if imagen is None:
+                            continue  # 'data:image/...;base64,' sin contenido: igual que NULL
+                        mime, datos = imagen
+                        guardar_imagen(conexion, tabla, id_registro, campo, datos, mime)
+                        cursor.execute(f"UPDATE {tabla} SET {columna} = NULL WHERE {clave} = %s", (id_registro,))
+                        migradas += 1
+                    conexion.commit()
+
+                if migradas:
+                    print(f"[OK] {migradas} imagen(es) migradas de {tabla}.{columna}")
+    finally:
+        cursor.close()
+
+def _limpiar_imagenes_huerfanas(conexion):
+    cursor = conexion.cursor()
+    try:
+        borradas = limpiar_imagenes_huerfanas(cursor)
+    finally:
+        cursor.close()
+    conexion.commit()
+    if borradas:
+        print(f"[OK] {borradas} imagen(es) sin registro borradas")
+
+# Consultas representativas de cada pantalla, para verificar con EXPLAIN
+# que usan los índices de MIGRACIONES en lugar de recorrer la tabla.
+CONSULTAS_A_VERIFICAR = [
+    ("API sub-secciones",
+     "SELECT id_sub_seccion FROM sub_secciones WHERE habilitar = 1 ORDER BY orden, id_sub_seccion", ()),
+    ("API sub-secciones por región",
+     "SELECT id_sub_seccion FROM sub_secciones WHERE habilitar = 1 AND id_region_zona = %s "
+     "ORDER BY orden, id_sub_seccion", (1,)),
+    ("Ventana sub-secciones (sección)",
+     "SELECT * FROM sub_secciones WHERE id_seccion = %s AND habilitar = 1 "
+     "AND (fecha_desactivacion IS NULL OR fecha_desactivacion > CURDATE()) ORDER BY orden ASC", (1,)),
+    ("Ventana sub-secciones (sección + región)",
+     "SELECT * FROM sub_secciones WHERE id_seccion = %s AND id_region_zona = %s AND habilitar = 1 "
+     "AND (fecha_desactivacion IS NULL OR fecha_desactivacion > CURDATE()) ORDER BY orden ASC", (1, 1)),
+    ("API secciones",
+     "SELECT id_seccion FROM secciones WHERE habilitar = 1 ORDER BY orden", ()),
+    ("API regiones",
+     "SELECT id_region_zona FROM regiones_zonas WHERE habilitar = 1 ORDER BY orden ASC", ()),
+]
+
+def verificar_planes_consultas(conexion):
+    """
+    Ejecuta EXPLAIN sobre CONSULTAS_A_VERIFICAR e informa, para cada una,
+    el índice elegido y si MySQL recurre a un filesort o a un full scan.
+    Devuelve True si todas usan índice y ninguna hace filesort.
+    """
+    cursor = conexion.cursor(dictionary=True)
+    todo_ok = True
+    try:
+        for nombre, consulta, parametros in CONSULTAS_A_VERIFICAR:
+            cursor.execute("EXPLAIN " + consulta, parametros)
+            plan = cursor.fetchall()[0]
+            extra = plan.get('Extra') or ''
+            indice = plan.get('key')
+            ok = bool(indice) and 'filesort' not in extra and plan.get('type') != 'ALL'
+            todo_ok = todo_ok and ok
+            estado = "[OK]" if ok else "[WARN]"
+            print(f"{estado} {nombre}: key={indice} type={plan.get('type')} rows={plan.get('rows')} extra={extra}")
+    finally:
+        cursor.close()
+    return todo_ok
 
 # ---------------- TABLAS (MANTENER IGUAL) ----------------
 def crear_tabla_usuarios(conexion):
@@ -152,6 +632,7 @@ def crear_tabla_usuarios(conexion):
         print("[OK] Tabla 'usuarios' creada/verificada en HOSTING")
     except Exception as e:
         print(f"Error al crear la tabla 'usuarios': {e}")
+        raise  # la inicialización no debe registrar la firma del esquema
     finally:
         cursor.close()
 
@@ -188,6 +669,7 @@ def crear_tabla_configuraciones(conexion):
         print("[OK] Tabla 'configuracion_app' creada/verificada en HOSTING")
     except Exception as e:
         print(f"Error al crear la tabla 'configuracion_app': {e}")
+        raise  # la inicialización no debe registrar la firma del esquema
     finally:
         cursor.close()
 
@@ -208,6 +690,7 @@ def crear_tabla_regiones_zona(conexion):
         print("[OK] Tabla 'regiones_zonas' creada/verificada en HOSTING")
     except Exception as e:
         print(f"Error al crear la tabla 'regiones_zonas': {e}")
+        raise  # la inicialización no debe registrar la firma del esquema
     finally:
         cursor.close()
 
@@ -228,6 +711,7 @@ def crear_tabla_secciones(conexion):
         print("[OK] Tabla 'secciones' creada/verificada en HOSTING")
     except Exception as e:
         print(f"Error al crear la tabla 'secciones': {e}")
+        raise  # la inicialización no debe registrar la firma del esquema
     finally:
         cursor.close()
 
@@ -276,9 +760,69 @@ def crear_tabla_sub_secciones(conexion):
         print("[OK] Tabla 'sub_secciones' creada/verificada en HOSTING")
     except Exception as e:
         print(f"Error al crear la tabla 'sub_secciones': {e}")
+        raise  # la inicialización no debe registrar la firma del esquema
+    finally:
+        cursor.close()
+
+def crear_tabla_catalogo_version(conexion):
+    """
+    Tabla de una sola fila con la versión del catálogo. La API la consulta
+    para saber si sus respuestas cacheadas siguen vigentes.
+    """
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS catalogo_version (
+                id TINYINT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 1,
+                actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB;
+        """)
+        cursor.execute("INSERT IGNORE INTO catalogo_version (id, version) VALUES (1, 1)")
+        conexion.commit()
+        print("[OK] Tabla 'catalogo_version' creada/verificada en HOSTING")
+    except Exception as e:
+        print(f"Error al crear la tabla 'catalogo_version': {e}")
+        raise  # la inicialización no debe registrar la firma del esquema
     finally:
         cursor.close()
 
+# Funciones a avisar cuando esta aplicación modifica el catálogo
+_oyentes_catalogo = []
+
+def al_modificar_catalogo(funcion):
+    """Registra funcion() para que se llame en cada notificar_cambio_catalogo"""
+    _oyentes_catalogo.append(funcion)
+
+def notificar_cambio_catalogo():
+    """
+    Avisa a los oyentes que el catálogo cambió. Llamar después del commit:
+    si se avisa antes, una sincronización del espejo en ese intervalo lee
+    los datos viejos y los da por vigentes.
+    """
+    for funcion in _oyentes_catalogo:
+        funcion()
+
+def incrementar_version_catalogo(conexion):
+    """
+    Incrementa la versión del catálogo dentro de la transacción en curso.
+    Llamar antes del commit de cualquier alta/baja/modificación que afecte
+    a los datos publicados por la API (configuración, regiones, secciones,
+    sub-secciones), y notificar_cambio_catalogo() después del commit.
+    """
+    cursor = None
+    try:
+        cursor = conexion.cursor()
+        cursor.execute("""
+            INSERT INTO catalogo_version (id, version) VALUES (1, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+        """)
+    except Exception as e:
+        print(f"[WARN] No se pudo incrementar la versión del catálogo: {e}")
+    finally:
+        if cursor:
+            cursor.close()
+
 # ---------------- INSERTAR USUARIOS ----------------
 def insert_initial_users(conexion):
     cursor = conexion.cursor()
@@ -299,8 +843,8 @@ def insert_initial_users(conexion):
 
 def cerrar_conexion(conexion):
     """
-    Cerrar conexión de forma segura
+    Cerrar conexión de forma segura (si es del pool, vuelve al pool)
     """
     if conexion and conexion.is_connected():
         conexion.close()
-        print("[OK] Conexión HOSTING cerrada")
\ No newline at end of file
+        print("[OK] Conexión HOSTING devuelta")
\ No newline at end of file
@@ -11,6 +11,40 @@ import os
 CREDENCIALES_LOCALES_TEMPORALES = None
 CONFIG_FILE = "mysql_config.json"
 
+# Caché de credenciales de la sesión: se resuelven una vez y se reutilizan en
+# cada conexión. Solo se invalidan al reconfigurar (diálogos / guardado).
+_config_local_sesion = None
+_config_hosting_sesion = None
+
+def invalidar_credenciales_sesion(local=False, hosting=True):
+    """Olvida las credenciales cacheadas para que se vuelvan a resolver"""
+    global _config_local_sesion, _config_hosting_sesion
+    if local:
+        _config_local_sesion = None
+    if hosting:
+        _config_hosting_sesion = None
+
+def conectar_local_sin_dialogo():
+    """
+    Conexión local con las credenciales ya resueltas en la sesión, sin
+    diálogos (se puede usar desde hilos). None si todavía no hay credenciales.
+    """
+    if not _config_local_sesion:
+        return None
+    try:
+        return mysql.connector.connect(**parametros_mysql(_config_local_sesion), connect_timeout=8)
+    except Error as e:
+        print(f"[DEBUG] ❌ Conexión local sin diálogo falló: {e}")
+        return None
+
+def configuracion_hosting_en_sesion():
+    """Configuración del hosting si ya se leyó en esta sesión (sin diálogos), o None"""
+    return dict(_config_hosting_sesion) if _config_hosting_sesion else None
+
+def parametros_mysql(config):
+    """Filtra de un diccionario de configuración solo los parámetros válidos para MySQL"""
+    return {k: v for k, v in config.items() if k in ['host', 'user', 'password', 'database', 'port']}
+
 class DialogoCredencialesMySQL(QDialog):
     """Diálogo para ingresar credenciales de MySQL local - CONEXIÓN LOCAL"""
     def __init__(self, parent=None, titulo_personalizado=None, es_reconfiguracion=False):
@@ -361,6 +395,7 @@ def conectar_y_guardar_configuracion(credenciales, parent=None):
     global CREDENCIALES_LOCALES_TEMPORALES
     
     print(f"[DEBUG] 🛠️ Conectando y guardando: {credenciales['user']}@{credenciales['host']}")
+    invalidar_credenciales_sesion(local=True)
     
     try:
         # ✅ GUARDAR como temporales inmediatamente
@@ -532,12 +567,22 @@ def conectar_local(parent=None):
     """
     Conexión DIRECTA a MySQL LOCAL para 'databaseapp'
     """
+    global CREDENCIALES_LOCALES_TEMPORALES, _config_local_sesion
+
+    # Credenciales ya resueltas en esta sesión: una sola conexión
+    if _config_local_sesion:
+        try:
+            conexion = mysql.connector.connect(**parametros_mysql(_config_local_sesion), connect_timeout=8)
+            if conexion.is_connected():
+                return conexion
+        except Error as e:
+            print(f"[DEBUG] ❌ Credenciales locales de la sesión ya no funcionan: {e}")
+        _config_local_sesion = None
+
     print("\n" + "="*50)
     print("[DEBUG] 🚀 INICIANDO CONEXIÓN LOCAL")
     print("="*50)
     
-    global CREDENCIALES_LOCALES_TEMPORALES
-    
     # PRIMERO: Intentar conexión automática (archivo -> tabla)
     print("[DEBUG] 1. Intentando conexión automática...")
     config_automatica = obtener_configuracion_automatica()
@@ -551,6 +596,7 @@ def conectar_local(parent=None):
             conexion = mysql.connector.connect(**parametros_conexion, connect_timeout=8)
             if conexion.is_connected():
                 print("[SUCCESS] 🎉 Conexión automática EXITOSA")
+                _config_local_sesion = dict(config_automatica)
                 # Actualizar variables globales
                 CREDENCIALES_LOCALES_TEMPORALES = {
                     'host': config_automatica['host'],
@@ -602,6 +648,7 @@ def conectar_local(parent=None):
                         # ✅ FILTRAR parámetros válidos para MySQL
                         parametros_conexion = {k: v for k, v in config.items() 
                                              if k in ['host', 'user', 'password', 'database', 'port']}
+                        _config_local_sesion = dict(config)
                         return mysql.connector.connect(**parametros_conexion, connect_timeout=5)
                 
                 conexion.close()
@@ -630,6 +677,7 @@ def conectar_local(parent=None):
         # ✅ FILTRAR parámetros válidos para MySQL
         parametros_conexion = {k: v for k, v in credenciales_con_db.items() 
                              if k in ['host', 'user', 'password', 'database', 'port']}
+        _config_local_sesion = credenciales_con_db
         return mysql.connector.connect(**parametros_conexion, connect_timeout=5)
     else:
         print("[ERROR] ❌ No se pudo guardar la configuración")
@@ -653,8 +701,19 @@ def inicializar_base_datos_local(parent=None):
 
 def obtener_configuracion_hosting(parent=None):
     """
-    Leer configuración del servidor REMOTO desde la tabla local
+    Leer configuración del servidor REMOTO desde la tabla local.
+    El resultado queda cacheado para el resto de la sesión.
     """
+    global _config_hosting_sesion
+    if _config_hosting_sesion:
+        return dict(_config_hosting_sesion)
+
+    config = _leer_configuracion_hosting(parent)
+    if config:
+        _config_hosting_sesion = dict(config)
+    return config
+
+def _leer_configuracion_hosting(parent=None):
     print("\n[DEBUG] 🌐 BUSCANDO CONFIGURACIÓN HOSTING...")
     
     conexion = conectar_local(parent)
@@ -711,6 +770,7 @@ def mostrar_dialogo_configuracion_hosting(parent=None):
         
         QMessageBox.information(parent, "Configuración de Hosting", 
                               "Ahora necesita configurar la conexión al servidor HOSTING REMOTO.")
+        invalidar_credenciales_sesion()
         
         dialogo = DialogoConfigBD(parent)
         dialogo.setWindowTitle("🌐 Configuración de Hosting Remoto")
@@ -792,6 +852,7 @@ def guardar_configuracion_hosting(host, usuario, password, base_datos, puerto=33
     Guardar configuración del servidor REMOTO en la tabla local
     """
     print(f"[DEBUG] 🛠️ Guardando configuración HOSTING: {usuario}@{host}:{puerto}/{base_datos} - URL: {base_url}")
+    invalidar_credenciales_sesion()
     
     conexion = conectar_local(parent)
     if not conexion:
@@ -0,0 +1,277 @@
+# espejo_catalogo.py - Copia local del catálogo del hosting para las lecturas de la app
+#
+# Las ventanas volvían a consultar regiones_zonas, secciones y sub_secciones
+# en el hosting cada vez que se abrían o cambiaba un combo. Acá esas tablas
+# se copian a la base local (databaseapp, tablas espejo_*) y las lecturas se
+# hacen contra la copia. La sincronización trae solo las filas con updated_at
+# posterior a la última sincronizada:
+#   - en segundo plano cada INTERVALO_SINCRONIZACION segundos (si la versión
+#     del catálogo no cambió, cuesta una sola consulta)
+#   - antes de la próxima lectura, si esta aplicación modificó el catálogo
+# Si la base local no está disponible, las lecturas van directo al hosting.
+import threading
+import time
+from datetime import timedelta
+
+from mysql.connector import Error
+
+from database_hosting import al_modificar_catalogo, obtener_conexion_hosting
+from database_local import conectar_local_sin_dialogo, configuracion_hosting_en_sesion
+
+PREFIJO_ESPEJO = "espejo_"
+INTERVALO_SINCRONIZACION = 60
+# Margen hacia atrás sobre la última marca: cubre transacciones que
+# confirmaron después de que se leyeron filas con updated_at mayor
+SOLAPAMIENTO_MARCA = timedelta(seconds=5)
+
+# tabla -> (clave primaria, columnas copiadas sin updated_at)
+TABLAS_ESPEJO = {
+    "regiones_zonas": ("id_region_zona", (
+        "id_region_zona", "nombre_region_zona", "imagen_region_zona_ruta_relativa", "habilitar", "orden",
+    )),
+    "secciones": ("id_seccion", (
+        "id_seccion", "nombre_seccion", "icono_seccion", "habilitar", "orden",
+    )),
+    "sub_secciones": ("id_sub_seccion", (
+        "id_sub_seccion", "id_seccion", "id_region_zona", "nombre_sub_seccion",
+        "domicilio", "latitud", "longitud", "distancia", "numero_telefono",
+        "imagen", "imagen_ruta_relativa", "icono", "icono_ruta_relativa",
+        "itinerario_maps", "habilitar", "fecha_desactivacion", "orden", "destacado",
+        "foto1_ruta_absoluta", "foto1_ruta_relativa", "foto2_ruta_absoluta", "foto2_ruta_relativa",
+        "foto3_ruta_absoluta", "foto3_ruta_relativa", "foto4_ruta_absoluta", "foto4_ruta_relativa",
+    )),
+}
+
+DDL_ESPEJO = [
+    """
+    CREATE TABLE IF NOT EXISTS espejo_estado (
+        tabla VARCHAR(64) PRIMARY KEY,
+        marca DATETIME(6) NULL,
+        version_catalogo BIGINT NULL,
+        sincronizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS espejo_regiones_zonas (
+        id_region_zona INT(11) PRIMARY KEY,
+        nombre_region_zona VARCHAR(100) NOT NULL,
+        imagen_region_zona_ruta_relativa VARCHAR(255),
+        habilitar BOOLEAN NOT NULL DEFAULT TRUE,
+        orden INT NOT NULL DEFAULT 0,
+        updated_at DATETIME(6) NOT NULL,
+        INDEX idx_espejo_regiones_habilitar_orden (habilitar, orden)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS espejo_secciones (
+        id_seccion INT(11) PRIMARY KEY,
+        nombre_seccion VARCHAR(100) NOT NULL,
+        icono_seccion VARCHAR(255),
+        habilitar BOOLEAN NOT NULL DEFAULT TRUE,
+        orden INT NOT NULL DEFAULT 0,
+        updated_at DATETIME(6) NOT NULL,
+        INDEX idx_espejo_secciones_habilitar_orden (habilitar, orden)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS espejo_sub_secciones (
+        id_sub_seccion INT(11) PRIMARY KEY,
+        id_seccion INT(11) NOT NULL,
+        id_region_zona INT(11) NOT NULL,
+        nombre_sub_seccion VARCHAR(150) NOT NULL,
+        domicilio VARCHAR(255),
+        latitud DECIMAL(10,6),
+        longitud DECIMAL(10,6),
+        distancia VARCHAR(50),
+        numero_telefono VARCHAR(30),
+        imagen VARCHAR(255),
+        imagen_ruta_relativa VARCHAR(255),
+        icono VARCHAR(255),
+        icono_ruta_relativa VARCHAR(255),
+        itinerario_maps VARCHAR(500),
+        habilitar BOOLEAN NOT NULL DEFAULT TRUE,
+        fecha_desactivacion DATE NULL,
+        orden INT(11) NOT NULL DEFAULT 0,
+        destacado TINYINT DEFAULT 0,
+        foto1_ruta_absoluta VARCHAR(255),
+        foto1_ruta_relativa VARCHAR(255),
+        foto2_ruta_absoluta VARCHAR(255),
+        foto2_ruta_relativa VARCHAR(255),
+        foto3_ruta_absoluta VARCHAR(255),
+        foto3_ruta_relativa VARCHAR(255),
+        foto4_ruta_absoluta VARCHAR(255),
+        foto4_ruta_relativa VARCHAR(255),
+        updated_at DATETIME(6) NOT NULL,
+        INDEX idx_espejo_ss_seccion_region_habilitar_orden (id_seccion, id_region_zona, habilitar, orden)
+    ) ENGINE=InnoDB
+    """,
+]
+
+_lock_sincronizacion = threading.Lock()
+_estado = {
+    "tablas_creadas": False,
+    "listo": False,        # hubo al menos una sincronización completa en esta sesión
+    "modificaciones": 0,   # se incrementa con cada cambio hecho desde esta aplicación
+    "sincronizadas": 0,    # valor de 'modificaciones' al empezar la última sincronización
+}
+_hilo_sincronizacion = None
+
+
+def marcar_desactualizado():
+    """La próxima lectura sincroniza antes de leer (se llama al modificar el catálogo)"""
+    _estado["modificaciones"] += 1
+
+
+al_modificar_catalogo(marcar_desactualizado)
+
+
+def crear_tablas_espejo(conexion_local):
+    cursor = conexion_local.cursor()
+    try:
+        for ddl in DDL_ESPEJO:
+            cursor.execute(ddl)
+        conexion_local.commit()
+    finally:
+        cursor.close()
+
+
+def leer_estado(conexion_local):
+    cursor = conexion_local.cursor()
+    try:
+        cursor.execute("SELECT tabla, marca, version_catalogo FROM espejo_estado")
+        return {tabla: (marca, version) for tabla, marca, version in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def sincronizar_tabla(cursor_remoto, cursor_local, tabla, marca):
+    """
+    Copia las filas con updated_at >= marca - solapamiento (todas si no hay
+    marca) y borra las que ya no existen en el hosting. Devuelve la nueva marca.
+    """
+    clave, columnas = TABLAS_ESPEJO[tabla]
+    lista_columnas = ", ".join(columnas + ("updated_at",))
+
+    if marca is None:
+        cursor_remoto.execute(f"SELECT {lista_columnas} FROM {tabla}")
+    else:
+        cursor_remoto.execute(
+            f"SELECT {lista_columnas} FROM {tabla} WHERE updated_at >= %s",
+            (marca - SOLAPAMIENTO_MARCA,)
+        )
+    filas = cursor_remoto.fetchall()
+
+    if filas:
+        marcadores = ", ".join(["%s"] * (len(columnas) + 1))
+        actualizaciones = ", ".join(f"{c} = VALUES({c})" for c in columnas[1:] + ("updated_at",))
+        cursor_local.executemany(
+            f"INSERT INTO {PREFIJO_ESPEJO}{tabla} ({lista_columnas}) VALUES ({marcadores}) "
+            f"ON DUPLICATE KEY UPDATE {actualizaciones}",
+            filas
+        )
+        marca = max([fila[-1] for fila in filas] + ([marca] if marca else []))
+
+    # Bajas: las filas borradas no dejan updated_at, se comparan los ids
+    cursor_remoto.execute(f"SELECT {clave} FROM {tabla}")
+    ids_remotos = {fila[0] for fila in cursor_remoto.fetchall()}
+    cursor_local.execute(f"SELECT {clave} FROM {PREFIJO_ESPEJO}{tabla}")
+    borrados = [fila[0] for fila in cursor_local.fetchall() if fila[0] not in ids_remotos]
+    if borrados:
+        marcadores = ", ".join(["%s"] * len(borrados))
+        cursor_local.execute(f"DELETE FROM {PREFIJO_ESPEJO}{tabla} WHERE {clave} IN ({marcadores})", borrados)
+
+    if filas or borrados:
+        print(f"[ESPEJO] {tabla}: {len(filas)} fila(s) actualizada(s), {len(borrados)} borrada(s)")
+    return marca
+
+
+def sincronizar(config=None):
+    """
+    Trae al espejo local los cambios del hosting. Devuelve True si el espejo
+    quedó al día. Se puede llamar desde cualquier hilo (no muestra diálogos).
+    """
+    config = config or configuracion_hosting_en_sesion()
+    if not config:
+        return False
+
+    with _lock_sincronizacion:
+        modificaciones = _estado["modificaciones"]
+        conexion_local = conectar_local_sin_dialogo()
+        if conexion_local is None:
+            return False
+        conexion_remota = None
+        try:
+            if not _estado["tablas_creadas"]:
+                crear_tablas_espejo(conexion_local)
+                _estado["tablas_creadas"] = True
+            estado = leer_estado(conexion_local)
+
+            conexion_remota = obtener_conexion_hosting(config)
+            cursor_remoto = conexion_remota.cursor()
+            # La versión se lee antes que los datos: si cambia en el medio,
+            # la próxima sincronización vuelve a mirar
+            cursor_remoto.execute("SELECT version FROM catalogo_version WHERE id = 1")
+            fila = cursor_remoto.fetchone()
+            version = fila[0] if fila else None
+
+            al_dia = version is not None and all(
+                estado.get(tabla, (None, None))[1] == version for tabla in TABLAS_ESPEJO
+            )
+            if not al_dia:
+                cursor_local = conexion_local.cursor()
+                for tabla in TABLAS_ESPEJO:
+                    marca = sincronizar_tabla(cursor_remoto, cursor_local, tabla, estado.get(tabla, (None, None))[0])
+                    cursor_local.execute("""
+                        INSERT INTO espejo_estado (tabla, marca, version_catalogo) VALUES (%s, %s, %s)
+                        ON DUPLICATE KEY UPDATE marca = VALUES(marca), version_catalogo = VALUES(version_catalogo)
+                    """, (tabla, marca, version))
+                conexion_local.commit()
+                cursor_local.close()
+            cursor_remoto.close()
+
+            _estado["listo"] = True
+            _estado["sincronizadas"] = modificaciones
+            return True
+        except Error as e:
+            print(f"[ESPEJO] No se pudo sincronizar: {e}")
+            try:
+                conexion_local.rollback()
+            except Error:
+                pass
+            return False
+        finally:
+            if conexion_remota is not None:
+                conexion_remota.close()
+            conexion_local.close()
+
+
+def conexion_lectura(config):
+    """
+    Conexión para leer el catálogo y el prefijo de tablas a usar con ella:
+    (conexión local, 'espejo_') si el espejo está al día, o
+    (conexión del hosting, '') si no se pudo usar el espejo.
+    """
+    desactualizado = _estado["modificaciones"] != _estado["sincronizadas"]
+    if (not _estado["listo"] or desactualizado) and not sincronizar(config):
+        return obtener_conexion_hosting(config), ""
+
+    conexion_local = conectar_local_sin_dialogo()
+    if conexion_local is None:
+        return obtener_conexion_hosting(config), ""
+    return conexion_local, PREFIJO_ESPEJO
+
+
+def _sincronizar_periodicamente():
+    while True:
+        sincronizar()
+        time.sleep(INTERVALO_SINCRONIZACION)
+
+
+def iniciar_sincronizacion():
+    """Arranca (una sola vez) el hilo que mantiene el espejo al día"""
+    global _hilo_sincronizacion
+    if _hilo_sincronizacion is None:
+        _hilo_sincronizacion = threading.Thread(
+            target=_sincronizar_periodicamente, name="espejo_catalogo", daemon=True
+        )
+        _hilo_sincronizacion.start()
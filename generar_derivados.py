@@ -0,0 +1,205 @@
+# generar_derivados.py - Genera offline las variantes (srcset) de assets/imagenes
+#
+# Recorre assets/imagenes/**, y por cada imagen genera tamaños thumb/medium/large
+# en WebP y en JPEG (fallback para navegadores sin WebP) dentro de
+# assets/derivados/. Escribe assets/derivados/manifest.json, que la API usa
+# para agregar 'imagen_srcset' a cada sub-sección.
+#
+# Uso: python generar_derivados.py [--workers N] [--forzar]
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from imagenes_variantes import PIL_DISPONIBLE, es_imagen, generar_variante
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARPETA_ORIGEN = os.path.join(BASE_DIR, 'assets', 'imagenes')
+CARPETA_DERIVADOS = os.path.join(BASE_DIR, 'assets', 'derivados')
+RUTA_MANIFIESTO = os.path.join(CARPETA_DERIVADOS, 'manifest.json')
+
+# nombre -> lado máximo en píxeles
+TAMANIOS = {
+    'thumb': 320,
+    'medium': 768,
+    'large': 1280,
+}
+FORMATOS_SALIDA = ('webp', 'jpeg')
+
+
+def ruta_relativa(ruta_absoluta):
+    """Ruta con el mismo formato que se guarda en la BD: assets/imagenes/..."""
+    return os.path.relpath(ruta_absoluta, BASE_DIR).replace(os.sep, '/')
+
+
+def hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def rutas_salida(origen):
+    """Rutas de todos los derivados de una imagen: {tamaño: {formato: ruta}}"""
+    relativa = os.path.relpath(origen, CARPETA_ORIGEN)
+    carpeta, archivo = os.path.split(relativa)
+    nombre, extension = os.path.splitext(archivo)
+    base = f"{nombre}_{extension.lstrip('.').lower()}"
+    return {
+        tamanio: {
+            formato: os.path.join(CARPETA_DERIVADOS, carpeta, f"{base}-{tamanio}.{'jpg' if formato == 'jpeg' else formato}")
+            for formato in FORMATOS_SALIDA
+        }
+        for tamanio in TAMANIOS
+    }
+
+
+def procesar_imagen(origen, hash_origen):
+    """
+    Genera todos los derivados de una imagen (se ejecuta en un proceso hijo).
+    Devuelve la entrada del manifiesto.
+    """
+    from PIL import Image
+
+    with Image.open(origen) as imagen:
+        ancho_original, alto_original = imagen.size
+
+    variantes = {}
+    for tamanio, formatos in rutas_salida(origen).items():
+        lado = TAMANIOS[tamanio]
+        entrada = {}
+        for formato, destino in formatos.items():
+            generar_variante(origen, destino, lado, lado, formato)
+            entrada[formato] = ruta_relativa(destino)
+        with Image.open(formatos['webp']) as variante:
+            entrada['ancho'], entrada['alto'] = variante.size
+        variantes[tamanio] = entrada
+        # No se agranda: los tamaños mayores serían copias de este
+        if lado >= max(ancho_original, alto_original):
+            break
+
+    info = os.stat(origen)
+    return {
+        'hash': hash_origen,
+        'tamanio_bytes': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'ancho': ancho_original,
+        'alto': alto_original,
+        'variantes': variantes,
+        'srcset': {
+            formato: ", ".join(f"{v[formato]} {v['ancho']}w" for v in variantes.values())
+            for formato in FORMATOS_SALIDA
+        },
+    }
+
+
+def cargar_manifiesto():
+    if os.path.exists(RUTA_MANIFIESTO):
+        try:
+            with open(RUTA_MANIFIESTO, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Manifiesto ilegible, se regenera todo: {e}")
+    return {'imagenes': {}}
+
+
+def guardar_manifiesto(manifiesto):
+    os.makedirs(CARPETA_DERIVADOS, exist_ok=True)
+    temporal = RUTA_MANIFIESTO + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temporal, RUTA_MANIFIESTO)
+
+
+def derivados_completos(entrada):
+    return all(
+        os.path.exists(os.path.join(BASE_DIR, variante[formato]))
+        for variante in entrada.get('variantes', {}).values()
+        for formato in FORMATOS_SALIDA
+    )
+
+
+def necesita_regenerar(origen, anterior, forzar):
+    """
+    Devuelve (regenerar, hash). Si tamaño y mtime no cambiaron no se hashea;
+    si cambiaron, se compara el contenido antes de decidir.
+    """
+    if forzar or not anterior or not derivados_completos(anterior):
+        return True, hash_archivo(origen)
+
+    info = os.stat(origen)
+    if anterior.get('tamanio_bytes') == info.st_size and anterior.get('mtime_ns') == info.st_mtime_ns:
+        return False, anterior['hash']
+
+    hash_origen = hash_archivo(origen)
+    return hash_origen != anterior.get('hash'), hash_origen
+
+
+def generar_derivados(workers=None, forzar=False):
+    if not PIL_DISPONIBLE:
+        print("[ERROR] Pillow no está instalado (pip install Pillow)")
+        return False
+
+    inicio = time.time()
+    manifiesto_anterior = cargar_manifiesto().get('imagenes', {})
+    imagenes = {}
+    pendientes = []
+
+    for carpeta, _, archivos in os.walk(CARPETA_ORIGEN):
+        for archivo in sorted(archivos):
+            origen = os.path.join(carpeta, archivo)
+            if not es_imagen(origen):
+                continue
+            clave = ruta_relativa(origen)
+            anterior = manifiesto_anterior.get(clave)
+            regenerar, hash_origen = necesita_regenerar(origen, anterior, forzar)
+            if regenerar:
+                pendientes.append((clave, origen, hash_origen))
+            else:
+                imagenes[clave] = dict(anterior, mtime_ns=os.stat(origen).st_mtime_ns)
+
+    print(f"[INFO] {len(imagenes)} imagen(es) sin cambios, {len(pendientes)} a procesar")
+
+    errores = 0
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = {pool.submit(procesar_imagen, origen, h): clave for clave, origen, h in pendientes}
+            for futuro in as_completed(futuros):
+                clave = futuros[futuro]
+                try:
+                    imagenes[clave] = futuro.result()
+                    print(f"[OK] {clave}")
+                except Exception as e:
+                    errores += 1
+                    print(f"[ERROR] {clave}: {e}")
+
+    # Borrar derivados de imágenes que ya no existen
+    for clave in set(manifiesto_anterior) - set(imagenes):
+        if os.path.exists(os.path.join(BASE_DIR, clave)):
+            continue  # falló en esta corrida; se conservan sus derivados
+        for tamanio in manifiesto_anterior[clave].get('variantes', {}).values():
+            for formato in FORMATOS_SALIDA:
+                ruta = os.path.join(BASE_DIR, tamanio.get(formato, ''))
+                if tamanio.get(formato) and os.path.exists(ruta):
+                    os.remove(ruta)
+        print(f"[INFO] Eliminados derivados de {clave}")
+
+    guardar_manifiesto({
+        'tamanios': TAMANIOS,
+        'generado': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'imagenes': imagenes,
+    })
+    print(f"[SUCCESS] Manifiesto con {len(imagenes)} imagen(es) en {time.time() - inicio:.1f}s ({errores} error(es))")
+    return errores == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera las variantes de assets/imagenes")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--forzar', action='store_true', help="Regenerar aunque no haya cambios")
+    args = parser.parse_args()
+    sys.exit(0 if generar_derivados(args.workers, args.forzar) else 1)
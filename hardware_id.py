@@ -2,12 +2,15 @@
 import uuid
 import hashlib
 import platform
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def obtener_hardware_id():
     """
     Obtiene un identificador único del hardware del equipo.
     Actualmente se basa en la dirección MAC, pero puede extenderse
     con CPU, Disco u otros identificadores si se necesita más seguridad.
+    Se calcula una sola vez por proceso.
     """
     try:
         # Dirección MAC
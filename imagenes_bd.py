@@ -0,0 +1,99 @@
+# imagenes_bd.py - Imágenes guardadas en la BD del hosting
+#
+# Las imágenes se guardan una sola vez en 'imagenes' (direccionadas por su
+# SHA-256) y cada registro del catálogo las referencia desde
+# 'imagenes_registros' por (tabla, id_registro, campo).
+#
+# Lo usan la administración (database_hosting.py) y la API (api.py); no
+# importa PyQt5 para que la API lo pueda usar en el hosting.
+import base64
+
+# tabla -> (clave primaria, {campo de imagen: columna *_base64 heredada})
+TABLAS_IMAGENES = {
+    'configuracion_app': ('id_config', {
+        'logo': 'logo_base64',
+        'icono_hamburguesa': 'icono_hamburguesa_base64',
+        'icono_cerrar': 'icono_cerrar_base64',
+        'hero_imagen': 'hero_imagen_base64',
+    }),
+    'regiones_zonas': ('id_region_zona', {'imagen_region_zona': 'imagen_region_zona_base64'}),
+    'usuarios': ('id_usuario', {'foto_usuario': 'foto_usuario_base64'}),
+    'secciones': ('id_seccion', {'icono_seccion': 'icono_seccion_base64'}),
+    'sub_secciones': ('id_sub_seccion', {
+        'imagen': 'imagen_base64',
+        'icono': 'icono_base64',
+        'foto1': 'foto1_base64',
+        'foto2': 'foto2_base64',
+        'foto3': 'foto3_base64',
+        'foto4': 'foto4_base64',
+    }),
+}
+
+
+def decodificar_data_uri(texto):
+    """
+    Convierte 'data:image/png;base64,....' (o base64 plano, en str o bytes)
+    en (mime, bytes). Devuelve None si está vacío o solo tiene la cabecera:
+    una columna *_base64 en blanco equivale a NULL.
+    """
+    if isinstance(texto, (bytes, bytearray)):
+        texto = texto.decode('utf-8')
+    texto = (texto or '').strip()
+    mime = 'image/jpeg'
+    if texto.startswith('data:'):
+        cabecera, _, texto = texto.partition(',')
+        mime = cabecera[5:].split(';')[0] or mime
+    datos = base64.b64decode(texto.strip())
+    return (mime, datos) if datos else None
+
+
+def _borrar_contenidos_sin_uso(cursor, hashes):
+    """Borra de 'imagenes' los contenidos de 'hashes' que ya no referencia ningún registro"""
+    if not hashes:
+        return 0
+    marcadores = ", ".join(["%s"] * len(hashes))
+    cursor.execute(f"""
+        DELETE i FROM imagenes i
+        LEFT JOIN imagenes_registros r ON r.hash = i.hash
+        WHERE r.hash IS NULL AND i.hash IN ({marcadores})
+    """, list(hashes))
+    return cursor.rowcount
+
+
+def borrar_imagenes_registro(cursor, tabla, id_registro):
+    """
+    Quita las imágenes de un registro que se borra, y los contenidos que
+    quedan sin usar. Va en la misma transacción que el DELETE del registro:
+    no hace commit. Devuelve la cantidad de contenidos borrados.
+    """
+    cursor.execute(
+        "SELECT DISTINCT hash FROM imagenes_registros WHERE tabla = %s AND id_registro = %s",
+        (tabla, id_registro)
+    )
+    hashes = [fila[0] for fila in cursor.fetchall()]
+    if not hashes:
+        return 0
+    cursor.execute(
+        "DELETE FROM imagenes_registros WHERE tabla = %s AND id_registro = %s", (tabla, id_registro)
+    )
+    return _borrar_contenidos_sin_uso(cursor, hashes)
+
+
+def limpiar_imagenes_huerfanas(cursor):
+    """
+    Quita las referencias a registros que ya no existen (borrados antes de
+    borrar_imagenes_registro o en cascada por una clave foránea) y los
+    contenidos sin usar. No hace commit. Devuelve la cantidad de contenidos borrados.
+    """
+    for tabla, (clave, _) in TABLAS_IMAGENES.items():
+        cursor.execute(f"""
+            DELETE r FROM imagenes_registros r
+            LEFT JOIN {tabla} t ON t.{clave} = r.id_registro
+            WHERE r.tabla = %s AND t.{clave} IS NULL
+        """, (tabla,))
+    cursor.execute("""
+        DELETE i FROM imagenes i
+        LEFT JOIN imagenes_registros r ON r.hash = i.hash
+        WHERE r.hash IS NULL
+    """)
+    return cursor.rowcount
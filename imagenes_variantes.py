@@ -0,0 +1,218 @@
+# imagenes_variantes.py - Variantes redimensionadas/recodificadas de las imágenes de assets
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+    PIL_DISPONIBLE = True
+except ImportError:  # Sin Pillow se sirven siempre los originales
+    PIL_DISPONIBLE = False
+
+FORMATOS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'jpg': ('JPEG', 'image/jpeg'),
+    'png': ('PNG', 'image/png'),
+}
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif')
+LADO_MAXIMO = 2000
+CALIDAD_POR_DEFECTO = 80
+
+# El endpoint es público: cualquier combinación de w/h/q crearía otra
+# variante en disco. Los lados se redondean hacia arriba a estos valores
+# (incluye thumb/medium/large de generar_derivados.py) y la calidad al
+# nivel más cercano, así hay un número acotado de variantes por imagen.
+LADOS_PERMITIDOS = (160, 320, 480, 768, 1024, 1280, 1600, LADO_MAXIMO)
+CALIDADES_PERMITIDAS = (50, 65, CALIDAD_POR_DEFECTO, 90)
+
+# Límites de la caché en disco (se limpia como máximo cada INTERVALO_LIMPIEZA)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+CACHE_MAX_EDAD = 30 * 24 * 3600
+INTERVALO_LIMPIEZA = 10 * 60
+INTERVALO_TOQUE = 24 * 3600  # un acierto renueva el mtime como mucho una vez por día
+
+
+def es_imagen(ruta):
+    return ruta.lower().endswith(EXTENSIONES_IMAGEN)
+
+
+def ajustar_lado(valor):
+    """Menor lado permitido que no es menor que 'valor' (None sigue siendo None)"""
+    if valor is None:
+        return None
+    return next((lado for lado in LADOS_PERMITIDOS if lado >= valor), LADO_MAXIMO)
+
+
+def ajustar_calidad(valor):
+    """Nivel de calidad permitido más cercano a 'valor'"""
+    if valor is None:
+        return CALIDAD_POR_DEFECTO
+    return min(CALIDADES_PERMITIDAS, key=lambda c: (abs(c - valor), c))
+
+
+def normalizar_formato(formato):
+    """'jpg' y 'jpeg' son la misma variante"""
+    return 'jpeg' if formato == 'jpg' else formato
+
+
+def generar_variante(origen, destino, ancho=None, alto=None, formato='webp', calidad=CALIDAD_POR_DEFECTO):
+    """
+    Genera en 'destino' una copia de 'origen' que entra en ancho x alto
+    (manteniendo la proporción, sin agrandar) codificada en 'formato'.
+    La escritura es atómica: otro proceso nunca ve un archivo a medio escribir.
+    """
+    formato_pil = FORMATOS[formato][0]
+    with Image.open(origen) as imagen:
+        imagen = ImageOps.exif_transpose(imagen)
+        if ancho or alto:
+            imagen.thumbnail((ancho or LADO_MAXIMO, alto or LADO_MAXIMO), Image.LANCZOS)
+
+        if formato_pil == 'JPEG' and imagen.mode not in ('RGB', 'L'):
+            imagen = imagen.convert('RGB')
+        elif imagen.mode == 'P':
+            imagen = imagen.convert('RGBA')
+
+        opciones = {}
+        if formato_pil in ('WEBP', 'JPEG'):
+            opciones['quality'] = calidad
+        if formato_pil == 'WEBP':
+            opciones['method'] = 4
+        elif formato_pil == 'JPEG':
+            opciones['optimize'] = True
+            opciones['progressive'] = True
+        elif formato_pil == 'PNG':
+            opciones['optimize'] = True
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            imagen.save(temporal, formato_pil, **opciones)
+            os.replace(temporal, destino)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+    return destino
+
+
+class GeneradorVariantes:
+    """
+    Genera variantes bajo demanda con un pool de hilos acotado y una caché
+    en disco. Si llegan varias peticiones por la misma variante mientras se
+    codifica, todas esperan el mismo trabajo (se codifica una sola vez).
+    La caché se limpia por edad y por tamaño total (se borran primero las
+    variantes usadas hace más tiempo, según su mtime).
+    """
+
+    def __init__(self, carpeta_cache, max_workers=2, max_bytes=CACHE_MAX_BYTES, max_edad=CACHE_MAX_EDAD):
+        self.carpeta_cache = carpeta_cache
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="variantes")
+        self.en_curso = {}
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.max_edad = max_edad
+        self.ultima_limpieza = 0.0
+
+    def ruta_variante(self, origen, ancho, alto, formato, calidad):
+        """Ruta en caché; cambia si cambia el archivo original (mtime/tamaño)"""
+        info = os.stat(origen)
+        clave = f"{origen}|{info.st_mtime_ns}|{info.st_size}|{ancho}|{alto}|{formato}|{calidad}"
+        nombre = hashlib.sha1(clave.encode('utf-8')).hexdigest()
+        return os.path.join(self.carpeta_cache, nombre[:2], f"{nombre}.{formato}")
+
+    def obtener(self, origen, ancho=None, alto=None, formato='webp', calidad=CALIDAD_POR_DEFECTO, timeout=30):
+        """Devuelve la ruta de la variante, generándola si no está en disco"""
+        destino = self.ruta_variante(origen, ancho, alto, formato, calidad)
+        try:
+            info = os.stat(destino)
+            if time.time() - info.st_mtime > INTERVALO_TOQUE:
+                os.utime(destino)  # marca de uso para la limpieza
+            return destino
+        except OSError:
+            pass
+
+        with self.lock:
+            futuro = self.en_curso.get(destino)
+            if futuro is None:
+                futuro = self.pool.submit(generar_variante, origen, destino, ancho, alto, formato, calidad)
+                self.en_curso[destino] = futuro
+                futuro.add_done_callback(lambda _f, d=destino: self._terminar(d))
+        return futuro.result(timeout=timeout)
+
+    def _terminar(self, destino):
+        with self.lock:
+            self.en_curso.pop(destino, None)
+            if time.monotonic() - self.ultima_limpieza < INTERVALO_LIMPIEZA:
+                return
+            self.ultima_limpieza = time.monotonic()
+        self.pool.submit(self.limpiar)
+
+    def limpiar(self):
+        """Borra las variantes más viejas que max_edad y, si sigue sobrando, las menos usadas"""
+        archivos = []
+        for raiz, _, nombres in os.walk(self.carpeta_cache):
+            for nombre in nombres:
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    info = os.stat(ruta)
+                except OSError:
+                    continue
+                archivos.append((info.st_mtime, info.st_size, ruta))
+
+        limite_edad = time.time() - self.max_edad
+        total = sum(tamanio for _, tamanio, _ in archivos)
+        borrados = 0
+        for mtime, tamanio, ruta in sorted(archivos):
+            if mtime >= limite_edad and total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)  # otro worker puede haberlo borrado ya
+                borrados += 1
+            except OSError:
+                pass
+            total -= tamanio
+        if borrados:
+            print(f"🧹 Caché de variantes: {borrados} archivo(s) borrado(s), {total / 1024 / 1024:.0f} MB en uso")
+
+
+class ManifiestoDerivados:
+    """
+    Lee el manifest.json que genera generar_derivados.py y lo recarga cuando
+    cambia en disco (se revisa como máximo cada 'intervalo' segundos).
+    """
+
+    def __init__(self, ruta, intervalo=30):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.imagenes = {}
+        self.firma = None
+        self.revisado = 0.0
+        self.lock = threading.Lock()
+
+    def actualizar(self):
+        ahora = time.monotonic()
+        if ahora - self.revisado < self.intervalo:
+            return
+        with self.lock:
+            self.revisado = ahora
+            try:
+                firma = os.stat(self.ruta).st_mtime_ns
+            except OSError:
+                self.imagenes, self.firma = {}, None
+                return
+            if firma == self.firma:
+                return
+            try:
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    self.imagenes = json.load(f).get('imagenes', {})
+                self.firma = firma
+            except (OSError, ValueError) as e:
+                print(f"⚠️ No se pudo leer {self.ruta}: {e}")
+
+    def srcset(self, ruta_relativa):
+        """{'webp': '...', 'jpeg': '...'} para una ruta assets/imagenes/..., o None"""
+        entrada = self.imagenes.get(ruta_relativa) if ruta_relativa else None
+        return entrada['srcset'] if entrada else None
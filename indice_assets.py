@@ -0,0 +1,266 @@
+# indice_assets.py - Índice de assets del proyecto (nombre de archivo -> rutas)
+#
+# Resolver una ruta guardada en la BD probaba una docena de carpetas
+# candidatas con os.path.exists y, si fallaban todas, recorría el proyecto
+# entero con os.walk (node_modules incluido). Acá el recorrido se hace una
+# sola vez, en un hilo de fondo, y después cada búsqueda es una consulta a
+# un diccionario. QFileSystemWatcher avisa cuando cambia una carpeta indexada
+# y solo esa carpeta se vuelve a leer.
+#
+# Mientras el índice se está construyendo (o si no se inició), las búsquedas
+# responden con os.path.exists sobre la ruta preferida, como antes.
+#
+# El índice del almacén por contenido (contenido/indice.json: rutas viejas ->
+# archivo del almacén) también se guarda en memoria: se lee al construir y se
+# actualiza cuando almacen_assets lo escribe o el watcher ve que cambió.
+import os
+import threading
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, pyqtSignal
+
+from almacen_assets import (
+    CARPETA_PUBLIC, NOMBRE_INDICE, al_registrar_en_indice, carpeta_almacen, cargar_indice, ruta_logica,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKEND_DIR, "..", ".."))
+
+# Carpetas que nunca contienen assets de la app (o que son enormes)
+CARPETAS_EXCLUIDAS = {
+    "node_modules", ".git", "__pycache__", "venv", ".venv",
+    "cache_miniaturas", "cache_variantes", ".pytest_cache", ".mypy_cache",
+}
+
+
+def raices_indice():
+    """Carpetas a indexar: el backend, el public/ del proyecto y, si existe, el frontend"""
+    raices = [BACKEND_DIR, os.path.join(PROJECT_ROOT, "frontend"), CARPETA_PUBLIC]
+    vistas = []
+    for raiz in raices:
+        raiz = os.path.normpath(raiz)
+        if os.path.isdir(raiz) and not any(raiz == v or raiz.startswith(v + os.sep) for v in vistas):
+            vistas.append(raiz)
+    return vistas
+
+
+def normalizar_relativa(ruta):
+    """'/public/assets/x.png' o '\\assets\\x.png' -> 'assets/x.png'"""
+    r = ruta.replace("\\", "/").strip().lstrip("/")
+    if r.startswith("public/"):
+        r = r[len("public/"):]
+    return r
+
+
+def listar_carpeta(carpeta):
+    """(archivos, subcarpetas) directos de 'carpeta'; vacío si no se puede leer"""
+    archivos, subcarpetas = set(), set()
+    try:
+        with os.scandir(carpeta) as entradas:
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        if entrada.name not in CARPETAS_EXCLUIDAS:
+                            subcarpetas.add(entrada.name)
+                    elif entrada.is_file():
+                        archivos.add(entrada.name)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return archivos, subcarpetas
+
+
+class SenalesIndice(QObject):
+    construido = pyqtSignal(list)
+
+
+class IndiceAssets:
+    """
+    Índice en memoria: nombre de archivo -> rutas absolutas, y carpeta ->
+    archivos. Se puede consultar desde cualquier hilo.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.por_nombre = {}     # basename -> [ruta absoluta]
+        self.carpetas = {}       # carpeta -> (archivos, subcarpetas)
+        self.raices = []
+        self.carpeta_almacen = os.path.normpath(os.path.abspath(carpeta_almacen()))
+        self.almacen = {}        # ruta lógica vieja -> nombre en el almacén
+        self.listo = False
+        self.iniciado = False
+        self.watcher = None
+        self.senales = None
+
+    # ---------- construcción ----------
+    def iniciar(self):
+        """Construye el índice en segundo plano y lo mantiene al día (llamar desde el hilo de Qt)"""
+        if self.iniciado:
+            return
+        self.iniciado = True
+        self.senales = SenalesIndice()
+        self.senales.construido.connect(self._vigilar)
+        al_registrar_en_indice(self._almacen_registrado)
+        threading.Thread(target=self._construir, name="indice_assets", daemon=True).start()
+
+    def _recorrer(self, raiz, carpetas):
+        pendientes = [raiz]
+        while pendientes:
+            carpeta = pendientes.pop()
+            if carpeta in carpetas:
+                continue
+            archivos, subcarpetas = listar_carpeta(carpeta)
+            carpetas[carpeta] = (archivos, subcarpetas)
+            pendientes.extend(os.path.join(carpeta, s) for s in subcarpetas)
+
+    def _construir(self):
+        carpetas = {}
+        raices = raices_indice()
+        for raiz in raices:
+            self._recorrer(raiz, carpetas)
+
+        por_nombre = {}
+        for carpeta, (archivos, _) in carpetas.items():
+            for nombre in archivos:
+                por_nombre.setdefault(nombre, []).append(os.path.join(carpeta, nombre))
+
+        almacen = cargar_indice()
+        with self.lock:
+            self.carpetas = carpetas
+            self.por_nombre = por_nombre
+            self.raices = raices
+            self.almacen = almacen
+            self.listo = True
+        total = sum(len(r) for r in por_nombre.values())
+        print(f"[ASSETS] Índice construido: {total} archivo(s) en {len(carpetas)} carpeta(s)")
+        self.senales.construido.emit(list(carpetas))
+
+    # ---------- actualización ----------
+    def _vigilar(self, carpetas):
+        self.watcher = QFileSystemWatcher()
+        self.watcher.directoryChanged.connect(self._carpeta_cambiada)
+        if carpetas:
+            self.watcher.addPaths(carpetas)
+
+    def _quitar_carpeta(self, carpeta):
+        """Saca del índice 'carpeta' y todo lo que cuelga de ella (lock tomado)"""
+        prefijo = carpeta + os.sep
+        for c in [c for c in self.carpetas if c == carpeta or c.startswith(prefijo)]:
+            archivos, _ = self.carpetas.pop(c)
+            for nombre in archivos:
+                self._quitar_ruta(nombre, os.path.join(c, nombre))
+
+    def _quitar_ruta(self, nombre, ruta):
+        rutas = self.por_nombre.get(nombre)
+        if rutas and ruta in rutas:
+            rutas.remove(ruta)
+            if not rutas:
+                del self.por_nombre[nombre]
+
+    def _carpeta_cambiada(self, carpeta):
+        """Relee solo la carpeta que cambió (y las subcarpetas nuevas)"""
+        nuevas = {}
+        with self.lock:
+            if not os.path.isdir(carpeta):
+                self._quitar_carpeta(carpeta)
+                return
+            anteriores, subcarpetas_anteriores = self.carpetas.get(carpeta, (set(), set()))
+            archivos, subcarpetas = listar_carpeta(carpeta)
+            self.carpetas[carpeta] = (archivos, subcarpetas)
+
+            if carpeta == self.carpeta_almacen and NOMBRE_INDICE in archivos:
+                self.almacen = cargar_indice()  # cambió contenido/ (quizás indice.json)
+            for nombre in anteriores - archivos:
+                self._quitar_ruta(nombre, os.path.join(carpeta, nombre))
+            for nombre in archivos - anteriores:
+                self.por_nombre.setdefault(nombre, []).append(os.path.join(carpeta, nombre))
+
+            for sub in subcarpetas_anteriores - subcarpetas:
+                self._quitar_carpeta(os.path.join(carpeta, sub))
+            for sub in subcarpetas - subcarpetas_anteriores:
+                self._recorrer(os.path.join(carpeta, sub), nuevas)
+            for c, (archivos_c, subcarpetas_c) in nuevas.items():
+                self.carpetas[c] = (archivos_c, subcarpetas_c)
+                for nombre in archivos_c:
+                    self.por_nombre.setdefault(nombre, []).append(os.path.join(c, nombre))
+
+        if nuevas and self.watcher is not None:
+            self.watcher.addPaths(list(nuevas))
+
+    def _almacen_registrado(self, indice, carpeta):
+        """almacen_assets escribió indice.json (puede llamarse desde cualquier hilo)"""
+        if os.path.normpath(os.path.abspath(carpeta)) == self.carpeta_almacen:
+            with self.lock:
+                self.almacen = dict(indice)
+
+    # ---------- consultas ----------
+    def indexada(self, ruta):
+        """True si 'ruta' (absoluta y normalizada) cae dentro de una carpeta indexada"""
+        return any(ruta.startswith(raiz + os.sep) for raiz in self.raices)
+
+    def existe(self, ruta):
+        """
+        Como os.path.exists para archivos, pero contra el índice si está listo
+        y la ruta cae dentro de lo indexado (fuera de eso, consulta el disco).
+        """
+        if not ruta:
+            return False
+        ruta = os.path.normpath(os.path.abspath(ruta))
+        if not self.listo or not self.indexada(ruta):
+            return os.path.exists(ruta)
+        if CARPETAS_EXCLUIDAS.intersection(ruta.split(os.sep)):
+            return os.path.exists(ruta)  # carpeta que el índice no recorre
+        with self.lock:
+            return ruta in self.por_nombre.get(os.path.basename(ruta), ())
+
+    def buscar(self, ruta_relativa):
+        """
+        Ruta absoluta de un archivo indexado cuya ruta termina en
+        'ruta_relativa' (p. ej. 'assets/iconos/menu.png'); None si no está o
+        si el índice todavía no está listo.
+        """
+        if not ruta_relativa or not self.listo:
+            return None
+        relativa = normalizar_relativa(ruta_relativa)
+        sufijo = os.sep + os.path.normpath(relativa)
+        with self.lock:
+            rutas = list(self.por_nombre.get(os.path.basename(relativa), ()))
+        for ruta in rutas:
+            if ruta.endswith(sufijo):
+                return ruta
+        return None
+
+    def buscar_en_almacen(self, ruta_relativa):
+        """Ruta en el almacén por contenido de una ruta vieja reemplazada, o None"""
+        if not ruta_relativa or not self.listo:
+            return None
+        with self.lock:
+            nombre = self.almacen.get(ruta_logica(ruta_relativa))
+        if not nombre:
+            return None
+        ruta = os.path.join(self.carpeta_almacen, nombre)
+        # Solo llega acá una ruta reemplazada: se consulta el disco porque el
+        # watcher puede no haber visto todavía un archivo recién guardado
+        return ruta if self.existe(ruta) or os.path.exists(ruta) else None
+
+    def resolver(self, ruta_relativa, preferida=None):
+        """
+        Ruta absoluta existente para 'ruta_relativa': 'preferida' si existe,
+        si no la que encuentre el índice y, para rutas viejas que la
+        deduplicación movió, la del almacén por contenido. None si no hay ninguna.
+        """
+        if preferida and self.existe(preferida):
+            return os.path.normpath(preferida)
+        return self.buscar(ruta_relativa) or self.buscar_en_almacen(ruta_relativa)
+
+
+_indice = IndiceAssets()
+
+
+def indice_assets():
+    return _indice
+
+
+def iniciar_indice_assets():
+    """Arranca (una sola vez) la construcción del índice; llamar desde el hilo de Qt"""
+    _indice.iniciar()
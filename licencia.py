@@ -1,19 +1,84 @@
 # -*- coding: utf-8 -*-
 # src/backend/licencia.py
+import json
+import os
 from datetime import datetime, timedelta
+from cryptography.fernet import InvalidToken
 from database_local import conectar_local  # ← CAMBIADO: usar conexión local
 from hardware_id import obtener_hardware_id
 from seguridad import fernet  # ✅ usamos el fernet central
 import bcrypt
 
+# Resultado de la última validación, cifrado y firmado con el fernet central:
+# si se edita a mano, no descifra y se vuelve a validar contra la BD local.
+# Vale solo por el día en que se validó.
+ARCHIVO_CACHE_LICENCIA = os.path.join(os.path.dirname(__file__), ".licencia_cache")
+VIGENCIA_CACHE_SEGUNDOS = 24 * 60 * 60
+
+
+def leer_cache_licencia():
+    """Fecha de expiración validada hoy para este equipo, o None"""
+    try:
+        with open(ARCHIVO_CACHE_LICENCIA, "rb") as f:
+            datos = json.loads(fernet.decrypt(f.read(), ttl=VIGENCIA_CACHE_SEGUNDOS))
+        if datos.get("dia") != datetime.now().date().isoformat():
+            return None  # cambió el día: se vuelve a validar
+        if datos.get("hardware_id") != obtener_hardware_id():
+            return None
+        return datetime.strptime(datos["fecha_expiracion"], "%Y-%m-%d").date()
+    except (OSError, ValueError, KeyError, InvalidToken):
+        return None
+
+
+def guardar_cache_licencia(fecha_exp):
+    datos = {
+        "dia": datetime.now().date().isoformat(),
+        "hardware_id": obtener_hardware_id(),
+        "fecha_expiracion": fecha_exp.isoformat(),
+    }
+    temporal = ARCHIVO_CACHE_LICENCIA + ".tmp"
+    try:
+        with open(temporal, "wb") as f:
+            f.write(fernet.encrypt(json.dumps(datos).encode()))
+        os.replace(temporal, ARCHIVO_CACHE_LICENCIA)
+    except OSError as e:
+        print(f"[WARN] No se pudo guardar la caché de licencia: {e}")
+
+
+def borrar_cache_licencia():
+    LicenciaManager._validacion_sesion = None
+    try:
+        os.remove(ARCHIVO_CACHE_LICENCIA)
+    except OSError:
+        pass
+
+
+def mensaje_licencia(fecha_exp):
+    hoy = datetime.now().date()
+    if hoy > fecha_exp:
+        return False, f"La licencia expiró el {fecha_exp}."
+
+    dias = (fecha_exp - hoy).days
+    if 0 <= dias <= 10:
+        return True, f"La licencia vencerá el {fecha_exp}. Quedan {dias} día(s)."
+    return True, f"Licencia válida hasta {fecha_exp}"
+
 class LicenciaManager:
     # Si querés exigir una "clave maestra" para extender:
     CLAVE_PREDEFINIDA_HASH = "$2b$12$0Y.cJPYfkc451kfRnpxwD.sKGrdnAd5tcWT36vboeCnzYMl.79r2K"
 
+    # (día, fecha de expiración) de la última validación correcta en esta sesión
+    _validacion_sesion = None
+    _tabla_creada = False
+
     def __init__(self):
-        self.crear_tabla()
+        # La tabla se crea recién cuando hace falta ir a la BD local: con la
+        # validación en caché el arranque no abre ninguna conexión
+        pass
 
     def crear_tabla(self):
+        if LicenciaManager._tabla_creada:
+            return
         cn = conectar_local()  # ← CAMBIADO: conectar a DB local
         if not cn:
             return
@@ -31,8 +96,10 @@ class LicenciaManager:
         cn.commit()
         cur.close()
         cn.close()
+        LicenciaManager._tabla_creada = True
 
     def activar_licencia(self, serial, clave=None, fecha_exp_manual=None, dias_validez=365, hardware_id=None):
+        self.crear_tabla()
         cn = conectar_local()  # ← CAMBIADO: conectar a DB local
         if not cn:
             return False, "No se pudo conectar a la base de datos local."
@@ -66,12 +133,40 @@ class LicenciaManager:
 
         cn.commit()
         cur.close(); cn.close()
+        borrar_cache_licencia()
         return True, f"Licencia activada hasta {fecha_exp}"
 
     def validar_licencia(self):
+        """
+        Valida la licencia una vez por día: en memoria durante la sesión y en
+        el archivo de caché entre aperturas. Solo si cambió el día (o no hay
+        caché válida) se consulta la BD local.
+        """
+        hoy = datetime.now().date()
+        if LicenciaManager._validacion_sesion and LicenciaManager._validacion_sesion[0] == hoy:
+            return mensaje_licencia(LicenciaManager._validacion_sesion[1])
+
+        fecha_exp = leer_cache_licencia()
+        if fecha_exp is not None:
+            ok, mensaje = mensaje_licencia(fecha_exp)
+            if ok:
+                LicenciaManager._validacion_sesion = (hoy, fecha_exp)
+                return ok, mensaje
+
+        ok, mensaje, fecha_exp = self.validar_licencia_en_bd()
+        if ok:
+            LicenciaManager._validacion_sesion = (hoy, fecha_exp)
+            guardar_cache_licencia(fecha_exp)
+        else:
+            borrar_cache_licencia()
+        return ok, mensaje
+
+    def validar_licencia_en_bd(self):
+        """Devuelve (ok, mensaje, fecha de expiración o None)"""
+        self.crear_tabla()
         cn = conectar_local()  # ← CAMBIADO: conectar a DB local
         if not cn:
-            return False, "No se pudo conectar a la base de datos local."
+            return False, "No se pudo conectar a la base de datos local.", None
 
         cur = cn.cursor()
         cur.execute("SELECT serial, clave, fecha_expiracion, hardware_id FROM licencia LIMIT 1")
@@ -79,14 +174,14 @@ class LicenciaManager:
         cur.close(); cn.close()
 
         if not row:
-            return False, "Debe activar la licencia."
+            return False, "Debe activar la licencia.", None
 
         serial, _, fecha_exp_enc, hw_guardado = row
 
         # Validar hardware
         hw_actual = obtener_hardware_id()
         if hw_guardado != hw_actual:
-            return False, "La licencia no corresponde a este equipo."
+            return False, "La licencia no corresponde a este equipo.", None
 
         # Desencriptar y parsear fecha
         try:
@@ -95,16 +190,10 @@ class LicenciaManager:
             fecha_str = fernet.decrypt(fecha_exp_enc.encode()).decode()
             fecha_exp = datetime.strptime(fecha_str, "%Y-%m-%d").date()
         except Exception as e:
-            return False, f"La licencia tiene un formato de fecha inválido. ({e})"
+            return False, f"La licencia tiene un formato de fecha inválido. ({e})", None
 
-        hoy = datetime.now().date()
-        if hoy > fecha_exp:
-            return False, f"La licencia expiró el {fecha_exp}."
-
-        dias = (fecha_exp - hoy).days
-        if 0 <= dias <= 10:
-            return True, f"La licencia vencerá el {fecha_exp}. Quedan {dias} día(s)."
-        return True, f"Licencia válida hasta {fecha_exp}"
+        ok, mensaje = mensaje_licencia(fecha_exp)
+        return ok, mensaje, fecha_exp
 
     def extender_licencia(self, nueva_fecha, serial, clave):
         # Validaciones de formato/fecha
@@ -115,6 +204,7 @@ class LicenciaManager:
         if fecha_dt <= datetime.now().date():
             return False, "La nueva fecha debe ser posterior a hoy."
 
+        self.crear_tabla()
         cn = conectar_local()  # ← CAMBIADO: conectar a DB local
         if not cn:
             return False, "No se pudo conectar a la base de datos local."
@@ -143,4 +233,5 @@ class LicenciaManager:
         cur.execute("UPDATE licencia SET fecha_expiracion=%s WHERE serial=%s", (fecha_enc, serial))
         cn.commit()
         cur.close(); cn.close()
+        borrar_cache_licencia()
         return True, f"Licencia extendida hasta {nueva_fecha}"
\ No newline at end of file
@@ -1,22 +1,89 @@
 # -*- coding: utf-8 -*-
 from PyQt5.QtWidgets import QApplication, QMessageBox
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
 from ventana_principal import VentanaPrincipal
 from ventana_licencia import VentanaLicencia
-from database_local import inicializar_base_datos_local  # ← SOLO local
-from database_hosting import inicializar_base_datos_hosting  # ← NUEVO: solo inicialización
+from database_local import obtener_configuracion_hosting  # ← SOLO local
+from database_hosting import inicializar_base_datos_hosting, cerrar_pool_hosting  # ← NUEVO: solo inicialización
 from licencia import LicenciaManager
+from espejo_catalogo import iniciar_sincronizacion
+from indice_assets import iniciar_indice_assets
 import sys
 
 
+class HiloInicioHosting(QThread):
+    """Inicializa/verifica el esquema del hosting sin frenar el arranque"""
+    terminado = pyqtSignal(bool)
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+
+    def run(self):
+        self.terminado.emit(inicializar_base_datos_hosting(config=self.config))
+
+
+def error_hosting():
+    QMessageBox.critical(None, "Error de Hosting", 
+                       "No se pudo inicializar la base de datos del hosting.\n"
+                       "Verifique:\n"
+                       "- MySQL local esté disponible (guarda los datos del hosting)\n"
+                       "- La configuración en 'datos_hosting' sea correcta\n"
+                       "- Su conexión a internet esté activa\n"
+                       "- El servidor hosting esté disponible")
+
+
+estado_inicio = {"fallo_hosting": False}
+
+# La validación de la licencia queda en caché por día: el timer solo vuelve
+# a la BD local cuando cambia la fecha
+INTERVALO_REVISION_LICENCIA_MS = 10 * 60 * 1000
+
+
+def revisar_licencia(manager):
+    ok, mensaje = manager.validar_licencia()
+    if not ok:
+        QMessageBox.critical(None, "Licencia", mensaje)
+        QApplication.instance().exit(1)
+
+
+def al_terminar_inicio_hosting(ok):
+    if ok:
+        print("[SUCCESS] Base de datos del hosting inicializada correctamente")
+        # Espejo local del catálogo: se mantiene al día en segundo plano
+        iniciar_sincronizacion()
+    else:
+        estado_inicio["fallo_hosting"] = True
+        error_hosting()
+        QApplication.instance().exit(1)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
 
-    # 1) Inicializa SOLO base de datos LOCAL (licencia + datos_hosting)
-    if not inicializar_base_datos_local():  # ← Esto ahora puede mostrar diálogos
-        QMessageBox.critical(None, "Error", "No se pudo inicializar la base de datos local")
+    # Índice de assets (iconos, imágenes): se arma en segundo plano
+    iniciar_indice_assets()
+
+    # 1) Configuración del hosting: sus credenciales están en la BD local, que
+    #    se abre una sola vez acá (puede mostrar el diálogo de configuración).
+    #    La licencia no vuelve a la BD local si su caché del día es válida.
+    config_hosting = obtener_configuracion_hosting()
+    if not config_hosting:
+        error_hosting()
         sys.exit(1)
 
-    # 2) Valida licencia (usa DB local)
+    # 2) La inicialización del hosting corre en paralelo con la licencia y
+    #    la apertura de la ventana principal
+    print("Inicializando base de datos del hosting...")
+    hilo_hosting = HiloInicioHosting(config_hosting)
+    hilo_hosting.terminado.connect(al_terminar_inicio_hosting)
+    hilo_hosting.start()
+
+    def salir(codigo):
+        hilo_hosting.wait()  # no destruir el hilo mientras corre
+        sys.exit(codigo)
+
+    # 3) Valida licencia (caché del día; si no, DB local)
     manager = LicenciaManager()
     ok, mensaje = manager.validar_licencia()
 
@@ -24,32 +91,29 @@ if __name__ == "__main__":
         QMessageBox.critical(None, "Licencia", mensaje)
         dlg = VentanaLicencia(modo="activar")
         if dlg.exec_() == 0:  # canceló
-            sys.exit(1)
+            salir(1)
         # Revalidar después de cerrar la ventana de licencia
         ok, mensaje = manager.validar_licencia()
         if not ok:
             QMessageBox.critical(None, "Licencia", mensaje)
-            sys.exit(1)
+            salir(1)
     else:
         if "vencerá" in mensaje:
             QMessageBox.information(None, "Aviso de licencia", mensaje)
 
-    # 3) INICIALIZAR BASE DE DATOS DEL HOSTING (automáticamente obtiene configuración)
-    print("Inicializando base de datos del hosting...")
-    if not inicializar_base_datos_hosting():
-        QMessageBox.critical(None, "Error de Hosting", 
-                           "No se pudo inicializar la base de datos del hosting.\n"
-                           "Verifique:\n"
-                           "- La configuración en 'datos_hosting' sea correcta\n"
-                           "- Su conexión a internet esté activa\n"
-                           "- El servidor hosting esté disponible")
-        sys.exit(1)
-    else:
-        print("[SUCCESS] Base de datos del hosting inicializada correctamente")
+    if estado_inicio["fallo_hosting"]:
+        salir(1)
 
-    # 4) Abrir principal
+    # 4) Abrir principal (la configuración de la app se carga en segundo plano)
     ventana_principal = VentanaPrincipal()
     ventana_principal.show()
+
+    timer_licencia = QTimer()
+    timer_licencia.timeout.connect(lambda: revisar_licencia(manager))
+    timer_licencia.start(INTERVALO_REVISION_LICENCIA_MS)
     
     print("[SUCCESS] Aplicación iniciada correctamente")
-    sys.exit(app.exec())
\ No newline at end of file
+    codigo = app.exec()
+    hilo_hosting.wait()
+    cerrar_pool_hosting()
+    sys.exit(codigo)
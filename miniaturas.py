@@ -0,0 +1,190 @@
+# miniaturas.py - Miniaturas de imágenes decodificadas fuera del hilo de la interfaz
+#
+# QPixmap(ruta).scaled(...) decodifica la imagen completa en el hilo de Qt.
+# Acá la decodificación se hace en hilos de trabajo con QImageReader y
+# setScaledSize (el JPEG se decodifica directamente al tamaño pedido), y el
+# resultado se guarda:
+#   - en memoria, en QPixmapCache (acotado)
+#   - en disco, en cache_miniaturas/, para no volver a decodificar al reabrir
+# La clave incluye ruta, mtime, tamaño del archivo y tamaño pedido: si la
+# imagen cambia, la miniatura vieja simplemente deja de usarse.
+import hashlib
+import os
+import threading
+import weakref
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QRunnable, QSize, QThreadPool, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+
+CARPETA_MINIATURAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_miniaturas")
+CACHE_MEMORIA_KB = 32 * 1024
+HILOS_MINIATURAS = 2
+
+
+def clave_miniatura(ruta, ancho, alto):
+    """Clave de caché; None si el archivo no existe"""
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        return None
+    return f"{os.path.abspath(ruta)}|{info.st_mtime_ns}|{info.st_size}|{ancho or 0}x{alto or 0}"
+
+
+def ruta_en_disco(clave):
+    nombre = hashlib.sha1(clave.encode("utf-8")).hexdigest()
+    return os.path.join(CARPETA_MINIATURAS, nombre[:2], f"{nombre}.png")
+
+
+def leer_miniatura(ruta, ancho=None, alto=None):
+    """Decodifica 'ruta' ya escalada para que entre en ancho x alto (QImage, nula si falla)"""
+    lector = QImageReader(ruta)
+    lector.setAutoTransform(True)
+    original = lector.size()
+    if ancho and alto and original.isValid():
+        destino = original.scaled(QSize(ancho, alto), Qt.KeepAspectRatio)
+        if destino.width() < original.width():
+            lector.setScaledSize(destino)
+        return lector.read()
+
+    imagen = lector.read()
+    if ancho and alto and not imagen.isNull():
+        # El formato no informa su tamaño de antemano: se escala después
+        imagen = imagen.scaled(ancho, alto, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return imagen
+
+
+class SenalesMiniatura(QObject):
+    lista = pyqtSignal(str, QImage)
+
+
+class TareaMiniatura(QRunnable):
+    def __init__(self, clave, ruta, ancho, alto, senales):
+        super().__init__()
+        self.clave = clave
+        self.ruta = ruta
+        self.ancho = ancho
+        self.alto = alto
+        self.senales = senales
+
+    def run(self):
+        en_disco = ruta_en_disco(self.clave)
+        imagen = QImage(en_disco) if os.path.exists(en_disco) else QImage()
+        if imagen.isNull():
+            imagen = leer_miniatura(self.ruta, self.ancho, self.alto)
+            if not imagen.isNull() and self.ancho and self.alto:
+                self.guardar_en_disco(imagen, en_disco)
+        self.senales.lista.emit(self.clave, imagen)
+
+    @staticmethod
+    def guardar_en_disco(imagen, destino):
+        try:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            temporal = f"{destino}.{threading.get_ident()}.tmp"
+            if imagen.save(temporal, "PNG"):
+                os.replace(temporal, destino)
+            elif os.path.exists(temporal):
+                os.remove(temporal)
+        except OSError as e:
+            print(f"[WARN] No se pudo guardar la miniatura: {e}")
+
+
+class ServicioMiniaturas(QObject):
+    """
+    Entrega miniaturas desde memoria en el acto, o las decodifica en segundo
+    plano y avisa al terminar. Varios pedidos de la misma miniatura comparten
+    una sola decodificación.
+    """
+
+    def __init__(self):
+        super().__init__()
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), CACHE_MEMORIA_KB))
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(HILOS_MINIATURAS)
+        self.senales = SenalesMiniatura()
+        self.senales.lista.connect(self._al_terminar)
+        self.pendientes = {}  # clave -> [al_terminar]
+        self.fallidas = set()
+        self.pedidos_label = weakref.WeakKeyDictionary()  # label -> último pedido
+
+    def obtener(self, ruta, size, al_terminar):
+        """
+        Devuelve el QPixmap si ya está en memoria. Si no, devuelve None y
+        decodifica en segundo plano; al terminar llama al_terminar(pixmap)
+        (pixmap None si no se pudo leer). Sin archivo, devuelve None sin pedir nada.
+        """
+        ancho, alto = size if size else (None, None)
+        clave = clave_miniatura(ruta, ancho, alto) if ruta else None
+        return self.obtener_clave(clave, ruta, ancho, alto, al_terminar)
+
+    def obtener_clave(self, clave, ruta, ancho, alto, al_terminar=None):
+        """
+        Como obtener(), con la clave ya calculada (clave_miniatura hace un
+        os.stat). Con al_terminar None no se registra aviso: sirve para
+        volver a consultar una miniatura que ya se pidió.
+        """
+        if not clave:
+            return None
+
+        pixmap = QPixmapCache.find(clave)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if clave in self.fallidas:
+            return None
+
+        if clave in self.pendientes:
+            if al_terminar is not None:
+                self.pendientes[clave].append(al_terminar)
+        else:
+            self.pendientes[clave] = [al_terminar] if al_terminar is not None else []
+            self.pool.start(TareaMiniatura(clave, ruta, ancho, alto, self.senales))
+        return None
+
+    def cargar_en_label(self, ruta, label, size=None, fallback_text="Sin imagen"):
+        """Asigna la miniatura a un QLabel, ahora o cuando termine de decodificarse"""
+        pedido = object()
+        self.pedidos_label[label] = pedido
+
+        def asignar(pixmap):
+            # El label pudo haberse destruido, o reutilizado para otra imagen
+            if sip.isdeleted(label) or self.pedidos_label.get(label) is not pedido:
+                return
+            del self.pedidos_label[label]
+            if pixmap is None:
+                label.setText(fallback_text)
+            else:
+                label.setPixmap(pixmap)
+
+        if not ruta or not os.path.exists(ruta):
+            self.pedidos_label.pop(label, None)
+            label.clear()
+            label.setText(fallback_text)
+            return
+
+        pixmap = self.obtener(ruta, size, asignar)
+        if pixmap is not None:
+            asignar(pixmap)
+        else:
+            label.clear()
+            label.setText("…")
+
+    @pyqtSlot(str, QImage)
+    def _al_terminar(self, clave, imagen):
+        pixmap = QPixmap.fromImage(imagen) if not imagen.isNull() else None
+        if pixmap is not None:
+            QPixmapCache.insert(clave, pixmap)
+        else:
+            self.fallidas.add(clave)  # no se reintenta hasta que cambie el archivo
+        for al_terminar in self.pendientes.pop(clave, []):
+            al_terminar(pixmap)
+
+
+_servicio = None
+
+
+def servicio_miniaturas():
+    """Instancia compartida (se crea en el hilo de la interfaz al primer uso)"""
+    global _servicio
+    if _servicio is None:
+        _servicio = ServicioMiniaturas()
+    return _servicio
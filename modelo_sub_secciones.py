@@ -0,0 +1,196 @@
+# modelo_sub_secciones.py - Grilla de sub-secciones con model/view
+#
+# Antes cada sub-sección era un QFrame con cuatro QLabels, y cada recarga
+# destruía y volvía a crear todos los widgets. Ahora un QListView en modo
+# ícono dibuja con un delegate solo las cards visibles, las imágenes se piden
+# al servicio de miniaturas recién cuando una card se pinta, y al recargar
+# el modelo aplica solo las diferencias (altas, bajas, movimientos, cambios).
+from PyQt5 import sip
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt
+from PyQt5.QtGui import QColor, QPen
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate
+
+from miniaturas import clave_miniatura, servicio_miniaturas
+
+RolFila = Qt.UserRole + 1
+RolIcono = Qt.UserRole + 2
+RolImagen = Qt.UserRole + 3
+RolInactivo = Qt.UserRole + 4
+
+TAMANIO_CARD = QSize(220, 300)
+TAMANIO_ICONO = (48, 48)
+TAMANIO_IMAGEN = (180, 120)
+
+
+class ModeloSubSecciones(QAbstractListModel):
+    def __init__(self, inactivos=False, parent=None):
+        super().__init__(parent)
+        self.filas = []
+        self.inactivos = inactivos
+        self.claves = {}        # (id, campo, ruta) -> clave de miniatura; se vacía al recargar
+        self.esperando = set()  # claves ya pedidas al servicio, con aviso pendiente
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.filas)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        fila = self.filas[index.row()]
+        if role == Qt.DisplayRole:
+            return fila.get("nombre_sub_seccion", "")
+        if role == Qt.ToolTipRole:
+            return fila.get("domicilio") or fila.get("nombre_sub_seccion", "")
+        if role == RolFila:
+            return fila
+        if role == RolInactivo:
+            return self.inactivos
+        if role == RolIcono:
+            return self.miniatura(fila, "icono_final", TAMANIO_ICONO)
+        if role == RolImagen:
+            return self.miniatura(fila, "imagen_final", TAMANIO_IMAGEN)
+        return None
+
+    def miniatura(self, fila, campo, size):
+        """
+        Pixmap si ya está en memoria; si no, se pide (una sola vez) y se
+        repinta la fila al llegar. La clave se calcula una vez por fila y
+        recarga, no en cada repintado.
+        """
+        ruta = fila.get(campo)
+        if not ruta:
+            return None
+        id_fila = fila.get("id_sub_seccion")
+        clave_cache = (id_fila, campo, ruta)
+        if clave_cache not in self.claves:
+            self.claves[clave_cache] = clave_miniatura(ruta, *size)
+        clave = self.claves[clave_cache]
+        if not clave:
+            return None
+
+        if clave in self.esperando:
+            return servicio_miniaturas().obtener_clave(clave, ruta, *size)
+        pixmap = servicio_miniaturas().obtener_clave(
+            clave, ruta, *size, lambda _pixmap, c=clave, i=id_fila: self.repintar(i, c)
+        )
+        if pixmap is None:
+            self.esperando.add(clave)
+        return pixmap
+
+    def repintar(self, id_sub_seccion, clave=None):
+        if sip.isdeleted(self):
+            return
+        self.esperando.discard(clave)
+        fila = self.fila_de_id(id_sub_seccion)
+        if fila is not None:
+            indice = self.index(fila)
+            self.dataChanged.emit(indice, indice, [RolIcono, RolImagen])
+
+    def fila_de_id(self, id_sub_seccion):
+        for i, fila in enumerate(self.filas):
+            if fila.get("id_sub_seccion") == id_sub_seccion:
+                return i
+        return None
+
+    def actualizar(self, nuevas):
+        """
+        Deja el modelo igual a 'nuevas' (lista ordenada de dicts) emitiendo
+        solo las altas, bajas, movimientos y cambios necesarios.
+        """
+        ids_nuevos = {f.get("id_sub_seccion") for f in nuevas}
+        self.claves.clear()  # las imágenes pudieron cambiar en disco
+
+        # 1) Bajas, de abajo hacia arriba para no correr los índices
+        for i in reversed(range(len(self.filas))):
+            if self.filas[i].get("id_sub_seccion") not in ids_nuevos:
+                self.beginRemoveRows(QModelIndex(), i, i)
+                del self.filas[i]
+                self.endRemoveRows()
+
+        # 2) Recorrer el orden nuevo: mover o insertar lo que falta en cada posición
+        for destino, nueva in enumerate(nuevas):
+            id_nuevo = nueva.get("id_sub_seccion")
+            actual = self.filas[destino] if destino < len(self.filas) else None
+
+            if actual is not None and actual.get("id_sub_seccion") == id_nuevo:
+                if actual != nueva:
+                    self.filas[destino] = nueva
+                    indice = self.index(destino)
+                    self.dataChanged.emit(indice, indice)
+                continue
+
+            origen = self.fila_de_id(id_nuevo)
+            if origen is None:
+                self.beginInsertRows(QModelIndex(), destino, destino)
+                self.filas.insert(destino, nueva)
+                self.endInsertRows()
+            else:
+                # origen > destino siempre: lo anterior a 'destino' ya está en orden
+                self.beginMoveRows(QModelIndex(), origen, origen, QModelIndex(), destino)
+                self.filas.insert(destino, self.filas.pop(origen))
+                self.endMoveRows()
+                if self.filas[destino] != nueva:
+                    self.filas[destino] = nueva
+                    indice = self.index(destino)
+                    self.dataChanged.emit(indice, indice)
+
+
+class DelegadoCardSubSeccion(QStyledItemDelegate):
+    """Dibuja una card: icono, nombre, imagen principal y estado"""
+
+    def sizeHint(self, option, index):
+        return TAMANIO_CARD
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect.adjusted(2, 2, -2, -2)
+
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(rect, option.palette.highlight().color().lighter(170))
+        painter.setPen(QPen(QColor("#888888"), 1))
+        painter.drawRect(rect)
+
+        # Icono
+        rect_icono = QRect(rect.center().x() - 24, rect.top() + 10, *TAMANIO_ICONO)
+        self.dibujar_pixmap(painter, rect_icono, index.data(RolIcono), "Sin imagen")
+
+        # Nombre
+        rect_nombre = QRect(rect.left() + 8, rect_icono.bottom() + 6, rect.width() - 16, 48)
+        painter.setPen(option.palette.text().color())
+        painter.drawText(rect_nombre, Qt.AlignCenter | Qt.TextWordWrap, index.data(Qt.DisplayRole) or "")
+
+        # Imagen principal
+        rect_imagen = QRect(rect.center().x() - 90, rect_nombre.bottom() + 6, *TAMANIO_IMAGEN)
+        self.dibujar_pixmap(painter, rect_imagen, index.data(RolImagen), "Sin imagen")
+
+        # Estado
+        inactivo = index.data(RolInactivo)
+        rect_estado = QRect(rect.left(), rect_imagen.bottom() + 8, rect.width(), 24)
+        painter.setPen(QColor("red") if inactivo else QColor("green"))
+        painter.drawText(rect_estado, Qt.AlignCenter, "INACTIVO" if inactivo else "ACTIVO")
+
+        painter.restore()
+
+    def dibujar_pixmap(self, painter, rect, pixmap, fallback_text):
+        if pixmap is None or pixmap.isNull():
+            painter.setPen(QColor("#888888"))
+            painter.drawText(rect, Qt.AlignCenter, fallback_text)
+            return
+        escalado = pixmap.size().scaled(rect.size(), Qt.KeepAspectRatio)
+        destino = QRect(0, 0, escalado.width(), escalado.height())
+        destino.moveCenter(rect.center())
+        painter.drawPixmap(destino, pixmap)
+
+
+def crear_vista_cards(modelo, parent=None):
+    """QListView en modo ícono, configurado para la grilla de cards"""
+    vista = QListView(parent)
+    vista.setViewMode(QListView.IconMode)
+    vista.setResizeMode(QListView.Adjust)
+    vista.setMovement(QListView.Static)
+    vista.setUniformItemSizes(True)
+    vista.setSpacing(10)
+    vista.setSelectionMode(QListView.SingleSelection)
+    vista.setModel(modelo)
+    vista.setItemDelegate(DelegadoCardSubSeccion(vista))
+    return vista
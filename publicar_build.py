@@ -0,0 +1,166 @@
+# publicar_build.py - Reemplazo atómico de react-build/ con el build nuevo de Vite
+#
+# Antes se borraba react-build/ y después se copiaba dist/: mientras tanto
+# el Flask que estaba sirviendo (servir_react) respondía 404 y se reescribían
+# todos los archivos aunque los de assets/ tengan el hash en el nombre.
+#
+# Ahora:
+#   1) el build se arma en una carpeta hermana (react-build.nuevo); los
+#      assets con hash que ya estaban publicados se reutilizan con hard link
+#      en lugar de copiarse
+#   2) los chunks con hash del build anterior que el nuevo ya no usa se
+#      conservan una generación más: un cliente que cargó el index.html
+#      anterior puede seguir pidiendo sus chunks
+#   3) la carpeta nueva reemplaza a la publicada con un intercambio por
+#      rename (atómico en Linux; en otros sistemas, dos renames seguidos)
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+SUFIJO_NUEVO = ".nuevo"
+SUFIJO_ANTERIOR = ".anterior"
+SUFIJO_GENERACION = ".generacion.json"
+
+# Vite: assets/index-BHe7ZUoP.js, assets/logo-8c1Kk4S_.svg
+PATRON_HASHEADO = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+
+def es_hasheado(relativa):
+    return bool(PATRON_HASHEADO.match(relativa))
+
+
+def hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def listar_archivos(carpeta):
+    """Rutas relativas (con '/') de todos los archivos bajo 'carpeta'"""
+    archivos = set()
+    if not os.path.isdir(carpeta):
+        return archivos
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in nombres:
+            archivos.add(os.path.relpath(os.path.join(raiz, nombre), carpeta).replace(os.sep, '/'))
+    return archivos
+
+
+def leer_generacion(destino):
+    """Archivos propios del build publicado (sin los conservados de la generación anterior)"""
+    try:
+        with open(destino + SUFIJO_GENERACION, 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('propios', []))
+    except (OSError, ValueError):
+        return None
+
+
+def guardar_generacion(destino, propios):
+    temporal = destino + SUFIJO_GENERACION + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'generado': time.strftime('%Y-%m-%d %H:%M:%S'), 'propios': sorted(propios)}, f, indent=2)
+    os.replace(temporal, destino + SUFIJO_GENERACION)
+
+
+def enlazar_o_copiar(origen, destino):
+    """Hard link si se puede (mismo disco); si no, copia. Devuelve True si enlazó."""
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    try:
+        os.link(origen, destino)
+        return True
+    except OSError:
+        shutil.copy2(origen, destino)
+        return False
+
+
+def mismo_contenido(a, b, relativa):
+    """Los assets con hash en el nombre y mismo tamaño son el mismo archivo"""
+    try:
+        if os.path.getsize(a) != os.path.getsize(b):
+            return False
+    except OSError:
+        return False
+    return es_hasheado(relativa) or hash_archivo(a) == hash_archivo(b)
+
+
+def intercambiar_carpetas(a, b):
+    """
+    Intercambia los nombres de dos carpetas. En Linux usa renameat2 con
+    RENAME_EXCHANGE (no hay un instante sin carpeta publicada). Devuelve
+    True si el intercambio fue atómico.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            AT_FDCWD, RENAME_EXCHANGE = -100, 2
+            if libc.renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0:
+                return True
+        except (AttributeError, OSError):
+            pass  # libc sin renameat2: se usan dos renames
+
+    temporal = a + ".swap"
+    os.rename(a, temporal)
+    os.rename(b, a)
+    os.rename(temporal, b)
+    return False
+
+
+def publicar_build(origen, destino, log=print):
+    """
+    Publica 'origen' (dist/) en 'destino' (react-build/) sin dejarlo nunca
+    incompleto. Devuelve {'copiados', 'enlazados', 'conservados'}.
+    """
+    nuevo = destino + SUFIJO_NUEVO
+    anterior = destino + SUFIJO_ANTERIOR
+    for resto in (nuevo, anterior):
+        if os.path.exists(resto):
+            shutil.rmtree(resto)  # restos de una publicación interrumpida
+
+    archivos_nuevos = listar_archivos(origen)
+    publicados = listar_archivos(destino)
+    resumen = {'copiados': 0, 'enlazados': 0, 'conservados': 0}
+
+    # 1) Armar el build nuevo en la carpeta hermana
+    for relativa in sorted(archivos_nuevos):
+        ruta_origen = os.path.join(origen, relativa)
+        ruta_nueva = os.path.join(nuevo, relativa)
+        ruta_publicada = os.path.join(destino, relativa)
+        if relativa in publicados and mismo_contenido(ruta_origen, ruta_publicada, relativa):
+            if enlazar_o_copiar(ruta_publicada, ruta_nueva):
+                resumen['enlazados'] += 1
+            else:
+                resumen['copiados'] += 1
+        else:
+            os.makedirs(os.path.dirname(ruta_nueva), exist_ok=True)
+            shutil.copy2(ruta_origen, ruta_nueva)
+            resumen['copiados'] += 1
+
+    # 2) Conservar una generación los chunks que el build anterior usaba
+    propios_anteriores = leer_generacion(destino)
+    if propios_anteriores is None:
+        propios_anteriores = publicados
+    for relativa in sorted(propios_anteriores & publicados - archivos_nuevos):
+        if es_hasheado(relativa):
+            enlazar_o_copiar(os.path.join(destino, relativa), os.path.join(nuevo, relativa))
+            resumen['conservados'] += 1
+
+    # 3) Publicar
+    if os.path.exists(destino):
+        atomico = intercambiar_carpetas(destino, nuevo)
+        shutil.rmtree(nuevo, ignore_errors=True)  # ahora contiene el build anterior
+        log("🔁 Build publicado con intercambio atómico" if atomico else "🔁 Build publicado (rename)")
+    else:
+        os.rename(nuevo, destino)
+    guardar_generacion(destino, archivos_nuevos)
+
+    log(f"📊 {resumen['copiados']} copiados, {resumen['enlazados']} reutilizados (hard link), "
+        f"{resumen['conservados']} chunks anteriores conservados")
+    return resumen
@@ -0,0 +1,208 @@
+# sincronizar_assets.py - Copia incremental de public/assets al repositorio del backend
+#
+# El deploy borraba y volvía a copiar cada carpeta de assets: todos los
+# archivos quedaban con mtime nuevo y git tenía que volver a hashearlos.
+# Acá se copia solo lo que cambió y se borra lo que ya no está en el origen.
+#
+# Para decidir sin leer los archivos se usa un manifiesto (cache_deploy/),
+# con el tamaño, mtime y hash de cada archivo en la última sincronización:
+#   - si el origen y el destino siguen con el mismo tamaño/mtime registrado,
+#     el archivo no cambió
+#   - si no, se compara el hash del contenido antes de copiar
+# Los hashes y las copias se hacen en paralelo en un pool de hilos.
+#
+# Solo se borran del destino archivos que cuelgan de carpetas (o archivos)
+# de primer nivel que existen en el origen, como hacía la copia anterior;
+# lo que el backend genera por su cuenta (assets/derivados/ de
+# generar_derivados.py) no se toca.
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARPETA_MANIFIESTOS = os.path.join(BASE_DIR, "cache_deploy")
+HILOS_SINCRONIZACION = 8
+MAX_DETALLE_LOG = 20  # archivos listados por categoría en el log
+EXCLUIDAS_SINCRONIZACION = ("derivados/",)  # generadas en el destino, nunca se borran
+
+AGREGADO = "agregado"
+MODIFICADO = "modificado"
+SIN_CAMBIOS = "sin_cambios"
+
+
+def hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def ruta_manifiesto(destino):
+    """Un manifiesto por carpeta destino (fuera de ella, para no deployarlo)"""
+    clave = hashlib.sha1(os.path.abspath(destino).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CARPETA_MANIFIESTOS, f"assets_{clave}.json")
+
+
+def cargar_manifiesto(destino):
+    try:
+        with open(ruta_manifiesto(destino), 'r', encoding='utf-8') as f:
+            return json.load(f).get('archivos', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_manifiesto(destino, archivos):
+    ruta = ruta_manifiesto(destino)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'destino': os.path.abspath(destino), 'archivos': archivos}, f, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def listar_archivos(carpeta):
+    """{ruta relativa con '/': os.stat_result} de todos los archivos bajo 'carpeta'"""
+    archivos = {}
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in nombres:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                archivos[os.path.relpath(ruta, carpeta).replace(os.sep, '/')] = os.stat(ruta)
+            except OSError:
+                pass
+    return archivos
+
+
+def copiar_archivo(origen, destino):
+    """Copia con metadatos vía temporal + replace: nunca queda un archivo a medias"""
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = destino + '.sync_tmp'
+    shutil.copy2(origen, temporal)
+    os.replace(temporal, destino)
+
+
+def _mismo_stat(info, entrada, prefijo):
+    return (entrada is not None
+            and entrada.get(f'{prefijo}tamanio') == info.st_size
+            and entrada.get(f'{prefijo}mtime_ns') == info.st_mtime_ns)
+
+
+def sincronizar_archivo(origen, destino, info_origen, info_destino, anterior):
+    """
+    Deja 'destino' igual a 'origen'. Devuelve (estado, entrada del manifiesto).
+    Se ejecuta en un hilo del pool.
+    """
+    if info_destino is not None and _mismo_stat(info_origen, anterior, '') \
+            and _mismo_stat(info_destino, anterior, 'destino_'):
+        return SIN_CAMBIOS, anterior
+
+    hash_origen = (anterior['hash'] if _mismo_stat(info_origen, anterior, '')
+                   else hash_archivo(origen))
+
+    if info_destino is None:
+        estado = AGREGADO
+    elif info_destino.st_size != info_origen.st_size:
+        estado = MODIFICADO
+    else:
+        hash_destino = (anterior['hash'] if _mismo_stat(info_destino, anterior, 'destino_')
+                        else hash_archivo(destino))
+        estado = SIN_CAMBIOS if hash_destino == hash_origen else MODIFICADO
+
+    if estado != SIN_CAMBIOS:
+        copiar_archivo(origen, destino)
+    info_destino = os.stat(destino)
+    return estado, {
+        'tamanio': info_origen.st_size,
+        'mtime_ns': info_origen.st_mtime_ns,
+        'hash': hash_origen,
+        'destino_tamanio': info_destino.st_size,
+        'destino_mtime_ns': info_destino.st_mtime_ns,
+    }
+
+
+def borrar_carpetas_vacias(carpeta):
+    for raiz, _, _ in os.walk(carpeta, topdown=False):
+        if raiz != carpeta:
+            try:
+                os.rmdir(raiz)  # solo se borra si quedó vacía
+            except OSError:
+                pass
+
+
+def se_puede_borrar(relativa, primer_nivel_origen, excluidas):
+    """Solo lo que está bajo una entrada de primer nivel del origen y no excluida"""
+    if any(relativa.startswith(prefijo) for prefijo in excluidas):
+        return False
+    return relativa.split('/', 1)[0] in primer_nivel_origen
+
+
+def sincronizar_carpeta(origen, destino, log=print, hilos=HILOS_SINCRONIZACION,
+                        excluidas=EXCLUIDAS_SINCRONIZACION):
+    """
+    Sincroniza 'destino' con 'origen' (copia, actualiza y borra lo que ya no
+    está en el origen, respetando se_puede_borrar()).
+    Devuelve {'agregados': [...], 'modificados': [...], 'eliminados': [...],
+    'sin_cambios': n, 'errores': [...]}.
+    """
+    manifiesto = cargar_manifiesto(destino)
+    archivos_origen = listar_archivos(origen)
+    archivos_destino = listar_archivos(destino) if os.path.isdir(destino) else {}
+    archivos_destino = {r: i for r, i in archivos_destino.items() if not r.endswith('.sync_tmp')}
+
+    resumen = {'agregados': [], 'modificados': [], 'eliminados': [], 'sin_cambios': 0, 'errores': []}
+    nuevo_manifiesto = {}
+
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        futuros = {
+            pool.submit(
+                sincronizar_archivo,
+                os.path.join(origen, relativa), os.path.join(destino, relativa),
+                info, archivos_destino.get(relativa), manifiesto.get(relativa)
+            ): relativa
+            for relativa, info in archivos_origen.items()
+        }
+        for futuro, relativa in futuros.items():
+            try:
+                estado, entrada = futuro.result()
+            except Exception as e:
+                resumen['errores'].append(f"{relativa}: {e}")
+                continue
+            nuevo_manifiesto[relativa] = entrada
+            if estado == AGREGADO:
+                resumen['agregados'].append(relativa)
+            elif estado == MODIFICADO:
+                resumen['modificados'].append(relativa)
+            else:
+                resumen['sin_cambios'] += 1
+
+    primer_nivel_origen = {relativa.split('/', 1)[0] for relativa in archivos_origen}
+    for relativa in sorted(set(archivos_destino) - set(archivos_origen)):
+        if not se_puede_borrar(relativa, primer_nivel_origen, excluidas):
+            continue
+        try:
+            os.remove(os.path.join(destino, relativa))
+            resumen['eliminados'].append(relativa)
+        except OSError as e:
+            resumen['errores'].append(f"{relativa}: {e}")
+    if resumen['eliminados']:
+        borrar_carpetas_vacias(destino)
+
+    guardar_manifiesto(destino, nuevo_manifiesto)
+    registrar_resumen(resumen, log)
+    return resumen
+
+
+def registrar_resumen(resumen, log):
+    for clave, icono in (('agregados', '➕'), ('modificados', '✏️'), ('eliminados', '➖')):
+        archivos = sorted(resumen[clave])
+        for relativa in archivos[:MAX_DETALLE_LOG]:
+            log(f"   {icono} {relativa}")
+        if len(archivos) > MAX_DETALLE_LOG:
+            log(f"   {icono} ... y {len(archivos) - MAX_DETALLE_LOG} más")
+    for error in resumen['errores']:
+        log(f"   ⚠️  Error: {error}")
+    log(f"📊 Assets: {len(resumen['agregados'])} agregados, {len(resumen['modificados'])} modificados, "
+        f"{len(resumen['eliminados'])} eliminados, {resumen['sin_cambios']} sin cambios")
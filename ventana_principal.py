@@ -6,10 +6,6 @@ from PyQt5 import uic
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QBrush
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QPoint, QSize
 
-# ✅ CAMBIADO: Importar la función correcta
-#from database_local import conectar_local as conectar_base_datos
-from database_hosting import conectar_hosting as conectar_base_datos # ← Para cuando necesites conectar al hosting
-
 from app_usuarios import VentanaUsuarios
 from app_secciones import VentanaSecciones
 from app_sub_secciones import VentanaSubSecciones
@@ -17,6 +13,35 @@ from app_configuracion import VentanaConfiguracion
 from app_regiones_zonas import VentanaRegionesZonas
 from build_deploy import DialogoBuildDeploy
 from backend_deploy import DialogoBackendDeploy
+from consultas_async import ConsultorAsync
+from indice_assets import indice_assets
+
+
+def consultar_usuario_login(conexion, usuario):
+    """Datos del usuario para el login (se ejecuta fuera del hilo de la interfaz)"""
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id_usuario, apellido_nombres_usuario, rol_usuario, foto_usuario, password_usuario, activo
+        FROM usuarios
+        WHERE nombre_usuario_acceso = %s
+    """, (usuario,))
+    resultado = cursor.fetchone()
+    cursor.close()
+    return resultado
+
+
+def consultar_configuracion_principal(conexion):
+    """Configuración habilitada de la app: iconos del navbar y hero"""
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id_config, titulo_app, logo_app, icono_hamburguesa, icono_cerrar, 
+               hero_titulo, hero_imagen, footer_texto 
+        FROM configuracion_app 
+        WHERE habilitar=1 LIMIT 1
+    """)
+    fila = cursor.fetchone()
+    cursor.close()
+    return fila
 
 
 class VentanaPrincipal(QMainWindow):
@@ -33,6 +58,7 @@ class VentanaPrincipal(QMainWindow):
             raise FileNotFoundError(f"No se encontró el archivo UI en: {ruta_ui}")
 
         uic.loadUi(ruta_ui, self)
+        self.consultas = ConsultorAsync(self)
 
         # Inicializo variable para configuración
         self.config = None
@@ -48,14 +74,12 @@ class VentanaPrincipal(QMainWindow):
         # Maximizar ventana
         self.showMaximized()
 
-        # Cargar configuración (iconos, hero) desde la BD
-        self.cargar_configuracion()
-
-        # Configurar interfaz (con iconos según BD o fallback)
+        # Configurar interfaz con los iconos de fallback; la ventana queda
+        # usable mientras la configuración llega desde la BD
         self.configurar_interfaz()
 
-        # Cargar imagen central (hero)
-        self.cargar_imagen_central()
+        # Cargar configuración (iconos, hero) desde la BD en segundo plano
+        self.cargar_configuracion()
         
         
     def ruta_absoluta_desde_relativa(self, relativa: str) -> str:
@@ -72,7 +96,8 @@ class VentanaPrincipal(QMainWindow):
         # Limpiamos la ruta relativa de posibles "/" o "\"
         ruta_limpia = relativa.lstrip("/\\")
         
-        return os.path.normpath(os.path.join(base_assets, ruta_limpia))
+        ruta = os.path.normpath(os.path.join(base_assets, ruta_limpia))
+        return indice_assets().resolver(relativa, preferida=ruta) or ruta
 
     # -------------------------
     # Helpers: resolver rutas
@@ -97,33 +122,14 @@ class VentanaPrincipal(QMainWindow):
             r = r.replace("public/", "", 1)
         return r
 
-    def _search_for_filename_in_project(self, filename, project_root, max_matches=20):
-        """
-        Busca el filename dentro de project_root (recorrido limitado).
-        Devuelve lista de coincidencias (rutas absolutas), hasta max_matches.
-        Esto ayuda a localizar dónde está realmente el archivo si las candidatas fallan.
-        """
-        matches = []
-        # Buscamos por basename (por si BD guarda sólo /assets/imagenes/archivo.jpg)
-        basename = os.path.basename(filename)
-        try:
-            for root, dirs, files in os.walk(project_root):
-                if basename in files:
-                    matches.append(os.path.join(root, basename))
-                    if len(matches) >= max_matches:
-                        break
-            return matches
-        except Exception as e:
-            print(f"[search] Error buscando {basename} en {project_root}: {e}")
-            return matches
-
     def resolve_asset_path(self, ruta):
         """
         Devuelve la primera ruta absoluta existente para la ruta 'ruta' guardada en BD.
         Si 'ruta' es URL, devuelve la URL (pero NOTA: QPixmap/QIcon no cargan http directamente).
         Si no encuentra nada, devuelve None.
 
-        Imprime por consola las candidatas y cuál existe (diagnóstico ampliado).
+        Las candidatas se comprueban contra el índice de assets (sin tocar el
+        disco); si ninguna está, se busca el archivo por nombre en el índice.
         """
         if not ruta:
             return None
@@ -176,37 +182,22 @@ class VentanaPrincipal(QMainWindow):
         # 9) cwd
         candidates.append(os.path.normpath(os.path.join(os.getcwd(), cleaned)))
 
-        # Mostrar lo que intentamos
-        print("[resolve_asset_path] Ruta solicitada:", ruta_raw)
-        print("[resolve_asset_path] Candidatas (en este orden):")
-        for c in candidates:
-            try:
-                print("   -", c, " -> exists:", os.path.exists(c))
-            except Exception:
-                print("   -", c, " -> exists: (error comprobando)")
-
-        # Devolver la primera que exista
+        # Devolver la primera que exista (mientras se construye el índice,
+        # existe() consulta el disco)
+        indice = indice_assets()
         for p in candidates:
-            try:
-                if p and os.path.exists(p):
-                    pnorm = os.path.normpath(p)
-                    print(f"[resolve_asset_path] Usando: {pnorm}")
-                    return pnorm
-            except Exception:
-                pass
-
-        # Si no encontramos nada, intentamos buscar el nombre del archivo en el project_root para dar pista al dev
-        basename = os.path.basename(cleaned)
-        print(f"[resolve_asset_path] No se encontró archivo en candidatas. Buscando '{basename}' dentro de {project_root} (esto puede tardar unos segundos)...")
-        matches = self._search_for_filename_in_project(basename, project_root, max_matches=20)
-        if matches:
-            print("[resolve_asset_path] Se encontraron coincidencias en el repo (posibles ubicaciones del archivo):")
-            for m in matches:
-                print("   -", m)
-        else:
-            print("[resolve_asset_path] No se encontró ninguna coincidencia del nombre de archivo en el repo.")
-
-        print("[resolve_asset_path] No se encontró archivo en ninguna candidata.")
+            if p and indice.existe(p):
+                pnorm = os.path.normpath(p)
+                print(f"[resolve_asset_path] {ruta_raw} → {pnorm}")
+                return pnorm
+
+        # Si no está en ninguna candidata, buscar el archivo por nombre en el índice
+        encontrada = indice.buscar(cleaned)
+        if encontrada:
+            print(f"[resolve_asset_path] {ruta_raw} → {encontrada} (encontrada en el índice de assets)")
+            return encontrada
+
+        print(f"[resolve_asset_path] No se encontró archivo para: {ruta_raw}")
         return None
 
     def find_asset_or_fallback(self, ruta_bd, fallback_relative):
@@ -214,6 +205,8 @@ class VentanaPrincipal(QMainWindow):
         Intenta resolver ruta desde BD. Si no existe, intenta fallback_relative relativo al project_root/frontend/public.
         Devuelve una ruta absoluta existente o None.
         """
+        indice = indice_assets()
+
         # 1) intentar BD
         if ruta_bd:
             ruta_res = self.resolve_asset_path(ruta_bd)
@@ -223,7 +216,7 @@ class VentanaPrincipal(QMainWindow):
                 if self._is_url(ruta_res):
                     print(f"[find_asset_or_fallback] Ruta BD es URL: {ruta_res}")
                     return ruta_res
-                if os.path.exists(ruta_res):
+                if indice.existe(ruta_res):
                     print(f"[find_asset_or_fallback] Ruta BD válida: {ruta_res}")
                     return ruta_res
                 else:
@@ -234,20 +227,20 @@ class VentanaPrincipal(QMainWindow):
         project_root = os.path.abspath(os.path.join(backend_dir, "..", ".."))
         fallback_clean = fallback_relative.lstrip("./").lstrip("/")
         fallback_abs = os.path.join(project_root, "frontend", "public", fallback_clean)
-        print(f"[find_asset_or_fallback] Intentando fallback: {fallback_abs} (exists: {os.path.exists(fallback_abs)})")
-        if os.path.exists(fallback_abs):
+        print(f"[find_asset_or_fallback] Intentando fallback: {fallback_abs} (exists: {indice.existe(fallback_abs)})")
+        if indice.existe(fallback_abs):
             return os.path.normpath(fallback_abs)
 
         # 3) intentar fallback relativo al backend
         fallback_backend = os.path.join(backend_dir, fallback_clean)
-        print(f"[find_asset_or_fallback] Intentando fallback backend: {fallback_backend} (exists: {os.path.exists(fallback_backend)})")
-        if os.path.exists(fallback_backend):
+        print(f"[find_asset_or_fallback] Intentando fallback backend: {fallback_backend} (exists: {indice.existe(fallback_backend)})")
+        if indice.existe(fallback_backend):
             return os.path.normpath(fallback_backend)
 
         # 4) intentar fallback en cwd
         fallback_cwd = os.path.normpath(os.path.join(os.getcwd(), fallback_clean))
-        print(f"[find_asset_or_fallback] Intentando fallback cwd: {fallback_cwd} (exists: {os.path.exists(fallback_cwd)})")
-        if os.path.exists(fallback_cwd):
+        print(f"[find_asset_or_fallback] Intentando fallback cwd: {fallback_cwd} (exists: {indice.existe(fallback_cwd)})")
+        if indice.existe(fallback_cwd):
             return fallback_cwd
 
         print("[find_asset_or_fallback] No se encontró ni BD ni fallback.")
@@ -257,56 +250,31 @@ class VentanaPrincipal(QMainWindow):
     # Cargar configuración BD
     # -------------------------
     def cargar_configuracion(self):
-        try:
-            conn = conectar_base_datos()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id_config, titulo_app, logo_app, icono_hamburguesa, icono_cerrar, 
-                       hero_titulo, hero_imagen, footer_texto 
-                FROM configuracion_app 
-                WHERE habilitar=1 LIMIT 1
-            """)
-            fila = cursor.fetchone()
-            cursor.close()
-            conn.close()
-            if fila:
-                self.config = fila
-                print("[CONFIG] Configuración cargada desde BD:", fila)
-            else:
-                self.config = None
-        except Exception as e:
-            print("Error cargando configuración desde BD:", e)
-            self.config = None
+        if not self.consultas.ejecutar(
+            "configuracion", consultar_configuracion_principal, self.aplicar_configuracion,
+            al_fallar=self.error_configuracion
+        ):
+            self.cargar_imagen_central()
+
+    def aplicar_configuracion(self, fila):
+        self.config = fila or None
+        if fila:
+            print("[CONFIG] Configuración cargada desde BD:", fila)
+        self.aplicar_iconos_navbar()
+        self.cargar_imagen_central()
+
+    def error_configuracion(self, mensaje):
+        # Sin configuración la ventana sigue con los iconos e imagen de fallback
+        print("Error cargando configuración desde BD:", mensaje)
+        self.config = None
+        self.cargar_imagen_central()
 
     # -------------------------
     # Interfaz / iconos navbar
     # -------------------------
     def configurar_interfaz(self):
-        icono_menu_bd = None
-        icono_cerrar_bd = None
-        if self.config:
-            icono_menu_bd = self.config.get("icono_hamburguesa")
-            icono_cerrar_bd = self.config.get("icono_cerrar")
-
-        # Intentar cargar desde BD, si no usar fallback dentro del repo
-        self.menu_icon_path = self.find_asset_or_fallback(icono_menu_bd, "assets/iconos/menu.png")
-        self.close_icon_path = self.find_asset_or_fallback(icono_cerrar_bd, "assets/iconos/cerrar.png")
-
-        print(f"[ICONOS] Hamburguesa → {self.menu_icon_path}")
-        print(f"[ICONOS] Cerrar → {self.close_icon_path}")
-
-        try:
-            # Si la ruta es una URL (http/https) no intentamos usar QIcon con la URL
-            if self.menu_icon_path and not self._is_url(self.menu_icon_path) and os.path.exists(self.menu_icon_path):
-                self.btnMenu.setIcon(QIcon(self.menu_icon_path))
-            else:
-                # intentar si es URL (indicamos en consola) o dejar sin icono
-                if self.menu_icon_path and self._is_url(self.menu_icon_path):
-                    print("[configurar_interfaz] Atención: icono menú es URL. QIcon no carga URLs directamente.")
-                self.btnMenu.setIcon(QIcon())
-            self.btnMenu.setIconSize(QSize(40, 40))
-        except Exception as e:
-            print("Error asignando icono menú:", e)
+        """Iconos, botones y estado inicial; se llama una sola vez (conecta señales)"""
+        self.aplicar_iconos_navbar()
 
         try:
             self.btnBackendDeploy.setVisible(False)
@@ -344,6 +312,37 @@ class VentanaPrincipal(QMainWindow):
             pass
         self.bloquear_funcionalidades()
 
+    def aplicar_iconos_navbar(self):
+        """Iconos del navbar según self.config (o fallback); se puede repetir"""
+        icono_menu_bd = None
+        icono_cerrar_bd = None
+        if self.config:
+            icono_menu_bd = self.config.get("icono_hamburguesa")
+            icono_cerrar_bd = self.config.get("icono_cerrar")
+
+        # Intentar cargar desde BD, si no usar fallback dentro del repo
+        self.menu_icon_path = self.find_asset_or_fallback(icono_menu_bd, "assets/iconos/menu.png")
+        self.close_icon_path = self.find_asset_or_fallback(icono_cerrar_bd, "assets/iconos/cerrar.png")
+
+        print(f"[ICONOS] Hamburguesa → {self.menu_icon_path}")
+        print(f"[ICONOS] Cerrar → {self.close_icon_path}")
+
+        try:
+            # Con el menú lateral abierto el botón muestra el icono de cerrar
+            menu_abierto = self.frame_menu_lateral.x() >= 0
+            icono = self.close_icon_path if menu_abierto else self.menu_icon_path
+            # Si la ruta es una URL (http/https) no intentamos usar QIcon con la URL
+            if icono and not self._is_url(icono) and os.path.exists(icono):
+                self.btnMenu.setIcon(QIcon(icono))
+            else:
+                # intentar si es URL (indicamos en consola) o dejar sin icono
+                if icono and self._is_url(icono):
+                    print("[configurar_interfaz] Atención: icono menú es URL. QIcon no carga URLs directamente.")
+                self.btnMenu.setIcon(QIcon())
+            self.btnMenu.setIconSize(QSize(40, 40))
+        except Exception as e:
+            print("Error asignando icono menú:", e)
+
     # -------------------------
     # Imagen central (hero)
     # -------------------------
@@ -356,15 +355,6 @@ class VentanaPrincipal(QMainWindow):
             ruta_relativa = None
             if self.config and self.config.get("hero_imagen"):
                 ruta_relativa = self.config.get("hero_imagen")
-            else:
-                conn = conectar_base_datos()
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT hero_imagen FROM configuracion_app WHERE habilitar=1 LIMIT 1")
-                res = cursor.fetchone()
-                cursor.close()
-                conn.close()
-                if res:
-                    ruta_relativa = res.get("hero_imagen")
 
             if not ruta_relativa:
                 print("No hay imagen configurada en la base de datos")
@@ -477,20 +467,35 @@ class VentanaPrincipal(QMainWindow):
             QMessageBox.warning(self, "Campos Vacíos", "Por favor ingrese usuario y contraseña.")
             return
 
+        # La consulta corre en segundo plano; el botón queda deshabilitado mientras tanto
         try:
-            conexion = conectar_base_datos()
-            cursor = conexion.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id_usuario, apellido_nombres_usuario, rol_usuario, foto_usuario, password_usuario, activo
-                FROM usuarios
-                WHERE nombre_usuario_acceso = %s
-            """, (usuario,))
-            resultado = cursor.fetchone()
-            cursor.close()
-            conexion.close()
-        except Exception as e:
-            QMessageBox.critical(self, "Error BD", f"No se pudo consultar usuarios:\n{e}")
-            return
+            self.btnLoginAceptar.setEnabled(False)
+        except Exception:
+            pass
+        lanzada = self.consultas.ejecutar(
+            "login", consultar_usuario_login,
+            lambda resultado: self.procesar_login(clave, resultado),
+            usuario,
+            al_fallar=self.error_login
+        )
+        if not lanzada:
+            try:
+                self.btnLoginAceptar.setEnabled(True)
+            except Exception:
+                pass
+
+    def error_login(self, mensaje):
+        try:
+            self.btnLoginAceptar.setEnabled(True)
+        except Exception:
+            pass
+        QMessageBox.critical(self, "Error BD", f"No se pudo consultar usuarios:\n{mensaje}")
+
+    def procesar_login(self, clave, resultado):
+        try:
+            self.btnLoginAceptar.setEnabled(True)
+        except Exception:
+            pass
 
         if resultado:
             nombre_completo = resultado.get("apellido_nombres_usuario")
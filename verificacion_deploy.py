@@ -0,0 +1,254 @@
+# verificacion_deploy.py - Verificación del backend después del deploy
+#
+# Antes se pedían tres URLs una sola vez, en serie, apenas terminaba el push:
+# Railway todavía no había reconstruido, así que se verificaba el build viejo.
+#
+# Ahora:
+#   1) el deploy escribe build_id.txt con un identificador nuevo y se consulta
+#      /api/info-servidor con espera exponencial hasta que el hosting informa
+#      ese build
+#   2) se miden los endpoints en paralelo, pero sin superar los workers de
+#      gunicorn y con las muestras de cada endpoint una detrás de otra (si no,
+#      la latencia mediría la cola que arma la propia verificación); las
+#      peticiones fallidas se reintentan con espera exponencial y se informa
+#      p50/p95 de latencia y tamaño de la respuesta
+#   3) se compara con las mediciones del deploy anterior (cache_deploy/) y se
+#      marcan las regresiones
+import hashlib
+import json
+import math
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARPETA_METRICAS = os.path.join(BASE_DIR, "cache_deploy")
+ARCHIVO_BUILD_ID = "build_id.txt"
+
+ENDPOINT_INFO = "/api/info-servidor"
+ENDPOINTS_VERIFICACION = [
+    ENDPOINT_INFO,
+    "/api/health",
+    "/api/configuracion",
+    "/api/bootstrap",
+    "/api/regiones_zonas",
+    "/api/secciones",
+    "/api/sub-secciones",
+    "/",
+]
+
+TIMEOUT_PETICION = 15
+ESPERA_INICIAL = 2          # segundos; se duplica en cada intento
+ESPERA_MAXIMA_INTENTO = 60
+ESPERA_MAXIMA_BUILD = 10 * 60
+MUESTRAS_POR_ENDPOINT = 10
+REINTENTOS_PETICION = 3
+HILOS_VERIFICACION = 2  # = --workers del Procfile/railway.toml
+
+# Regresión: p95 un 50% más lento (y al menos 100 ms) o respuesta un 20% más grande
+FACTOR_LATENCIA = 1.5
+MARGEN_LATENCIA_MS = 100
+FACTOR_TAMANIO = 1.2
+
+
+def nuevo_build_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def escribir_build_id(backend_path):
+    """Escribe un build_id.txt nuevo en el backend y devuelve el identificador"""
+    build_id = nuevo_build_id()
+    with open(os.path.join(backend_path, ARCHIVO_BUILD_ID), 'w', encoding='utf-8') as f:
+        f.write(build_id + "\n")
+    return build_id
+
+
+def esperas(inicial=ESPERA_INICIAL, maxima=ESPERA_MAXIMA_INTENTO):
+    """2, 4, 8, ... segundos, sin pasar de 'maxima'"""
+    espera = inicial
+    while True:
+        yield espera
+        espera = min(espera * 2, maxima)
+
+
+def esperar_build(base_url, build_id, log=print, espera_maxima=ESPERA_MAXIMA_BUILD):
+    """
+    Consulta /api/info-servidor hasta que informa 'build_id'. Devuelve los
+    datos de info-servidor, o None si se agotó la espera.
+    """
+    limite = time.monotonic() + espera_maxima
+    ultimo = None
+    for espera in esperas():
+        try:
+            respuesta = requests.get(base_url + ENDPOINT_INFO, timeout=TIMEOUT_PETICION)
+            if respuesta.status_code == 200:
+                datos = respuesta.json()
+                if datos.get('build') == build_id:
+                    return datos
+                ultimo = f"build {datos.get('build') or 'sin identificador'}"
+            else:
+                ultimo = f"HTTP {respuesta.status_code}"
+        except (requests.exceptions.RequestException, ValueError) as e:
+            ultimo = type(e).__name__
+
+        if time.monotonic() + espera > limite:
+            return None
+        log(f"   ⏳ Todavía no está el build nuevo ({ultimo}), reintento en {espera} s")
+        time.sleep(espera)
+
+
+def medir(url):
+    """Una petición con reintentos: (latencia en ms, bytes) o excepción"""
+    reintentos = esperas(1)
+    for intento in range(REINTENTOS_PETICION):
+        try:
+            inicio = time.perf_counter()
+            respuesta = requests.get(url, timeout=TIMEOUT_PETICION)
+            latencia = (time.perf_counter() - inicio) * 1000
+            if respuesta.status_code == 200:
+                return latencia, len(respuesta.content)
+            error = RuntimeError(f"HTTP {respuesta.status_code}")
+        except requests.exceptions.RequestException as e:
+            error = e
+        if intento < REINTENTOS_PETICION - 1:
+            time.sleep(next(reintentos))
+    raise error
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano"""
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def medir_muestras(url, muestras):
+    """Las muestras de un endpoint, una detrás de otra"""
+    medida = {'latencias': [], 'bytes': [], 'errores': []}
+    for _ in range(muestras):
+        try:
+            latencia, tamanio = medir(url)
+            medida['latencias'].append(latencia)
+            medida['bytes'].append(tamanio)
+        except Exception as e:
+            medida['errores'].append(str(e))
+    return medida
+
+
+def medir_endpoints(base_url, endpoints=ENDPOINTS_VERIFICACION, muestras=MUESTRAS_POR_ENDPOINT,
+                    hilos=HILOS_VERIFICACION):
+    """
+    Pide cada endpoint 'muestras' veces (como mucho 'hilos' endpoints a la
+    vez). Devuelve {endpoint: {'p50', 'p95', 'bytes', 'fallos', 'errores': [...]}}
+    ('p50' None si no respondió nunca).
+    """
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        futuros = {endpoint: pool.submit(medir_muestras, base_url + endpoint, muestras) for endpoint in endpoints}
+        medidas = {endpoint: futuro.result() for endpoint, futuro in futuros.items()}
+
+    resultados = {}
+    for endpoint, m in medidas.items():
+        resultados[endpoint] = {
+            'p50': round(percentil(m['latencias'], 50), 1) if m['latencias'] else None,
+            'p95': round(percentil(m['latencias'], 95), 1) if m['latencias'] else None,
+            'bytes': max(m['bytes']) if m['bytes'] else None,
+            'fallos': len(m['errores']),
+            'errores': sorted(set(m['errores'])),
+        }
+    return resultados
+
+
+def ruta_metricas(base_url):
+    clave = hashlib.sha1(base_url.rstrip('/').encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CARPETA_METRICAS, f"metricas_{clave}.json")
+
+
+def cargar_metricas(base_url):
+    try:
+        with open(ruta_metricas(base_url), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def guardar_metricas(base_url, build_id, resultados):
+    ruta = ruta_metricas(base_url)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({
+            'base_url': base_url, 'build': build_id,
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'), 'endpoints': resultados,
+        }, f, indent=2, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def regresiones(actual, anterior):
+    """Lista de mensajes con lo que empeoró respecto del deploy anterior"""
+    avisos = []
+    for endpoint, medida in actual.items():
+        previa = (anterior or {}).get(endpoint)
+        if not previa or previa.get('p50') is None:
+            continue
+        if medida['p50'] is None:
+            avisos.append(f"{endpoint}: dejó de responder")
+            continue
+        if medida['p95'] > previa['p95'] * FACTOR_LATENCIA and medida['p95'] - previa['p95'] >= MARGEN_LATENCIA_MS:
+            avisos.append(f"{endpoint}: p95 {previa['p95']:.0f} ms -> {medida['p95']:.0f} ms")
+        if previa.get('bytes') and medida['bytes'] > previa['bytes'] * FACTOR_TAMANIO:
+            avisos.append(f"{endpoint}: tamaño {formato_bytes(previa['bytes'])} -> {formato_bytes(medida['bytes'])}")
+    return avisos
+
+
+def formato_bytes(n):
+    if n is None:
+        return "-"
+    return f"{n / 1024:.1f} KB" if n >= 1024 else f"{n} B"
+
+
+def verificar_deploy(base_url, build_id, log=print):
+    """
+    Espera el build nuevo, mide los endpoints y compara con el deploy
+    anterior. Devuelve True si el build nuevo respondió en todos los
+    endpoints (las regresiones solo se informan).
+    """
+    base_url = base_url.rstrip('/')
+    log(f"⏳ Esperando el build {build_id} en el hosting...")
+    inicio = time.monotonic()
+    info = esperar_build(base_url, build_id, log)
+    if info is None:
+        log(f"❌ El hosting no informó el build {build_id} después de {ESPERA_MAXIMA_BUILD // 60} min")
+        return False
+    log(f"✅ Build {build_id} activo (después de {time.monotonic() - inicio:.0f} s)")
+    if 'mensaje' in info:
+        log(f"   💬 {info['mensaje']}")
+    if 'entorno' in info:
+        log(f"   🏭 Entorno: {info['entorno']}")
+
+    resultados = medir_endpoints(base_url)
+    todos_funcionan = True
+    for endpoint, medida in resultados.items():
+        if medida['p50'] is None:
+            todos_funcionan = False
+            log(f"❌ {endpoint} - No responde: {'; '.join(medida['errores'])}")
+            continue
+        log(f"✅ {endpoint} - p50 {medida['p50']:.0f} ms, p95 {medida['p95']:.0f} ms, "
+            f"{formato_bytes(medida['bytes'])}")
+        if medida['fallos']:
+            log(f"   ⚠️  {medida['fallos']} petición(es) fallida(s): {'; '.join(medida['errores'])}")
+            todos_funcionan = False
+
+    anterior = cargar_metricas(base_url)
+    if anterior:
+        avisos = regresiones(resultados, anterior.get('endpoints'))
+        if avisos:
+            log(f"⚠️  Regresiones respecto del deploy anterior ({anterior.get('build')}, {anterior.get('fecha')}):")
+            for aviso in avisos:
+                log(f"   📉 {aviso}")
+        else:
+            log("📊 Sin regresiones respecto del deploy anterior")
+    if todos_funcionan:
+        guardar_metricas(base_url, build_id, resultados)
+    return todos_funcionan
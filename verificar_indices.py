@@ -0,0 +1,22 @@
+# Muestra el plan de ejecución (EXPLAIN) de las consultas principales del hosting
+from database_hosting import conectar_hosting, cerrar_conexion, aplicar_migraciones, verificar_planes_consultas
+
+def verificar_indices():
+    conexion = conectar_hosting()
+    if not conexion:
+        print("[ERROR] No se pudo conectar al hosting")
+        return
+
+    try:
+        aplicar_migraciones(conexion)
+        if verificar_planes_consultas(conexion):
+            print("\n[SUCCESS] Todas las consultas usan índices")
+        else:
+            print("\n[WARN] Hay consultas que no usan índices (ver arriba)")
+    finally:
+        cerrar_conexion(conexion)
+
+if __name__ == "__main__":
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([])
+    verificar_indices()